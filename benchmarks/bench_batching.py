@@ -0,0 +1,78 @@
+"""
+Benchmarks building padded batches with SentenceBatcher against walking Sentence.tokens.
+
+"tokens" encodes every sentence through the object API, sorts and pads in the consumer, which is what
+SentenceBatcher replaces. "serial" and "threaded" run the batcher without and with its background thread. The
+consumer spends --step milliseconds per batch to stand in for a model, which the threaded batcher overlaps with:
+
+    python benchmarks/bench_batching.py --copies 200 --step 2 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy
+from corenlp_xml.batching import SentenceBatcher, new_vocabulary
+from corenlp_xml.document import Document
+
+TEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test')
+
+
+def tokens(documents, batch_size, step):
+    vocabularies = dict((field, new_vocabulary()) for field in ('word', 'pos', 'ner'))
+    rows = []
+    for document in documents:
+        for sentence in document.sentences:
+            heads = dict((link.dependent.idx, link.governor.idx) for link in sentence.basic_dependencies.links)
+            rows.append([[vocabularies[field].id(getattr(token, field)) for token in sentence.tokens]
+                         for field in ('word', 'pos', 'ner')] +
+                        [[heads.get(token.id, -1) for token in sentence.tokens]])
+    rows.sort(key=lambda row: len(row[0]))
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        width = max(len(row[0]) for row in batch)
+        [numpy.array([column + [0] * (width - len(column)) for column in columns]) for columns in zip(*batch)]
+        time.sleep(step)
+
+
+def batcher(threaded):
+    def run(documents, batch_size, step):
+        for _ in SentenceBatcher(batch_size=batch_size, threaded=threaded).batches(documents):
+            time.sleep(step)
+    run.__name__ = 'threaded' if threaded else 'serial'
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--xml', default=os.path.join(TEST, 'test.xml'))
+    parser.add_argument('--copies', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--step', type=float, default=2.0, help="milliseconds the consumer spends per batch")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.xml, 'rb') as xml_file:
+        xml = xml_file.read()
+    print("python %s, %d documents of %d bytes, batches of %d, %.1fms per batch, best of %d" % (
+        sys.version.split()[0], args.copies, len(xml), args.batch_size, args.step, args.repeat))
+
+    baseline = None
+    for workload in (tokens, batcher(False), batcher(True)):
+        best = None
+        for _ in range(args.repeat):
+            """ Documents are parsed up front so that only encoding, sorting and padding are timed """
+            documents = [Document(xml) for _ in range(args.copies)]
+            start = time.time()
+            workload(documents, args.batch_size, args.step / 1000.0)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        baseline = baseline or best
+        print("%-8s %7.3fs  %8.1f docs/s  %5.2fx" % (workload.__name__, best, args.copies / best, baseline / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmarks reading the same annotations from CoreNLP XML and from CoreNLP JSON with Document.from_json.
+
+Two workloads are timed for each format: "columns" builds the token columns, coreference table and
+collapsed-ccprocessed dependency matrix, which JSON documents build without an element tree, and "objects"
+walks every token, dependency link and coreference mention through the object API, which builds one:
+
+    python benchmarks/bench_json.py --copies 200 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corenlp_xml.document import Document
+from corenlp_xml import json_backend
+
+TEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test')
+
+
+def columns(document):
+    document.token_columns
+    document.resolve_coreferences()
+    document.dependency_batch()
+
+
+def objects(document):
+    for sentence in document.sentences:
+        [token.word for token in sentence.tokens]
+        [link.dependent.idx for link in sentence.collapsed_ccprocessed_dependencies.links]
+    for coreference in document.coreferences:
+        [mention.head for mention in coreference.mentions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--xml', default=os.path.join(TEST, 'test.xml'))
+    parser.add_argument('--json', default=os.path.join(TEST, 'test.json'))
+    parser.add_argument('--copies', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.xml, 'rb') as xml_file:
+        xml = xml_file.read()
+    with open(args.json, 'rb') as json_file:
+        json_string = json_file.read()
+    print("python %s, %d documents of %d bytes XML and %d bytes JSON, decoded with %s, best of %d" % (
+        sys.version.split()[0], args.copies, len(xml), len(json_string), json_backend.DECODER.__module__,
+        args.repeat))
+
+    for workload in (columns, objects):
+        baseline = None
+        for name, load, source in (('xml', Document, xml), ('json', Document.from_json, json_string)):
+            best = None
+            for _ in range(args.repeat):
+                start = time.time()
+                for _ in range(args.copies):
+                    workload(load(source))
+                elapsed = time.time() - start
+                best = elapsed if best is None else min(best, elapsed)
+            baseline = baseline or best
+            print("%-8s %-5s %7.3fs  %8.1f docs/s  %5.2fx" % (workload.__name__, name, best, args.copies / best,
+                                                            baseline / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmarks parsing documents with lxml's default parser against corenlp_xml.parsers.TRUSTED_OPTIONS.
+
+For each set of options it reports the time to parse and build token columns, the number of
+whitespace-only text nodes in the tree, and the growth in peak resident memory from holding every
+parsed document at once. Memory is measured in a fresh child process per set of options, so the
+runs don't affect each other:
+
+    python benchmarks/bench_parser.py --copies 200
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corenlp_xml.document import Document
+from corenlp_xml.parsers import TRUSTED_OPTIONS
+
+OPTIONS = {
+    'default': None,
+    'no blank text': {'remove_blank_text': True},
+    'trusted': TRUSTED_OPTIONS,
+}
+
+
+def peak_kilobytes():
+    """ ru_maxrss is in bytes on macOS and kilobytes elsewhere """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure_memory(xml, name, copies):
+    before = peak_kilobytes()
+    documents = [Document(xml, parser_options=OPTIONS[name]) for _ in range(copies)]
+    print(peak_kilobytes() - before)
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--xml', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test',
+                                                      'test.xml'))
+    parser.add_argument('--copies', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--memory', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(args.xml, 'rb') as xml_file:
+        xml = xml_file.read()
+    if args.memory:
+        measure_memory(xml, args.memory, args.copies)
+        return
+    print("python %s, %d documents of %d bytes, best of %d" % (sys.version.split()[0], args.copies, len(xml),
+                                                               args.repeat))
+
+    baseline = None
+    for name in ('default', 'no blank text', 'trusted'):
+        best = None
+        for _ in range(args.repeat):
+            start = time.time()
+            for _ in range(args.copies):
+                Document(xml, parser_options=OPTIONS[name]).token_columns
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        baseline = baseline or best
+        root = Document(xml, parser_options=OPTIONS[name])._xml
+        blank = sum(1 for element in root.iter() for text in (element.text, element.tail)
+                    if text is not None and not text.strip())
+        memory = int(subprocess.check_output([sys.executable, os.path.abspath(__file__), '--xml', args.xml,
+                                              '--copies', str(args.copies), '--memory', name]))
+        print("%-14s %7.3fs  %8.1f docs/s  %5.2fx  %7d blank text nodes  %8d KiB peak" % (
+            name, best, args.copies / best, baseline / best, blank, memory))
+
+
+if __name__ == '__main__':
+    main()
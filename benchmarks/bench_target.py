@@ -0,0 +1,61 @@
+"""
+Benchmarks loading documents with the corenlp_xml.target parser target against building an lxml tree.
+
+Both sides produce the token columns, dependency edges and coreference table of every document;
+the tree side parses with etree.fromstring and reads the fields lazily through XPath:
+
+    python benchmarks/bench_target.py --copies 200 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corenlp_xml.dependencies import iter_dependency_edges
+from corenlp_xml.document import Document
+from corenlp_xml.target import load_columns
+
+
+def load_tree(xml):
+    document = Document(xml)
+    document.token_columns
+    list(iter_dependency_edges(document._xml.xpath('/root/document/sentences/sentence')))
+    document.resolve_coreferences()
+    [sentence.parse_string for sentence in document.sentences]
+    return document
+
+
+def load_target(xml):
+    return load_columns(xml)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--xml', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test',
+                                                      'test.xml'))
+    parser.add_argument('--copies', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.xml, 'rb') as xml_file:
+        xml = xml_file.read()
+    print("python %s, %d documents of %d bytes, best of %d" % (sys.version.split()[0], args.copies, len(xml),
+                                                               args.repeat))
+
+    baseline = None
+    for name, loader in (('tree + xpath', load_tree), ('parser target', load_target)):
+        best = None
+        for _ in range(args.repeat):
+            start = time.time()
+            for _ in range(args.copies):
+                loader(xml)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        baseline = baseline or best
+        print("%-14s %7.3fs  %8.1f docs/s  %5.2fx" % (name, best, args.copies / best, baseline / best))
+
+
+if __name__ == '__main__':
+    main()
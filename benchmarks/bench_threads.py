@@ -0,0 +1,46 @@
+"""
+Benchmarks parsing documents on a thread pool with corenlp_xml.batch.load_documents.
+
+Run it under a free-threaded build (python3.13t) to see parsing scale across cores,
+and under a regular build for comparison:
+
+    python benchmarks/bench_threads.py --copies 200 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corenlp_xml.batch import load_documents, MATERIALIZERS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--xml', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test',
+                                                      'test.xml'))
+    parser.add_argument('--copies', type=int, default=100)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--materialize', nargs='*', default=sorted(MATERIALIZERS))
+    args = parser.parse_args()
+
+    with open(args.xml, 'rb') as xml_file:
+        xml = xml_file.read()
+    sources = [xml] * args.copies
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print("python %s, GIL %s, %d documents, materializing %s" % (
+        sys.version.split()[0], "enabled" if gil else "disabled", args.copies, ", ".join(args.materialize)))
+
+    baseline = None
+    for workers in args.workers:
+        start = time.time()
+        load_documents(sources, workers=workers, materialize=args.materialize)
+        elapsed = time.time() - start
+        baseline = baseline or elapsed
+        print("%3d workers: %7.3fs  %8.1f docs/s  %5.2fx" % (workers, elapsed, args.copies / elapsed,
+                                                          baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
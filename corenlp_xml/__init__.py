@@ -1 +1,18 @@
+"""
+Data abstraction library for Stanford CoreNLP XML parses.
+
+Importing the package is cheap: on Python 3.7 and later, Document is only imported from corenlp_xml.document
+when first accessed. Older interpreters don't support that, so import it from corenlp_xml.document directly:
+
+    from corenlp_xml.document import Document
+"""
 __author__ = 'relwell'
+
+import sys
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name == 'Document':
+            from corenlp_xml.document import Document
+            return Document
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
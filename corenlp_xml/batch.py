@@ -0,0 +1,91 @@
+"""
+Sub-module for parsing many documents in parallel on a thread pool.
+
+lxml releases the GIL while it parses, and building documents, sentences and dependency graphs
+touches no module-level mutable state, so threads scale across cores on free-threaded builds of
+Python and still overlap parsing on regular builds. Unlike a process pool, the parsed documents
+never have to be pickled back to the caller.
+"""
+from multiprocessing.pool import ThreadPool
+from corenlp_xml.document import Document
+
+"""
+The lazily-loaded fields that can be built on the worker threads, and how to build each
+"""
+MATERIALIZERS = (
+    ('token_columns', lambda document: document.token_columns),
+    ('sentences', lambda document: document.sentences),
+    ('tokens', lambda document: [sentence.tokens for sentence in document.sentences]),
+    ('dependencies', lambda document: [(sentence.basic_dependencies, sentence.collapsed_dependencies,
+                                        sentence.collapsed_ccprocessed_dependencies)
+                                       for sentence in document.sentences]),
+    ('coreferences', lambda document: [coreference.mentions for coreference in document.coreferences or []]),
+)
+
+
+class _Loader(object):
+    """
+    Parses one source and builds the requested fields; each call only touches its own document
+    """
+
+    def __init__(self, materialize, thread_safe, parser_options):
+        materializers = dict(MATERIALIZERS)
+        for field in materialize:
+            if field not in materializers:
+                raise ValueError("Can't materialize %r; choose from %s" % (field, ", ".join(sorted(materializers))))
+        self.materialize = materialize
+        self._materializers = tuple(materializers[field] for field in materialize)
+        self.thread_safe = thread_safe
+        self.parser_options = parser_options
+
+    def __call__(self, xml_string):
+        document = Document(xml_string, thread_safe=self.thread_safe, parser_options=self.parser_options)
+        for materializer in self._materializers:
+            materializer(document)
+        return document
+
+
+def load_documents(xml_strings, workers=None, materialize=(), thread_safe=False, chunksize=1, parser_options=None):
+    """
+    Parses documents on a thread pool, optionally building lazily-loaded fields on the workers too
+
+    :param xml_strings: the CoreNLP XML of each document
+    :type xml_strings: iterable of str
+    :param workers: the number of threads, defaults to the number of CPUs
+    :type workers: int
+    :param materialize: names of fields to build up front, from corenlp_xml.batch.MATERIALIZERS
+    :type materialize: tuple of str
+    :param thread_safe: whether the returned documents will be shared between threads
+    :type thread_safe: bool
+    :param chunksize: how many documents to hand each thread at a time
+    :type chunksize: int
+    :param parser_options: keyword arguments for the lxml.etree.XMLParser each thread reuses
+    :type parser_options: dict
+
+    :return: the documents, in the same order as the input
+    :rtype: list of corenlp_xml.document.Document
+
+    """
+    loader = _Loader(tuple(materialize), thread_safe, parser_options)
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(loader, xml_strings, chunksize)
+    finally:
+        pool.terminate()
+
+
+def iter_documents(xml_strings, workers=None, materialize=(), thread_safe=False, chunksize=1, parser_options=None):
+    """
+    Like load_documents, but yields documents in input order as they become available
+
+    :return: a generator of documents
+    :rtype: generator of corenlp_xml.document.Document
+
+    """
+    loader = _Loader(tuple(materialize), thread_safe, parser_options)
+    pool = ThreadPool(workers)
+    try:
+        for document in pool.imap(loader, xml_strings, chunksize):
+            yield document
+    finally:
+        pool.terminate()
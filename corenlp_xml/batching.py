@@ -0,0 +1,311 @@
+"""
+Sub-module for turning sentences into length-bucketed, padded numpy batches of token ids, e.g. to feed taggers
+
+Ids are read from whole token columns and dependency matrices rather than Sentence and Token objects, and
+are drawn from one corenlp_xml.vocabulary.Vocabulary per field. The vocabularies grow as the batcher reads
+and can be saved after training and loaded, frozen, for evaluation, so ids stay the same across jobs:
+
+    batcher = SentenceBatcher(batch_size=64)
+    for batch in batcher.batches('corpus/'):
+        model.train(batch.word, batch.pos, batch.heads, batch.lengths)
+    save_vocabularies(batcher.vocabularies, 'vocabularies/')
+
+Sentences are collected into pools of ``pool_size`` batches, sorted by length and cut into batches, so that
+each batch needs little padding. Documents are read and batches built on a background thread, which stays
+``prefetch`` batches ahead of the consumer. Requires numpy (`pip install corenlp-xml[batching]`).
+"""
+import os
+import threading
+from array import array
+from corenlp_xml.readers import XML_EXTENSIONS, iter_documents, read_path
+from corenlp_xml.vocabulary import Vocabulary
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+FIELDS = ('word', 'pos', 'ner')
+
+PAD = u'<pad>'
+
+UNKNOWN = u'<unk>'
+
+"""
+Head indices of padding, and of tokens without a governor in the dependencies
+"""
+NO_HEAD = -1
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("corenlp_xml.batching requires numpy; install it with `pip install corenlp-xml[batching]`")
+    return numpy
+
+
+def new_vocabulary():
+    """
+    :return: an empty vocabulary with the padding term at id 0 and the unknown term at id 1
+    :rtype: corenlp_xml.vocabulary.Vocabulary
+
+    """
+    vocabulary = Vocabulary(terms=(PAD, UNKNOWN))
+    vocabulary.unknown = UNKNOWN
+    return vocabulary
+
+
+def save_vocabularies(vocabularies, directory):
+    """
+    Writes vocabularies as <field>.json files
+
+    :param vocabularies: vocabularies by field, e.g. SentenceBatcher.vocabularies
+    :type vocabularies: dict
+    :param directory: where to write them
+    :type directory: str
+
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for field, vocabulary in vocabularies.items():
+        vocabulary.save(os.path.join(directory, field + '.json'))
+
+
+def load_vocabularies(directory, frozen=True):
+    """
+    Reads vocabularies written by save_vocabularies
+
+    :param directory: where they were written
+    :type directory: str
+    :param frozen: whether unseen terms map to the unknown id instead of being added
+    :type frozen: bool
+
+    :return: vocabularies by field
+    :rtype: dict
+
+    """
+    return dict((field, Vocabulary.load(os.path.join(directory, field + '.json'), frozen=frozen))
+                for field in FIELDS if os.path.exists(os.path.join(directory, field + '.json')))
+
+
+class Batch(object):
+    """
+    Padded token ids for a batch of sentences, one row per sentence
+    """
+
+    def __init__(self, word, pos, ner, heads, lengths, sentences):
+        """
+        Constructor method
+
+        :param word: word ids, padded with 0
+        :type word: numpy.ndarray
+        :param pos: part-of-speech tag ids, padded with 0
+        :type pos: numpy.ndarray
+        :param ner: named entity tag ids, padded with 0
+        :type ner: numpy.ndarray
+        :param heads: each token's governor as a position in its sentence counting from 1, 0 for ROOT and NO_HEAD
+                      for padding and tokens without a governor
+        :type heads: numpy.ndarray
+        :param lengths: the number of tokens in each sentence
+        :type lengths: numpy.ndarray
+        :param sentences: the (document name, sentence id) of each row
+        :type sentences: list of tuple
+
+        """
+        self.word = word
+        self.pos = pos
+        self.ner = ner
+        self.heads = heads
+        self.lengths = lengths
+        self.sentences = sentences
+
+    def __len__(self):
+        return len(self.sentences)
+
+    @property
+    def mask(self):
+        """
+        :getter: Returns whether each position holds a token rather than padding
+        :type: numpy.ndarray
+
+        """
+        return _numpy().arange(self.word.shape[1])[None, :] < self.lengths[:, None]
+
+
+def _iter_sources(source):
+    """
+    Normalises what SentenceBatcher.batches accepts to (name, document) pairs
+    """
+    from corenlp_xml.document import Document
+    if isinstance(source, Document):
+        yield None, source
+    elif isinstance(source, (type(u''), type(b''))):
+        if os.path.isfile(source) and source.endswith(XML_EXTENSIONS):
+            yield source, Document.from_element(read_path(source))
+        else:
+            for pair in iter_documents(source):
+                yield pair
+    else:
+        for i, item in enumerate(source):
+            yield item if isinstance(item, tuple) else (i, item)
+
+
+class SentenceBatcher(object):
+    """
+    Produces length-bucketed, padded batches of word, POS, NER and dependency head ids
+    """
+
+    def __init__(self, vocabularies=None, batch_size=32, pool_size=100, max_length=None, prefetch=4,
+                 threaded=True, kind='basic-dependencies'):
+        """
+        Constructor method
+
+        :param vocabularies: vocabularies by field, e.g. from load_vocabularies; fields without one get a new one
+        :type vocabularies: dict
+        :param batch_size: the number of sentences in a batch
+        :type batch_size: int
+        :param pool_size: how many batches' worth of sentences are sorted by length together
+        :type pool_size: int
+        :param max_length: skip sentences with more tokens than this
+        :type max_length: int
+        :param prefetch: how many batches the background thread may get ahead of the consumer
+        :type prefetch: int
+        :param threaded: whether to build batches on a background thread
+        :type threaded: bool
+        :param kind: the kind of dependencies to read heads from
+        :type kind: str
+
+        """
+        self.vocabularies = dict(vocabularies or {})
+        for field in FIELDS:
+            if field not in self.vocabularies:
+                self.vocabularies[field] = new_vocabulary()
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.max_length = max_length
+        self.prefetch = prefetch
+        self.threaded = threaded
+        self.kind = kind
+        self.skipped = 0
+
+    def encode(self, document, name=None):
+        """
+        Encodes every sentence of a document
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+        :param name: identifies the document in Batch.sentences
+        :type name: str
+
+        :return: a generator of ((name, sentence id), word, pos, ner, heads) tuples of array.array
+        :rtype: generator of tuple
+
+        """
+        columns = document.token_columns
+        ids = []
+        for field in FIELDS:
+            vocabulary = self.vocabularies[field]
+            ids.append(vocabulary.encode(value if value is not None else UNKNOWN
+                                         for value in getattr(columns, field)))
+        """ Governors are first stored as document token indices plus one, so that ROOT can be 0 """
+        heads = array('i', [NO_HEAD]) * len(columns)
+        matrix = document.dependency_batch(self.kind)
+        for governor, dependent in zip(matrix.row, matrix.col):
+            heads[dependent] = governor + 1
+        for root in matrix.roots:
+            heads[root] = 0
+        for i, sentence_id in enumerate(columns.sentence_ids):
+            start, end = columns.sentence_range(i)
+            if start == end:
+                continue
+            if self.max_length is not None and end - start > self.max_length:
+                self.skipped += 1
+                continue
+            sentence_heads = array('i', [head - start if head > 0 else head for head in heads[start:end]])
+            yield ((name, sentence_id), ids[0][start:end], ids[1][start:end], ids[2][start:end], sentence_heads)
+
+    def _batch(self, rows):
+        numpy = _numpy()
+        width = max(len(row[1]) for row in rows)
+        arrays = [numpy.zeros((len(rows), width), dtype=numpy.int32) for _ in FIELDS]
+        heads = numpy.full((len(rows), width), NO_HEAD, dtype=numpy.int32)
+        for i, row in enumerate(rows):
+            length = len(row[1])
+            for column, values in zip(arrays, row[1:4]):
+                column[i, :length] = values
+            heads[i, :length] = row[4]
+        lengths = numpy.array([len(row[1]) for row in rows], dtype=numpy.int32)
+        return Batch(arrays[0], arrays[1], arrays[2], heads, lengths, [row[0] for row in rows])
+
+    def _flush(self, pool):
+        pool.sort(key=lambda row: len(row[1]))
+        for start in range(0, len(pool), self.batch_size):
+            yield self._batch(pool[start:start + self.batch_size])
+
+    def _iter_batches(self, source):
+        pool = []
+        capacity = self.batch_size * self.pool_size
+        for name, document in _iter_sources(source):
+            for row in self.encode(document, name):
+                pool.append(row)
+                if len(pool) == capacity:
+                    for batch in self._flush(pool):
+                        yield batch
+                    pool = []
+        if pool:
+            for batch in self._flush(pool):
+                yield batch
+
+    def _produce(self, source, queue, stop):
+        """
+        Builds batches on the background thread, handing them over through a bounded queue
+        """
+        try:
+            for batch in self._iter_batches(source):
+                queue.put(batch)
+                if stop.is_set():
+                    break
+            queue.put(None)
+        except Exception as e:
+            queue.put(e)
+
+    def batches(self, source):
+        """
+        Batches the sentences of documents
+
+        :param source: a document, an iterable of documents or (name, document) pairs, a CoreNLP XML file,
+                       or a directory or tar archive of them
+        :type source: corenlp_xml.document.Document or iterable or str
+
+        :return: a generator of batches, shortest sentences first within each pool
+        :rtype: generator of corenlp_xml.batching.Batch
+
+        """
+        _numpy()
+        if not self.threaded:
+            for batch in self._iter_batches(source):
+                yield batch
+            return
+        queue = Queue(self.prefetch)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(source, queue, stop))
+        producer.daemon = True
+        producer.start()
+        done = False
+        try:
+            while True:
+                batch = queue.get()
+                done = batch is None or isinstance(batch, Exception)
+                if batch is None:
+                    break
+                if done:
+                    raise batch
+                yield batch
+        finally:
+            """ Unblock the producer if the consumer stopped part way through """
+            stop.set()
+            while not done:
+                batch = queue.get()
+                done = batch is None or isinstance(batch, Exception)
+            producer.join()
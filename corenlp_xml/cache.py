@@ -0,0 +1,202 @@
+"""
+Sub-module for caching materialized documents and sentences by a hash of their XML
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from lxml import etree
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def content_key(xml):
+    """
+    Hashes XML content into a cache key
+
+    :param xml: raw XML, or an element to serialize
+    :type xml: str or lxml.etree.ElementBase
+
+    :return: the hex digest of the content
+    :rtype: str
+
+    """
+    if etree.iselement(xml):
+        xml = etree.tostring(xml, with_tail=False)
+    elif not isinstance(xml, bytes):
+        xml = xml.encode('utf-8')
+    return hashlib.sha1(xml).hexdigest()
+
+
+class ResultCache(object):
+    """
+    A memory-bounded LRU of materialized objects keyed by content hash, with an optional on-disk tier.
+
+    Entries are weighted by the size of the XML they were built from, which is a cheap stand-in
+    for the memory the materialized objects take up; elements are serialized and reparsed before
+    building, so cached objects hold on to that XML and nothing more. Objects evicted from memory
+    stay on disk if a directory is configured and they can be pickled, and disk hits are promoted
+    back into memory. The on-disk tier is not bounded: nothing is ever deleted from the directory,
+    so it should be cleared or pruned by whoever owns it.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+        """
+        Constructor method
+
+        :param max_bytes: the total XML size the in-memory tier may hold
+        :type max_bytes: int
+        :param directory: where to keep the on-disk tier, if at all
+        :type directory: str
+
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """
+        Looks up an object, promoting it to most recently used
+
+        :param key: the content key
+        :type key: str
+
+        :return: the cached object, or None on a miss
+        :rtype: object
+
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+                self.hits += 1
+                return entry[0]
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        value, size = entry
+        self.put(key, value, size)
+        return value
+
+    def put(self, key, value, size):
+        """
+        Stores an object, evicting the least recently used ones to stay within max_bytes
+
+        :param key: the content key
+        :type key: str
+        :param value: the materialized object
+        :type value: object
+        :param size: the size of the XML the object was built from
+        :type size: int
+
+        """
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        self._store(key, value, size)
+
+    def get_or_build(self, xml, builder):
+        """
+        Returns the cached object for some XML, building and caching it on a miss
+
+        :param xml: raw XML or an element
+        :type xml: str or lxml.etree.ElementBase
+        :param builder: called with the XML to build the object on a miss; elements are passed as a detached copy
+        :type builder: callable
+
+        :return: the materialized object
+        :rtype: object
+
+        """
+        serialized = etree.tostring(xml, with_tail=False) if etree.iselement(xml) else xml
+        key = content_key(serialized)
+        value = self.get(key)
+        if value is None:
+            value = builder(etree.fromstring(serialized) if etree.iselement(xml) else xml)
+            self.put(key, value, len(serialized))
+        return value
+
+    def document(self, xml_string):
+        """
+        Returns a cached Document for identical XML, parsing it on a miss
+
+        :param xml_string: the CoreNLP XML
+        :type xml_string: str
+
+        :return: the document
+        :rtype: corenlp_xml.document.Document
+
+        """
+        from corenlp_xml.document import Document
+        return self.get_or_build(xml_string, lambda xml: Document(xml, cache=self))
+
+    def sentence(self, element, thread_safe=False):
+        """
+        Returns a cached Sentence for a sentence element with identical content
+
+        :param element: a sentence element
+        :type element: lxml.etree.ElementBase
+        :param thread_safe: whether a newly built sentence will be shared between threads;
+                            a cache shared between threads should always be asked for thread-safe sentences
+        :type thread_safe: bool
+
+        :return: the sentence
+        :rtype: corenlp_xml.document.Sentence
+
+        """
+        from corenlp_xml.document import Sentence
+        return self.get_or_build(element, lambda xml: Sentence(xml, thread_safe))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def _load(self, key):
+        """
+        Reads an entry back from the on-disk tier
+
+        :return: the object and the size it is weighted by, or None if it isn't on disk
+        :rtype: tuple
+
+        """
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        with open(self._path(key), 'rb') as cache_file:
+            return pickle.load(cache_file)
+
+    def _store(self, key, value, size):
+        if self.directory is None or os.path.exists(self._path(key)):
+            return
+        try:
+            data = pickle.dumps((value, size), pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError):
+            """ Unpicklable objects only live in memory """
+            return
+        temporary = '%s.%d.%d' % (self._path(key), os.getpid(), threading.current_thread().ident)
+        with open(temporary, 'wb') as cache_file:
+            cache_file.write(data)
+        os.rename(temporary, self._path(key))
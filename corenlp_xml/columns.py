@@ -0,0 +1,187 @@
+"""
+Sub-module for array-backed, column-oriented access to token annotations
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from corenlp_xml.fields import TOKEN_EXTRAS
+
+"""
+Maps each token child tag to the column it fills and the converter applied to its text
+"""
+TOKEN_FIELDS = (
+    ('word', 'word', None),
+    ('lemma', 'lemma', None),
+    ('character_offset_begin', 'CharacterOffsetBegin', int),
+    ('character_offset_end', 'CharacterOffsetEnd', int),
+    ('pos', 'POS', None),
+    ('ner', 'NER', None),
+    ('speaker', 'Speaker', None),
+)
+
+
+class TokenColumns(object):
+    """
+    Holds every token of a document as parallel columns, one entry per token in document order.
+
+    Integer columns are ``array.array`` instances, with -1 standing in for a missing value.
+    String columns are lists, with None standing in for a missing value.
+    Fields registered with corenlp_xml.fields.register_token_field are lists in ``extra``, keyed by name.
+    """
+
+    def __init__(self):
+        """
+        Constructor method; use TokenColumns.from_sentence_elements to populate an instance
+        """
+        self.sentence_id = array('i')
+        self.token_id = array('i')
+        self.sentence_ids = array('i')
+        self.sentence_starts = array('i')
+        for name, _, converter in TOKEN_FIELDS:
+            setattr(self, name, array('i') if converter is int else [])
+        self.extra_fields = TOKEN_EXTRAS.fields.specs
+        self.extra = dict((spec.name, []) for spec in self.extra_fields)
+
+    @classmethod
+    def from_sentence_elements(cls, sentence_elements):
+        """
+        Builds the columns with a single scan over the children of each token element
+
+        :param sentence_elements: the sentence elements, in document order
+        :type sentence_elements: list of lxml.etree.ElementBase
+
+        :return: the populated columns
+        :rtype: corenlp_xml.columns.TokenColumns
+
+        """
+        columns = cls()
+        dispatch = dict((tag, (getattr(columns, name), converter)) for name, tag, converter in TOKEN_FIELDS)
+        defaults = [(column, -1 if converter is int else None) for column, converter in dispatch.values()]
+        extras = dict()
+        for spec in columns.extra_fields:
+            if spec.tag is not None:
+                extras.setdefault(spec.tag, []).append((columns.extra[spec.name], spec))
+        attributes = [(columns.extra[spec.name], spec) for spec in columns.extra_fields if spec.tag is None]
+        extra_defaults = [(columns.extra[spec.name], spec.default) for spec in columns.extra_fields]
+        for sentence_element in sentence_elements:
+            sentence_id = int(sentence_element.get('id'))
+            columns.sentence_ids.append(sentence_id)
+            columns.sentence_starts.append(len(columns.token_id))
+            for token_element in sentence_element.iterfind('tokens/token'):
+                columns.sentence_id.append(sentence_id)
+                columns.token_id.append(int(token_element.get('id')))
+                length = len(columns.token_id)
+                for child in token_element:
+                    field = dispatch.get(child.tag)
+                    if field is not None:
+                        column, converter = field
+                        column.append(converter(child.text) if converter is not None else child.text)
+                    if extras:
+                        for column, spec in extras.get(child.tag, ()):
+                            raw = spec.read(child)
+                            if raw is not None and len(column) < length:
+                                column.append(spec.convert(raw))
+                for column, spec in attributes:
+                    column.append(spec.convert(token_element.get(spec.attribute)))
+                for column, default in defaults:
+                    if len(column) < length:
+                        column.append(default)
+                for column, default in extra_defaults:
+                    if len(column) < length:
+                        column.append(default)
+        return columns
+
+    def __len__(self):
+        return len(self.token_id)
+
+    def sentence_range(self, sentence_index):
+        """
+        The slice of the columns covering a sentence
+
+        :param sentence_index: the position of the sentence within the document, starting at 0
+        :type sentence_index: int
+
+        :return: the start and end index into the columns
+        :rtype: tuple
+
+        """
+        start = self.sentence_starts[sentence_index]
+        if sentence_index + 1 < len(self.sentence_starts):
+            return start, self.sentence_starts[sentence_index + 1]
+        return start, len(self)
+
+
+class OffsetIndex(object):
+    """
+    Sorted character offset arrays over token columns, answering offset and span queries by binary search
+    """
+
+    def __init__(self, columns):
+        """
+        Builds the sorted arrays in one pass over the offset columns
+
+        :param columns: the token columns to index
+        :type columns: corenlp_xml.columns.TokenColumns
+
+        """
+        begins, ends = columns.character_offset_begin, columns.character_offset_end
+        order = [i for i in range(len(columns)) if begins[i] > -1]
+        if any(begins[a] > begins[b] for a, b in zip(order, order[1:])):
+            order.sort(key=lambda i: begins[i])
+        self.order = array('i', order)
+        self.begins = array('i', [begins[i] for i in order])
+        self.ends = array('i', [ends[i] for i in order])
+
+    def index_at(self, position):
+        """
+        Finds the token covering a character offset
+
+        :param position: the character offset
+        :type position: int
+
+        :return: the index into the token columns, or None if no token covers the offset
+        :rtype: int
+
+        """
+        i = bisect_right(self.begins, position) - 1
+        if i > -1 and position < self.ends[i]:
+            return self.order[i]
+        return None
+
+    def indices_in_span(self, begin, end):
+        """
+        Finds the tokens overlapping a span of characters
+
+        :param begin: the offset the span starts at
+        :type begin: int
+        :param end: the offset the span ends before
+        :type end: int
+
+        :return: the indices into the token columns, in offset order
+        :rtype: list of int
+
+        """
+        return list(self.order[bisect_right(self.ends, begin):bisect_left(self.begins, end)])
+
+    def align(self, spans):
+        """
+        Finds the tokens overlapping each of many spans with a single sweep over the spans sorted by offset
+
+        :param spans: (begin, end) character offset pairs
+        :type spans: list of tuple
+
+        :return: the indices into the token columns for each span, in the order the spans were given
+        :rtype: list of list of int
+
+        """
+        results = [None] * len(spans)
+        count = len(self.begins)
+        lo = 0
+        for n in sorted(range(len(spans)), key=lambda n: spans[n][0]):
+            begin, end = spans[n]
+            while lo < count and self.ends[lo] <= begin:
+                lo += 1
+            hi = lo
+            while hi < count and self.begins[hi] < end:
+                hi += 1
+            results[n] = list(self.order[lo:hi])
+        return results
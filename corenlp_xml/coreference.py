@@ -1,6 +1,14 @@
 """
 This library is responsible for handling coreference resolution parsing from the XML output
 """
+from array import array
+from corenlp_xml.fields import MENTION_EXTRAS
+from corenlp_xml.locking import field_locks
+
+"""
+The children of a <mention> read by Mention
+"""
+MENTION_CHILDREN = frozenset(('start', 'end', 'sentence', 'head', 'text'))
 
 
 class Coreference():
@@ -22,6 +30,7 @@ class Coreference():
         self._mentions = None
         self._representative = None
         self.document = document
+        self._locks = field_locks(getattr(document, 'thread_safe', False), 'mentions')
 
     @property
     def mentions(self):
@@ -33,12 +42,15 @@ class Coreference():
 
         """
         if self._mentions is None:
-            self._mentions = []
-            for mention_element in self._element.xpath('mention'):
-                this_mention = Mention(self, mention_element)
-                self._mentions.append(this_mention)
-                if this_mention.representative:
-                    self._representative = this_mention
+            with self._locks['mentions']:
+                if self._mentions is None:
+                    mentions = []
+                    for mention_element in self._element.xpath('mention'):
+                        this_mention = Mention(self, mention_element)
+                        mentions.append(this_mention)
+                        if this_mention.representative:
+                            self._representative = this_mention
+                    self._mentions = mentions
         return self._mentions
 
     @property
@@ -73,14 +85,29 @@ class Mention():
         """
         self._coref = coref
         self._element = element
-        self._start = int(element.xpath('start/text()')[0])
-        self._end = int(element.xpath('end/text()')[0])
-        self._sentence_id = int(element.xpath('sentence/text()')[0])
         self._sentence = None
-        self._head_id = int(element.xpath('head/text()')[0])
         self._head = None
-        texts = element.xpath('text/text()')
-        self.text = texts[0] if len(texts) > 0 else ''  # one-off bug?
+        self.text = ''
+        """ One scan over the children reads the built-in fields and any registered with register_mention_field """
+        values = dict()
+        fields = MENTION_EXTRAS.fields
+        extras = fields.by_tag
+        for child in element:
+            if child.tag in MENTION_CHILDREN:
+                values.setdefault(child.tag, child.text)
+            if extras:
+                for spec in extras.get(child.tag, ()):
+                    if values.get(spec.name) is None:
+                        values[spec.name] = spec.read(child)
+        self._start = int(values['start'])
+        self._end = int(values['end'])
+        self._sentence_id = int(values['sentence'])
+        self._head_id = int(values['head'])
+        if values.get('text') is not None:
+            self.text = values['text']
+        for spec in fields.attributes:
+            values[spec.name] = element.get(spec.attribute)
+        self.extra = dict((spec.name, spec.convert(values.get(spec.name))) for spec in fields)
 
     @property
     def sentence(self):
@@ -91,10 +118,14 @@ class Mention():
         :type: corenlp_xml.document.Sentence
 
         """
+        document = self._coref.document
+        if getattr(document, 'max_resident_sentences', None) is not None:
+            """ Memoizing would keep evicted sentences alive, so documents with a bound are always asked """
+            return document.get_sentence_by_id(self._sentence_id)
         if self._sentence is None:
             sentences = self._element.xpath('sentence/text()')
             if len(sentences) > 0:
-                self._sentence = self._coref.document.get_sentence_by_id(int(sentences[0]))
+                self._sentence = document.get_sentence_by_id(int(sentences[0]))
         return self._sentence
 
     @property
@@ -128,8 +159,10 @@ class Mention():
         :type: corenlp_xml.document.Token
 
         """
+        if getattr(self._coref.document, 'max_resident_sentences', None) is not None:
+            return self.sentence.get_token_by_id(self._head_id)
         if self._head is None:
-            self._head = self.sentence.tokens[self._head_id-1]
+            self._head = self.sentence.get_token_by_id(self._head_id)
         return self._head
 
     @property
@@ -142,3 +175,90 @@ class Mention():
 
         """
         return self._element.get('representative', False) == 'true'
+
+
+class CoreferenceTable(object):
+    """
+    Every mention of every coreference chain in a document, resolved to token positions.
+
+    Rows are stored as parallel arrays, grouped by sentence and ordered by start token within each sentence.
+    Token IDs follow the XML, so ``end`` is exclusive. The ``*_index`` columns point into the
+    document's corenlp_xml.columns.TokenColumns.
+    """
+
+    COLUMNS = ('chain', 'sentence', 'start', 'end', 'head', 'start_index', 'end_index', 'head_index')
+
+    def __init__(self):
+        """
+        Constructor method; use CoreferenceTable.from_document to populate an instance
+        """
+        for name in self.COLUMNS:
+            setattr(self, name, array('i'))
+        self.representative = array('b')
+
+    @classmethod
+    def from_document(cls, document):
+        """
+        Resolves all mentions with one pass over the mention elements and one lookup of each sentence's token range
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+
+        :return: the populated table
+        :rtype: corenlp_xml.coreference.CoreferenceTable
+
+        """
+        rows = []
+        for chain, coreference in enumerate(document._tree().xpath('/root/document/coreference/coreference')):
+            for mention in coreference.iterfind('mention'):
+                rows.append((int(mention.findtext('sentence')), int(mention.findtext('start')), chain,
+                             int(mention.findtext('end')), int(mention.findtext('head')),
+                             mention.get('representative') == 'true'))
+        return cls.from_rows(rows, document.token_columns)
+
+    @classmethod
+    def from_rows(cls, rows, columns):
+        """
+        Sorts and resolves raw mention rows against a document's token columns
+
+        :param rows: (sentence, start, chain, end, head, representative) tuples, in any order
+        :type rows: list of tuple
+        :param columns: the token columns of the document the mentions belong to
+        :type columns: corenlp_xml.columns.TokenColumns
+
+        :return: the populated table
+        :rtype: corenlp_xml.coreference.CoreferenceTable
+
+        """
+        rows.sort()
+        sentence_starts = dict(zip(columns.sentence_ids, columns.sentence_starts))
+        table = cls()
+        for sentence, start, chain, end, head, representative in rows:
+            offset = sentence_starts[sentence] - 1
+            for name, value in zip(cls.COLUMNS, (chain, sentence, start, end, head,
+                                                 offset + start, offset + end, offset + head)):
+                getattr(table, name).append(value)
+            table.representative.append(representative)
+        return table
+
+    def __len__(self):
+        return len(self.chain)
+
+    def __iter__(self):
+        """
+        Iterates over (chain, sentence, start, end, head) rows
+        """
+        return iter(zip(self.chain, self.sentence, self.start, self.end, self.head))
+
+    def rows_for_chain(self, chain):
+        """
+        Finds the rows belonging to a chain
+
+        :param chain: the position of the chain in Document.coreferences
+        :type chain: int
+
+        :return: the row indices
+        :rtype: list of int
+
+        """
+        return [i for i, value in enumerate(self.chain) if value == chain]
@@ -0,0 +1,432 @@
+"""
+Sub-module for counting n-grams, POS patterns and dependency triples over corpora with bounded memory.
+
+Files are sharded across a process pool. Each worker counts keys as tuples of integer ids from its own
+corenlp_xml.vocabulary.Vocabulary, reading whole token columns and dependency matrices rather than Sentence
+and Token objects. Whenever a worker holds more than ``max_items`` distinct keys, it decodes them and spills
+them to disk as a sorted run. The runs of all workers are then merged in one streaming pass per counter,
+so neither the workers nor the merge ever hold a whole table in memory:
+
+    tables = count_corpus('corpus/', [NgramCounter('lemma', 2), DependencyCounter()], 'counts/', workers=4)
+    tables.top_k('lemma_2gram', 20)
+    tables.pmi('lemma_2gram', 20, min_count=5)
+"""
+import heapq
+import io
+import math
+import os
+import tempfile
+from collections import Counter
+from multiprocessing import Pool
+from corenlp_xml.readers import XML_EXTENSIONS, read_path
+from corenlp_xml.vocabulary import Vocabulary
+
+DEFAULT_MAX_ITEMS = 1 << 20
+
+"""
+How many sorted runs are merged at once; more runs are merged in several rounds
+"""
+FAN_IN = 64
+
+
+def _clean(term):
+    """ Keys are written one per line with tab-separated parts """
+    return term.replace(u'\t', u' ').replace(u'\n', u' ')
+
+
+class NgramCounter(object):
+    """
+    Counts the n-grams of a string token column within sentences, e.g. lemma bigrams or POS trigrams
+    """
+
+    def __init__(self, field='lemma', n=2, name=None):
+        """
+        Constructor method
+
+        :param field: the token column, e.g. "lemma" or "pos"
+        :type field: str
+        :param n: the number of consecutive tokens
+        :type n: int
+        :param name: the name of the table, defaults to e.g. "lemma_2gram"
+        :type name: str
+
+        """
+        self.field = field
+        self.n = n
+        self.name = name if name is not None else '%s_%dgram' % (field, n)
+
+    def count(self, document, encode, counts):
+        """
+        Adds the n-grams of a document to integer-encoded counts; n-grams with a missing value are skipped
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+        :param encode: maps a string to its integer id
+        :type encode: callable
+        :param counts: the counts to add to, keyed by tuples of ids
+        :type counts: collections.Counter
+
+        """
+        columns = document.token_columns
+        ids = [encode(value) if value is not None else None for value in getattr(columns, self.field)]
+        n = self.n
+        for i in range(len(columns.sentence_starts)):
+            start, end = columns.sentence_range(i)
+            for position in range(start, end - n + 1):
+                key = tuple(ids[position:position + n])
+                if None not in key:
+                    counts[key] += 1
+
+
+class DependencyCounter(object):
+    """
+    Counts (governor, relation, dependent) triples of one kind of dependencies, read from a token column
+    """
+
+    def __init__(self, kind='collapsed-ccprocessed', field='lemma', name=None):
+        """
+        Constructor method
+
+        :param kind: the kind of dependencies
+        :type kind: str
+        :param field: the token column standing in for governors and dependents
+        :type field: str
+        :param name: the name of the table, defaults to "dependency_triples"
+        :type name: str
+
+        """
+        self.kind = kind
+        self.field = field
+        self.name = name if name is not None else 'dependency_triples'
+
+    def count(self, document, encode, counts):
+        """
+        Adds the dependency triples of a document to integer-encoded counts; edges from ROOT are skipped
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+        :param encode: maps a string to its integer id
+        :type encode: callable
+        :param counts: the counts to add to, keyed by tuples of ids
+        :type counts: collections.Counter
+
+        """
+        column = getattr(document.token_columns, self.field)
+        matrix = document.dependency_batch(self.kind)
+        relations = [encode(relation) for relation in matrix.relations.terms]
+        for governor, dependent, relation in zip(matrix.row, matrix.col, matrix.data):
+            if column[governor] is not None and column[dependent] is not None:
+                counts[(encode(column[governor]), relations[relation], encode(column[dependent]))] += 1
+
+
+def _marginal_counters(counters):
+    """
+    Adds a unigram counter for every n-gram field, which PMI tables need for their marginals
+    """
+    orders = set((counter.field, counter.n) for counter in counters if isinstance(counter, NgramCounter))
+    extra = []
+    for counter in counters:
+        if isinstance(counter, NgramCounter) and (counter.field, 1) not in orders:
+            orders.add((counter.field, 1))
+            extra.append(NgramCounter(counter.field, 1))
+    return list(counters) + extra
+
+
+def _write_run(path, rows):
+    with io.open(path, 'w', encoding='utf-8') as run:
+        for key, count in rows:
+            run.write(u'\t'.join(key) + u'\t%d\n' % count)
+
+
+def _read_run(path):
+    with io.open(path, 'r', encoding='utf-8') as run:
+        for line in run:
+            parts = line.rstrip(u'\n').split(u'\t')
+            yield tuple(parts[:-1]), int(parts[-1])
+
+
+def _spill(counts, vocabulary, directory, prefix):
+    """
+    Decodes and sorts integer-encoded counts, writing them to a new run file
+
+    :return: the path of the run
+    :rtype: str
+
+    """
+    terms = [_clean(term) for term in vocabulary.terms]
+    rows = sorted((tuple(terms[i] for i in key), count) for key, count in counts.items())
+    handle, path = tempfile.mkstemp(prefix=prefix + '.', suffix='.run', dir=directory)
+    os.close(handle)
+    _write_run(path, rows)
+    return path
+
+
+def _count_shard(job):
+    """
+    Counts the files of one shard in a worker, spilling sorted runs whenever it holds too many keys
+
+    :param job: the shard's paths, the counters, the run directory and max_items
+    :type job: tuple
+
+    :return: the run files written, as (counter name, path) pairs
+    :rtype: list of tuple
+
+    """
+    from corenlp_xml.document import Document
+    paths, counters, directory, max_items = job
+    vocabulary = Vocabulary()
+    encode = vocabulary.add
+    counts = dict((counter.name, Counter()) for counter in counters)
+    runs = []
+
+    def spill():
+        for name, table in counts.items():
+            if table:
+                runs.append((name, _spill(table, vocabulary, directory, name)))
+                table.clear()
+
+    for path in paths:
+        document = Document.from_element(read_path(path, threaded=False))
+        for counter in counters:
+            counter.count(document, encode, counts[counter.name])
+        if sum(len(table) for table in counts.values()) > max_items:
+            spill()
+            """ Ids only need to be stable within a run, so the vocabulary is reset along with the counts """
+            vocabulary = Vocabulary()
+            encode = vocabulary.add
+    spill()
+    return runs
+
+
+def merge_runs(paths):
+    """
+    Merges sorted runs, summing the counts of equal keys
+
+    :param paths: the run files
+    :type paths: list of str
+
+    :return: a generator of (key, count) pairs, sorted by key
+    :rtype: generator of tuple
+
+    """
+    current, total = None, 0
+    for key, count in heapq.merge(*[_read_run(path) for path in paths]):
+        if key != current:
+            if current is not None:
+                yield current, total
+            current, total = key, 0
+        total += count
+    if current is not None:
+        yield current, total
+
+
+def _merge_all(paths, destination, directory):
+    """
+    Merges any number of runs into one sorted table, at most FAN_IN runs at a time
+
+    :return: the total of all counts
+    :rtype: int
+
+    """
+    paths = list(paths)
+    while len(paths) > FAN_IN:
+        handle, merged = tempfile.mkstemp(suffix='.run', dir=directory)
+        os.close(handle)
+        _write_run(merged, merge_runs(paths[:FAN_IN]))
+        for path in paths[:FAN_IN]:
+            os.remove(path)
+        paths = paths[FAN_IN:] + [merged]
+    total = [0]
+
+    def rows():
+        for key, count in merge_runs(paths):
+            total[0] += count
+            yield key, count
+
+    _write_run(destination, rows())
+    for path in paths:
+        os.remove(path)
+    return total[0]
+
+
+class CountTables(object):
+    """
+    The merged tables of a counting job, one sorted file per counter, read back as streams
+    """
+
+    def __init__(self, directory, totals, ngrams=None):
+        """
+        Constructor method; use corenlp_xml.counts.count_corpus to create an instance
+
+        :param directory: where the tables are
+        :type directory: str
+        :param totals: the sum of the counts in each table, by name
+        :type totals: dict
+        :param ngrams: the field and n of each n-gram table, by name
+        :type ngrams: dict
+
+        """
+        self.directory = directory
+        self.totals = totals
+        self.ngrams = ngrams if ngrams is not None else dict()
+
+    @property
+    def names(self):
+        """
+        :getter: Returns the names of the tables
+        :type: list of str
+
+        """
+        return sorted(self.totals)
+
+    def path(self, name):
+        """
+        :param name: the name of a table
+        :type name: str
+
+        :return: the path of the table's file
+        :rtype: str
+
+        """
+        return os.path.join(self.directory, name + '.tsv')
+
+    def iter_counts(self, name):
+        """
+        Streams a table
+
+        :param name: the name of the table
+        :type name: str
+
+        :return: a generator of (key, count) pairs, sorted by key; keys are tuples of strings
+        :rtype: generator of tuple
+
+        """
+        return _read_run(self.path(name))
+
+    def counts(self, name):
+        """
+        Loads a whole table into memory
+
+        :param name: the name of the table
+        :type name: str
+
+        :return: the counts
+        :rtype: collections.Counter
+
+        """
+        return Counter(dict(self.iter_counts(name)))
+
+    def top_k(self, name, k):
+        """
+        Finds the most frequent keys of a table, holding only k rows in memory
+
+        :param name: the name of the table
+        :type name: str
+        :param k: how many keys to return
+        :type k: int
+
+        :return: (key, count) pairs, most frequent first, with ties broken by key
+        :rtype: list of tuple
+
+        """
+        top = heapq.nsmallest(k, ((-count, key) for key, count in self.iter_counts(name)))
+        return [(key, -count) for count, key in top]
+
+    def pmi(self, name, k, min_count=1):
+        """
+        Ranks the n-grams of an n-gram table by pointwise mutual information, i.e. by
+        log(p(w1 ... wn) / (p(w1) ... p(wn))) with probabilities estimated from the n-gram and unigram tables
+
+        :param name: the name of an n-gram table, e.g. "lemma_2gram"; a unigram table of the same field is needed
+        :type name: str
+        :param k: how many n-grams to return
+        :type k: int
+        :param min_count: ignore n-grams seen fewer times than this, whose PMI is unreliable
+        :type min_count: int
+
+        :return: (key, count, pmi) tuples, highest PMI first
+        :rtype: list of tuple
+
+        """
+        if name not in self.ngrams:
+            raise ValueError("PMI of %s needs an n-gram table" % name)
+        field = self.ngrams[name][0]
+        unigram_names = [other for other, order in sorted(self.ngrams.items()) if order == (field, 1)]
+        if not unigram_names:
+            raise ValueError("PMI of %s needs a unigram table of %s" % (name, field))
+        unigram_name = unigram_names[0]
+        unigrams = dict((key[0], count) for key, count in self.iter_counts(unigram_name))
+        log_unigram_total = math.log(self.totals[unigram_name])
+        log_total = math.log(self.totals[name])
+
+        def scores():
+            for key, count in self.iter_counts(name):
+                if count >= min_count:
+                    score = math.log(count) - log_total - sum(math.log(unigrams[term]) - log_unigram_total
+                                                              for term in key)
+                    yield -score, key, count
+
+        return [(key, count, -score) for score, key, count in heapq.nsmallest(k, scores())]
+
+
+def list_files(path):
+    """
+    Lists the CoreNLP XML files under a directory, in a stable order
+
+    :param path: the directory
+    :type path: str
+
+    :return: the file paths
+    :rtype: list of str
+
+    """
+    return [os.path.join(directory, filename)
+            for directory, _, filenames in sorted(os.walk(path))
+            for filename in sorted(filenames) if filename.endswith(XML_EXTENSIONS)]
+
+
+def count_corpus(paths, counters, directory=None, workers=1, max_items=DEFAULT_MAX_ITEMS):
+    """
+    Counts a corpus, sharding its files across a process pool and merging the workers' runs
+
+    :param paths: a directory of CoreNLP XML files, which may be compressed, or a list of file paths
+    :type paths: str or list of str
+    :param counters: what to count, e.g. corenlp_xml.counts.NgramCounter instances; a unigram counter is added
+                     for the field of every n-gram counter without one, so that its PMI can be computed
+    :type counters: list
+    :param directory: where to write runs and tables, defaults to a new temporary directory
+    :type directory: str
+    :param workers: the number of processes; 1 counts in this process
+    :type workers: int
+    :param max_items: how many distinct keys a worker may hold before spilling them to disk
+    :type max_items: int
+
+    :return: the merged tables
+    :rtype: corenlp_xml.counts.CountTables
+
+    """
+    if not isinstance(paths, (list, tuple)):
+        paths = list_files(paths)
+    directory = directory if directory is not None else tempfile.mkdtemp(prefix='corenlp-counts.')
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    counters = _marginal_counters(counters)
+    jobs = [(paths[shard::workers], counters, directory, max_items) for shard in range(workers)]
+    if workers > 1:
+        pool = Pool(workers)
+        try:
+            results = pool.map(_count_shard, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_count_shard(job) for job in jobs]
+    runs = dict((counter.name, []) for counter in counters)
+    for result in results:
+        for name, path in result:
+            runs[name].append(path)
+    tables = CountTables(directory, dict(), dict((counter.name, (counter.field, counter.n)) for counter in counters
+                                                 if isinstance(counter, NgramCounter)))
+    for name, paths in runs.items():
+        tables.totals[name] = _merge_all(paths, tables.path(name), directory)
+    return tables
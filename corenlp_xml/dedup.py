@@ -0,0 +1,401 @@
+"""
+Sub-module for finding near-duplicate sentences across a corpus, e.g. to drop scraped boilerplate.
+
+Each sentence is reduced to a MinHash signature over the shingles of consecutive lemmas in its tokens,
+read from the document's token columns. Every distinct lemma is hashed once; shingle hashes and the
+permutations of the signature are then computed for all sentences of a document at once, with numpy if it is
+installed (`pip install corenlp-xml[dedup]`) and in plain Python otherwise, with identical results.
+
+Candidate pairs are found with locality-sensitive hashing: signatures are cut into bands, and sentences sharing
+the hash of any band land in the same bucket. LSHIndex keeps the buckets and signatures in SQLite, so the index
+lives on disk, grows as new documents arrive, and can be reopened later:
+
+    with LSHIndex('sentences.db', threshold=0.8) as index:
+        for name, document in documents:
+            duplicates = index.add(name, document)
+"""
+import hashlib
+import sqlite3
+import struct
+import zlib
+from array import array
+
+"""
+Hashes are taken modulo this Mersenne prime, so every product fits in 64 bits
+"""
+PRIME = (1 << 31) - 1
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+"""
+How many shingles to permute at once on the vectorized path
+"""
+CHUNK_SHINGLES = 4096
+
+
+def _parameter(seed, name, i, low):
+    """ Derives a permutation parameter from the seed, identically on every platform and Python version """
+    digest = hashlib.sha1(('%d:%s:%d' % (seed, name, i)).encode('ascii')).digest()
+    return low + struct.unpack('<Q', digest[:8])[0] % (PRIME - low)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def jaccard(signature, other):
+    """
+    Estimates the Jaccard similarity of the shingles behind two signatures
+
+    :param signature: a MinHash signature
+    :type signature: array.array
+    :param other: another signature with the same number of permutations
+    :type other: array.array
+
+    :return: the fraction of permutations whose minimums agree
+    :rtype: float
+
+    """
+    return float(sum(1 for a, b in zip(signature, other) if a == b)) / len(signature)
+
+
+def optimal_bands(num_perm, threshold):
+    """
+    Picks the number of LSH bands for a similarity threshold, such that pairs right at the threshold
+    become candidates about half the time
+
+    :param num_perm: the number of permutations in each signature
+    :type num_perm: int
+    :param threshold: the Jaccard similarity above which sentences count as near-duplicates
+    :type threshold: float
+
+    :return: the number of bands, which divides num_perm
+    :rtype: int
+
+    """
+    choices = [bands for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    return min(choices, key=lambda bands: abs((1.0 / bands) ** (float(bands) / num_perm) - threshold))
+
+
+class _Hashes(dict):
+    """
+    Caches the hash of each lemma, computing it on a miss
+    """
+
+    def __missing__(self, lemma):
+        value = self[lemma] = (zlib.crc32(lemma.encode('utf-8')) & 0xffffffff) % PRIME
+        return value
+
+
+class MinHasher(object):
+    """
+    Computes MinHash signatures of the sentences of documents
+    """
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE, seed=1, vectorized=None):
+        """
+        Constructor method
+
+        :param num_perm: the number of permutations, i.e. the length of each signature
+        :type num_perm: int
+        :param shingle_size: the number of consecutive lemmas in each shingle; shorter sentences are one shingle
+        :type shingle_size: int
+        :param seed: seeds the permutations; signatures are only comparable between hashers with the same seed
+        :type seed: int
+        :param vectorized: whether to compute with numpy, defaults to whether it is installed
+        :type vectorized: bool
+
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.multipliers = [_parameter(seed, 'a', i, 1) for i in range(num_perm)]
+        self.increments = [_parameter(seed, 'b', i, 0) for i in range(num_perm)]
+        self.base = _parameter(seed, 'base', 0, 2)
+        self.numpy = _numpy() if vectorized is None or vectorized else None
+        if vectorized and self.numpy is None:
+            raise ImportError("Vectorized MinHash requires numpy")
+        self._hashes = _Hashes()
+
+    def token_hashes(self, columns):
+        """
+        Hashes the lemma of every token, falling back to the word where there is no lemma
+
+        :param columns: the token columns of a document
+        :type columns: corenlp_xml.columns.TokenColumns
+
+        :return: one hash per token
+        :rtype: list of int
+
+        """
+        hashes = self._hashes
+        return [hashes[lemma if lemma is not None else word if word is not None else u'']
+                for lemma, word in zip(columns.lemma, columns.word)]
+
+    def signatures(self, document):
+        """
+        Computes the signature of every sentence with at least one token
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+
+        :return: (sentence id, signature) pairs, in document order
+        :rtype: list of tuple
+
+        """
+        columns = document.token_columns
+        tokens = self.token_hashes(columns)
+        ranges = [(sentence_id, columns.sentence_range(i)) for i, sentence_id in enumerate(columns.sentence_ids)]
+        ranges = [(sentence_id, start, end) for sentence_id, (start, end) in ranges if end > start]
+        if self.numpy is not None:
+            return self._signatures_numpy(tokens, ranges)
+        return [(sentence_id, self._signature(self._shingles(tokens, start, end)))
+                for sentence_id, start, end in ranges]
+
+    def _shingles(self, tokens, start, end):
+        size = min(self.shingle_size, end - start)
+        base = self.base
+        shingles = []
+        for i in range(start, end - size + 1):
+            value = 0
+            for token in tokens[i:i + size]:
+                value = (value * base + token) % PRIME
+            shingles.append(value)
+        return shingles
+
+    def _signature(self, shingles):
+        return array('I', [min((a * shingle + b) % PRIME for shingle in shingles)
+                           for a, b in zip(self.multipliers, self.increments)])
+
+    def _signatures_numpy(self, tokens, ranges):
+        numpy = self.numpy
+        """ Every operand is a uint64 scalar or array, so older numpy doesn't promote to floats """
+        prime, base = numpy.uint64(PRIME), numpy.uint64(self.base)
+        size = self.shingle_size
+        token_array = numpy.array(tokens, dtype=numpy.uint64)
+        full = numpy.zeros(max(len(tokens) - size + 1, 0), dtype=numpy.uint64)
+        for offset in range(size):
+            full = (full * base + token_array[offset:offset + len(full)]) % prime
+        groups, short = [], []
+        for sentence_id, start, end in ranges:
+            if end - start >= size:
+                groups.append(numpy.arange(start, end - size + 1))
+            else:
+                groups.append(numpy.array([len(full) + len(short)]))
+                short.extend(self._shingles(tokens, start, end))
+        shingles = numpy.concatenate([full, numpy.array(short, dtype=numpy.uint64)])
+        multipliers = numpy.array(self.multipliers, dtype=numpy.uint64)
+        increments = numpy.array(self.increments, dtype=numpy.uint64)
+        signatures = []
+        first = 0
+        while first < len(groups):
+            last, count = first, 0
+            while last < len(groups) and (last == first or count + len(groups[last]) <= CHUNK_SHINGLES):
+                count += len(groups[last])
+                last += 1
+            chunk = shingles[numpy.concatenate(groups[first:last])]
+            starts = numpy.cumsum([0] + [len(group) for group in groups[first:last - 1]])
+            permuted = (chunk[:, None] * multipliers[None, :] + increments[None, :]) % prime
+            for row in numpy.minimum.reduceat(permuted, starts, axis=0):
+                signatures.append(array('I', row.tolist()))
+            first = last
+        return [(sentence_id, signature) for (sentence_id, _, _), signature in zip(ranges, signatures)]
+
+
+def _pack(signature):
+    return struct.pack('<%dI' % len(signature), *signature)
+
+
+def _unpack(blob):
+    blob = bytes(blob)
+    return array('I', struct.unpack('<%dI' % (len(blob) // 4), blob))
+
+
+class LSHIndex(object):
+    """
+    A persistent LSH index of sentence signatures, in an SQLite database.
+
+    Sentences are added a document at a time. A sentence that already has a near-duplicate in the index is
+    reported but not added itself, so boilerplate repeated across the corpus stays a single entry and
+    buckets stay small. The index's parameters are stored with it, and reopening it with different ones
+    raises a ValueError.
+    """
+
+    def __init__(self, path=':memory:', threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                 shingle_size=DEFAULT_SHINGLE_SIZE, seed=1, bands=None, vectorized=None):
+        """
+        Constructor method
+
+        :param path: the SQLite database to keep the index in, created if it doesn't exist
+        :type path: str
+        :param threshold: the estimated Jaccard similarity from which sentences count as near-duplicates
+        :type threshold: float
+        :param num_perm: the number of permutations in each signature
+        :type num_perm: int
+        :param shingle_size: the number of consecutive lemmas in each shingle
+        :type shingle_size: int
+        :param seed: seeds the permutations
+        :type seed: int
+        :param bands: the number of LSH bands, which must divide num_perm; see corenlp_xml.dedup.optimal_bands
+        :type bands: int
+        :param vectorized: whether to compute signatures with numpy, defaults to whether it is installed
+        :type vectorized: bool
+
+        """
+        bands = bands if bands is not None else optimal_bands(num_perm, threshold)
+        if num_perm % bands:
+            raise ValueError("The number of bands must divide the number of permutations")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, shingle_size, seed, vectorized)
+        self._connection = sqlite3.connect(path)
+        self._create()
+
+    def _create(self):
+        connection = self._connection
+        connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+        connection.execute('CREATE TABLE IF NOT EXISTS sentences '
+                           '(id INTEGER PRIMARY KEY, document TEXT, sentence INTEGER, signature BLOB)')
+        connection.execute('CREATE TABLE IF NOT EXISTS buckets (key INTEGER, sentence INTEGER)')
+        connection.execute('CREATE INDEX IF NOT EXISTS buckets_key ON buckets (key)')
+        parameters = {'num_perm': self.hasher.num_perm, 'shingle_size': self.hasher.shingle_size,
+                      'seed': self.hasher.seed, 'bands': self.bands, 'threshold': self.threshold}
+        stored = dict(connection.execute('SELECT name, value FROM meta'))
+        if stored:
+            expected = dict((name, str(value)) for name, value in parameters.items())
+            if stored != expected:
+                raise ValueError("%s was built with different parameters: %r" % (self.path, stored))
+        else:
+            connection.executemany('INSERT INTO meta VALUES (?, ?)',
+                                   [(name, str(value)) for name, value in parameters.items()])
+        connection.commit()
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM sentences').fetchone()[0]
+
+    def band_keys(self, signature):
+        """
+        Hashes each band of a signature into a bucket key
+
+        :param signature: a MinHash signature
+        :type signature: array.array
+
+        :return: one key per band
+        :rtype: list of int
+
+        """
+        rows = self.rows
+        return [(band << 32) | (zlib.crc32(_pack(signature[band * rows:(band + 1) * rows])) & 0xffffffff)
+                for band in range(self.bands)]
+
+    def query(self, signature):
+        """
+        Finds the indexed sentences whose estimated similarity to a signature reaches the threshold
+
+        :param signature: a MinHash signature
+        :type signature: array.array
+
+        :return: (document name, sentence id, estimated similarity) tuples, most similar first
+        :rtype: list of tuple
+
+        """
+        keys = self.band_keys(signature)
+        candidates = [row[0] for row in self._connection.execute(
+            'SELECT DISTINCT sentence FROM buckets WHERE key IN (%s)' % ', '.join('?' * len(keys)), keys)]
+        matches = []
+        for i in range(0, len(candidates), 500):
+            chunk = candidates[i:i + 500]
+            for name, sentence_id, blob in self._connection.execute(
+                    'SELECT document, sentence, signature FROM sentences WHERE id IN (%s)'
+                    % ', '.join('?' * len(chunk)), chunk):
+                similarity = jaccard(signature, _unpack(blob))
+                if similarity >= self.threshold:
+                    matches.append((name, sentence_id, similarity))
+        matches.sort(key=lambda match: -match[2])
+        return matches
+
+    def duplicates(self, document):
+        """
+        Looks up the near-duplicates of every sentence of a document, without adding it to the index
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+
+        :return: the matches of each sentence that has any, by sentence id; see LSHIndex.query
+        :rtype: dict
+
+        """
+        duplicates = dict()
+        for sentence_id, signature in self.hasher.signatures(document):
+            matches = self.query(signature)
+            if matches:
+                duplicates[sentence_id] = matches
+        return duplicates
+
+    def add(self, name, document):
+        """
+        Adds the sentences of a document, reporting those that already have a near-duplicate in the index,
+        including earlier sentences of the same document
+
+        :param name: the name the document's sentences are indexed under
+        :type name: str
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+
+        :return: the matches of each sentence that has any, by sentence id; see LSHIndex.query
+        :rtype: dict
+
+        """
+        connection = self._connection
+        duplicates = dict()
+        for sentence_id, signature in self.hasher.signatures(document):
+            matches = self.query(signature)
+            if matches:
+                duplicates[sentence_id] = matches
+                continue
+            row = connection.execute('INSERT INTO sentences (document, sentence, signature) VALUES (?, ?, ?)',
+                                     (name, sentence_id, sqlite3.Binary(_pack(signature)))).lastrowid
+            connection.executemany('INSERT INTO buckets VALUES (?, ?)',
+                                   [(key, row) for key in self.band_keys(signature)])
+        connection.commit()
+        return duplicates
+
+    def close(self):
+        """
+        Closes the database
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_unique_sentences(index, documents):
+    """
+    Adds documents to an index as they arrive, keeping only sentences without a near-duplicate seen before
+
+    :param index: the index
+    :type index: corenlp_xml.dedup.LSHIndex
+    :param documents: (name, document) pairs, e.g. from corenlp_xml.readers.iter_documents
+    :type documents: iterable of tuple
+
+    :return: a generator of (name, sentence) pairs
+    :rtype: generator of tuple
+
+    """
+    for name, document in documents:
+        duplicates = index.add(name, document)
+        for sentence in document.sentences:
+            if sentence.id not in duplicates:
+                yield name, sentence
@@ -1,6 +1,162 @@
 """
 This component is responsible for managing dependency parses
 """
+from array import array
+from collections import OrderedDict
+
+
+def iter_dependency_edges(sentence_elements):
+    """
+    Reads dependency edges straight from the <dep> elements, without building any graph objects
+
+    :param sentence_elements: the sentence elements, in document order
+    :type sentence_elements: list of lxml.etree.ElementBase
+
+    :return: a generator of (sentence id, dependency kind, relation, governor idx, dependent idx) tuples
+    :rtype: generator of tuple
+
+    """
+    for sentence_element in sentence_elements:
+        sentence_id = int(sentence_element.get('id'))
+        for dependencies_element in sentence_element.iterfind('dependencies'):
+            kind = dependencies_element.get('type')
+            for relation, governor, dependent in iter_dependency_triples(dependencies_element):
+                yield sentence_id, kind, relation, governor, dependent
+
+
+def iter_dependency_triples(dependencies_element):
+    """
+    Reads the edges of one <dependencies> element
+
+    :param dependencies_element: the element
+    :type dependencies_element: lxml.etree.ElementBase
+
+    :return: a generator of (relation, governor idx, dependent idx) tuples
+    :rtype: generator of tuple
+
+    """
+    for dep in dependencies_element.iterfind('dep'):
+        yield dep.get('type'), int(dep.find('governor').get('idx')), int(dep.find('dependent').get('idx'))
+
+
+def dependency_kind(kind):
+    """
+    Normalizes a dependency kind to the type attribute CoreNLP writes, e.g. "collapsed-ccprocessed"
+    to "collapsed-ccprocessed-dependencies"
+
+    :param kind: the kind, with or without the "-dependencies" suffix
+    :type kind: str
+
+    :return: the type attribute of the dependencies element
+    :rtype: str
+
+    """
+    return kind if kind.endswith('-dependencies') else kind + '-dependencies'
+
+
+class DependencyMatrix(object):
+    """
+    Dependency edges as a sparse adjacency matrix in coordinate (COO) form, for one sentence or, block-diagonally,
+    for many. Rows are governors and columns dependents, both indexing tokens from 0, and each entry holds the
+    integer id of its relation in ``relations``. Edges from the ROOT node aren't entries in the matrix;
+    the tokens they point at are listed in ``roots`` instead.
+    """
+
+    def __init__(self, size, relations=None):
+        """
+        Constructor method
+
+        :param size: the number of tokens, i.e. the number of rows and columns
+        :type size: int
+        :param relations: the vocabulary to encode relations with, e.g. to share ids across batches
+        :type relations: corenlp_xml.vocabulary.Vocabulary
+
+        """
+        from corenlp_xml.vocabulary import Vocabulary
+        self.size = size
+        self.relations = relations if relations is not None else Vocabulary()
+        self.row = array('i')
+        self.col = array('i')
+        self.data = array('i')
+        self.roots = array('i')
+        self.sentence_starts = array('i')
+
+    @property
+    def shape(self):
+        """
+        :getter: Returns the dimensions of the matrix
+        :type: tuple
+
+        """
+        return self.size, self.size
+
+    def __len__(self):
+        return len(self.data)
+
+    def add_edges(self, edges, offset=0):
+        """
+        Appends edges, read straight from <dep> elements
+
+        :param edges: (relation, governor idx, dependent idx) triples, with token idx counting from 1 and 0 for ROOT
+        :type edges: iterable of tuple
+        :param offset: the index of the sentence's first token in the matrix
+        :type offset: int
+
+        """
+        encode = self.relations.id
+        base = offset - 1
+        for relation, governor, dependent in edges:
+            if governor == 0:
+                self.roots.append(base + dependent)
+            else:
+                self.row.append(base + governor)
+                self.col.append(base + dependent)
+                self.data.append(encode(relation))
+
+    def to_csr(self):
+        """
+        Converts to compressed sparse row form, sorting entries by governor and then dependent
+
+        :return: the indptr, indices and data arrays
+        :rtype: tuple of array.array
+
+        """
+        order = sorted(range(len(self.data)), key=lambda i: (self.row[i], self.col[i]))
+        indptr = array('i', [0] * (self.size + 1))
+        for row in self.row:
+            indptr[row + 1] += 1
+        for i in range(self.size):
+            indptr[i + 1] += indptr[i]
+        return indptr, array('i', [self.col[i] for i in order]), array('i', [self.data[i] for i in order])
+
+    def to_scipy(self, format='coo'):
+        """
+        Converts to a scipy sparse matrix; requires scipy
+
+        :param format: "coo" or "csr"
+        :type format: str
+
+        :return: the matrix, with relation ids as values
+        :rtype: scipy.sparse.spmatrix
+
+        """
+        try:
+            from scipy import sparse
+        except ImportError:
+            raise ImportError("DependencyMatrix.to_scipy requires scipy")
+        if format == 'csr':
+            indptr, indices, data = self.to_csr()
+            return sparse.csr_matrix((data, indices, indptr), shape=self.shape)
+        return sparse.coo_matrix((self.data, (self.row, self.col)), shape=self.shape)
+
+
+def _reverse_path(path):
+    """
+    Turns a path around, flipping the direction of each step
+    """
+    if path is None:
+        return None
+    return tuple(('>' if label[0] == '<' else '<') + label[1:] for label in reversed(path))
 
 
 class DependencyGraph():
@@ -20,6 +176,9 @@ class DependencyGraph():
         self.type = element.get('type')
         self._nodes = dict()
         self._links_by_type = dict()
+        self._parents = None
+        self._depths = None
+        self._paths = dict()
         for dep in self._element.xpath('dep'):
             link = DependencyLink(self, dep)
             self._links_by_type[link.type] = self._links_by_type.get(link.type, []) + [link]
@@ -61,6 +220,144 @@ class DependencyGraph():
         """
         return self._links_by_type.get(dep_type, [])
 
+    def to_coo(self, size=None, relations=None):
+        """
+        Builds a sparse adjacency matrix of the graph straight from the <dep> elements, without creating nodes
+
+        :param size: the number of tokens in the sentence, defaults to the highest index in the graph
+        :type size: int
+        :param relations: the vocabulary to encode relations with
+        :type relations: corenlp_xml.vocabulary.Vocabulary
+
+        :return: the matrix
+        :rtype: corenlp_xml.dependencies.DependencyMatrix
+
+        """
+        edges = list(iter_dependency_triples(self._element))
+        if size is None:
+            size = max([max(governor, dependent) for _, governor, dependent in edges] or [0])
+        matrix = DependencyMatrix(size, relations)
+        matrix.sentence_starts.append(0)
+        matrix.add_edges(edges)
+        return matrix
+
+    def _root(self):
+        """
+        Records each node's governor and depth below ROOT, or leaves depths at None if the graph isn't a tree
+        """
+        if self._parents is not None:
+            return
+        parents = dict()
+        tree = True
+        for relation, governor, dependent in iter_dependency_triples(self._element):
+            if dependent in parents:
+                tree = False
+            else:
+                parents[dependent] = (governor, relation)
+        depths = {0: 0}
+        for node in parents if tree else ():
+            walk = []
+            while node not in depths and node in parents and len(walk) <= len(parents):
+                walk.append(node)
+                node = parents[node][0]
+            if node not in depths:
+                """ A cycle, or a governor that isn't in the graph """
+                tree = False
+                break
+            for depth, walked in enumerate(reversed(walk), depths[node] + 1):
+                depths[walked] = depth
+        self._depths = depths if tree else None
+        self._parents = parents
+
+    def _tree_path(self, source, target):
+        """
+        Finds the path between two nodes of a tree by walking up from both to their lowest common ancestor
+        """
+        depths, parents = self._depths, self._parents
+        up, down = [], []
+        while depths[source] > depths[target]:
+            source, relation = parents[source]
+            up.append('<' + relation)
+        while depths[target] > depths[source]:
+            target, relation = parents[target]
+            down.append('>' + relation)
+        while source != target:
+            source, relation = parents[source]
+            up.append('<' + relation)
+            target, relation = parents[target]
+            down.append('>' + relation)
+        return tuple(up + down[::-1])
+
+    def _neighbours(self):
+        """
+        Lists each node's neighbours with the label of the step to them, ignoring edge direction
+        """
+        neighbours = dict()
+        for relation, governor, dependent in iter_dependency_triples(self._element):
+            neighbours.setdefault(dependent, []).append((governor, '<' + relation))
+            neighbours.setdefault(governor, []).append((dependent, '>' + relation))
+        return neighbours
+
+    def _search_paths(self, source, targets, neighbours):
+        """
+        Finds the paths from one node to many with a breadth-first search over adjacency lists from _neighbours
+        """
+        previous = {source: None}
+        frontier = [source]
+        while frontier and not all(target in previous for target in targets):
+            next_frontier = []
+            for node in frontier:
+                for neighbour, label in neighbours.get(node, ()):
+                    if neighbour not in previous:
+                        previous[neighbour] = (node, label)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        paths = dict()
+        for target in targets:
+            if target in previous:
+                labels = []
+                node = target
+                while previous[node] is not None:
+                    node, label = previous[node]
+                    labels.append(label)
+                paths[target] = tuple(labels[::-1])
+        return paths
+
+    def all_pairs_paths(self, node_ids):
+        """
+        Finds the shortest dependency path between every pair of some nodes, e.g. the heads of a sentence's entities.
+
+        Paths are tuples of relation labels: "<nsubj" steps up from a dependent to its governor,
+        and ">dobj" steps down from a governor to a dependent. When the graph is a tree, as basic dependencies are,
+        it is rooted once and each path is found by walking up to the pair's lowest common ancestor; otherwise each
+        node gets one breadth-first search over adjacency lists built once per call. Paths are memoized on the graph,
+        so repeated calls only compute new pairs.
+
+        :param node_ids: the idx of each node
+        :type node_ids: iterable of int
+
+        :return: the path for each ordered pair of distinct nodes, or None if a node isn't connected to the other
+        :rtype: dict of (int, int) to tuple of str
+
+        """
+        node_ids = list(OrderedDict.fromkeys(int(node_id) for node_id in node_ids))
+        self._root()
+        missing = [(a, b) for a in node_ids for b in node_ids if a != b and (a, b) not in self._paths]
+        if self._depths is not None:
+            for a, b in missing:
+                if (a, b) not in self._paths:
+                    path = self._tree_path(a, b) if a in self._depths and b in self._depths else None
+                    self._paths[(a, b)] = path
+                    self._paths[(b, a)] = _reverse_path(path)
+        elif missing:
+            neighbours = self._neighbours()
+            for a in OrderedDict.fromkeys(a for a, _ in missing):
+                targets = [b for b in node_ids if b != a]
+                found = self._search_paths(a, targets, neighbours)
+                for b in targets:
+                    self._paths[(a, b)] = found.get(b)
+        return dict(((a, b), self._paths[(a, b)]) for a in node_ids for b in node_ids if a != b)
+
     def register_node(self, node):
         self._nodes[node.idx] = node
 
@@ -1,30 +1,285 @@
 """
 Sub-module for handling document-level stuff
 """
+import zlib
+from array import array
+from copy import deepcopy
 from lxml import etree
 from collections import OrderedDict
-from nltk import Tree
-from corenlp_xml.dependencies import DependencyGraph
-from corenlp_xml.coreference import Coreference
-
-class Document:
+from corenlp_xml.dependencies import DependencyGraph, DependencyMatrix, dependency_kind, iter_dependency_triples
+from corenlp_xml.coreference import Coreference, CoreferenceTable
+from corenlp_xml.columns import TokenColumns, OffsetIndex
+from corenlp_xml.entities import find_entities, link_coreferences
+from corenlp_xml.fields import SENTENCE_EXTRAS, TOKEN_EXTRAS
+from corenlp_xml.locking import field_locks
+from corenlp_xml.parsers import get_parser, parse
+
+class Document(object):
     """
     This class abstracts a Stanford CoreNLP Document
+
+    By default, lazily-loaded fields are built without any locking, which is safe as long as a document
+    and the objects it hands out are only used from one thread. Pass thread_safe=True to share a document
+    between threads: every lazily-loaded field of the document, its sentences and its coreferences is then
+    built exactly once, so all threads see the same Sentence, Token and Mention instances.
+    See corenlp_xml.locking for how this works.
+
+    Pass max_resident_sentences to bound how many Sentence objects, with their tokens and dependency graphs,
+    the document keeps once they have been materialized. The least recently used sentences are then evicted
+    and rebuilt on demand, and sentence_evictions and sentence_rebuilds count how often that happens.
+    Documents read with Document.from_path also release the XML subtrees of evicted sentences, keeping
+    them compressed until they are needed again. Token columns, dependency matrices, exports and pickling
+    read released sentences from detached copies, so they don't undo the bound, and coreference mentions
+    look their sentence up through the document rather than keeping it alive.
     """
 
-    def __init__(self, xml_string):
+    def __init__(self, xml_string, cache=None, thread_safe=False, parser_options=None, max_resident_sentences=None):
         """
         Constructor method.
 
         :param xml_string: The XML string we're going to parse and represent, coming from CoreNLP
         :type xml_string: str
+        :param cache: a cache to share materialized sentences with other documents
+        :type cache: corenlp_xml.cache.ResultCache
+        :param thread_safe: whether the document will be shared between threads
+        :type thread_safe: bool
+        :param parser_options: keyword arguments for the lxml.etree.XMLParser to parse with, which is reused
+                               across documents on the same thread; see corenlp_xml.parsers.TRUSTED_OPTIONS
+        :type parser_options: dict
+        :param max_resident_sentences: how many materialized sentences to keep, or None to keep them all
+        :type max_resident_sentences: int
+
+        """
+        self._load(parse(xml_string, parser_options), xml_string, cache, thread_safe, max_resident_sentences)
+
+    def _load(self, element, xml_string, cache=None, thread_safe=False, max_resident_sentences=None,
+              release_elements=False):
+        """
+        Sets up lazy-loaded state around a parsed XML tree
+
+        :param element: the root element of the CoreNLP XML
+        :type element: lxml.etree.ElementBase
+        :param xml_string: the XML the element was parsed from, if available
+        :type xml_string: str
+        :param cache: a cache to share materialized sentences with other documents
+        :type cache: corenlp_xml.cache.ResultCache
+        :param thread_safe: whether the document will be shared between threads
+        :type thread_safe: bool
+        :param max_resident_sentences: how many materialized sentences to keep, or None to keep them all
+        :type max_resident_sentences: int
+        :param release_elements: whether to also release the XML subtrees of evicted sentences
+        :type release_elements: bool
 
         """
+        if max_resident_sentences is not None and max_resident_sentences < 1:
+            raise ValueError("max_resident_sentences must be positive")
+        self.thread_safe = thread_safe
+        self.max_resident_sentences = max_resident_sentences
+        self.release_elements = release_elements
+        self.sentence_evictions = 0
+        self.sentence_rebuilds = 0
+        self._locks = field_locks(thread_safe, 'xml', 'sentences', 'resident', 'coreferences', 'token_columns',
+                                  'offset_index', 'coreference_table', 'entities')
+        self._cache = cache
         self._sentences_dict = None
+        self._sentence_elements = None
+        self._released = dict()
+        self._evicted_ids = set()
         self._sentiment = None
         self._xml_string = xml_string
-        self._xml = etree.fromstring(xml_string)
+        self._root = element
+        self._json = None
         self._coreferences = None
+        self._token_columns = None
+        self._offset_index = None
+        self._coreference_table = None
+        self._entities = None
+        self._linked_entities = None
+
+    @classmethod
+    def from_element(cls, element, cache=None, thread_safe=False, max_resident_sentences=None,
+                     release_elements=False):
+        """
+        Wraps an already-parsed CoreNLP XML tree
+
+        :param element: the root element of the CoreNLP XML
+        :type element: lxml.etree.ElementBase
+        :param cache: a cache to share materialized sentences with other documents
+        :type cache: corenlp_xml.cache.ResultCache
+        :param thread_safe: whether the document will be shared between threads
+        :type thread_safe: bool
+        :param max_resident_sentences: how many materialized sentences to keep, or None to keep them all
+        :type max_resident_sentences: int
+        :param release_elements: whether to also release the XML subtrees of evicted sentences from the tree
+        :type release_elements: bool
+
+        :return: a document
+        :rtype: corenlp_xml.document.Document
+
+        """
+        document = cls.__new__(cls)
+        document._load(element, None, cache, thread_safe, max_resident_sentences, release_elements)
+        return document
+
+    @classmethod
+    def from_json(cls, json_string, cache=None, thread_safe=False):
+        """
+        Reads CoreNLP's JSON output. Token columns, the coreference table, dependency matrices and the sentiment
+        are built straight from the decoded JSON; the XML-shaped tree behind sentences, tokens, dependency graphs
+        and coreferences is only built when one of them is first accessed. See corenlp_xml.json_backend.
+
+        :param json_string: the JSON, coming from CoreNLP
+        :type json_string: str or bytes
+        :param cache: a cache to share materialized sentences with other documents
+        :type cache: corenlp_xml.cache.ResultCache
+        :param thread_safe: whether the document will be shared between threads
+        :type thread_safe: bool
+
+        :return: a document
+        :rtype: corenlp_xml.document.Document
+
+        """
+        from corenlp_xml.json_backend import loads
+        document = cls.from_element(None, cache, thread_safe)
+        document._json = loads(json_string)
+        return document
+
+    def _tree(self):
+        """
+        The root element of the CoreNLP XML, built on first access for documents read from JSON.
+        Subtrees of evicted sentences may have been released from it.
+        """
+        if self._root is None:
+            with self._locks['xml']:
+                if self._root is None:
+                    from corenlp_xml.json_backend import build_tree
+                    self._root = build_tree(self._json)
+        return self._root
+
+    @property
+    def _xml(self):
+        """
+        The complete root element of the CoreNLP XML, putting back any released sentence subtrees.
+        This undoes the release of every evicted sentence for good, so code that only needs to read
+        every sentence should use _iter_sentence_elements, and code that only needs other parts
+        of the tree should use _tree.
+        """
+        root = self._tree()
+        if self._released:
+            with self._locks['resident']:
+                for id in list(self._released):
+                    self._restore_element(id)
+        return root
+
+    def __reduce__(self):
+        """
+        Pickles the document in a compact, detached form: the XML tree re-serialized and compressed,
+        plus the token columns and coreference table if they were already built, so that the receiving
+        process doesn't have to rebuild them. The cache, if any, is left behind.
+        """
+        return _restore_document, (zlib.compress(self._serialize(), 1), self.thread_safe,
+                                   self._token_columns, self._coreference_table)
+
+    def _serialize(self):
+        """
+        Serializes the complete XML. Released sentence subtrees are put back into a temporary copy
+        of the tree rather than the tree itself, so the copy is only held while serializing.
+        """
+        root = self._tree()
+        with self._locks['resident']:
+            released = dict(self._released)
+        if not released:
+            return etree.tostring(root)
+        root = deepcopy(root)
+        for element in root.xpath('/root/document/sentences/sentence'):
+            compressed = released.get(int(element.get('id')))
+            if compressed is not None:
+                restored = etree.fromstring(zlib.decompress(compressed))
+                restored.tail = element.tail
+                element.getparent().replace(element, restored)
+        return etree.tostring(root)
+
+    def _iter_sentence_elements(self):
+        """
+        Iterates over every sentence element in document order. Released sentences are decompressed
+        into detached copies, which are dropped once the caller is done with them, rather than being
+        put back into the tree.
+
+        :return: a generator of sentence elements
+        :rtype: generator of lxml.etree.ElementBase
+
+        """
+        if self.max_resident_sentences is None:
+            for element in self._tree().xpath('/root/document/sentences/sentence'):
+                yield element
+            return
+        elements = self._get_sentence_elements()
+        for id in list(elements):
+            with self._locks['resident']:
+                element = elements[id]
+                compressed = self._released.get(id)
+            yield etree.fromstring(zlib.decompress(compressed)) if compressed is not None else element
+
+    @classmethod
+    def from_path(cls, path, threaded=True, parser_options=None, max_resident_sentences=None):
+        """
+        Parses a CoreNLP XML file, which may be compressed with gzip, bzip2 or xz.
+        The file is decompressed and fed to lxml's incremental parser chunk by chunk,
+        so the whole uncompressed XML never has to be held in memory as a string.
+        With max_resident_sentences, the XML subtrees of evicted sentences are released as well.
+
+        :param path: path to a .xml, .xml.gz, .xml.bz2 or .xml.xz file
+        :type path: str
+        :param threaded: whether to read and decompress on a separate thread while parsing
+        :type threaded: bool
+        :param parser_options: keyword arguments for the lxml.etree.XMLParser to feed; the parser is reused
+                               on each thread, see corenlp_xml.parsers.get_parser
+        :type parser_options: dict
+        :param max_resident_sentences: how many materialized sentences to keep, or None to keep them all
+        :type max_resident_sentences: int
+
+        :return: a document
+        :rtype: corenlp_xml.document.Document
+
+        """
+        from corenlp_xml.readers import read_path
+        parser = get_parser(parser_options) if parser_options is not None else None
+        return cls.from_element(read_path(path, threaded=threaded, parser=parser),
+                                max_resident_sentences=max_resident_sentences,
+                                release_elements=max_resident_sentences is not None)
+
+    @classmethod
+    def open_indexed(cls, path, index_path=None):
+        """
+        Opens a CoreNLP XML file for random access to individual sentences, without parsing the whole file
+
+        :param path: path to the CoreNLP XML file
+        :type path: str
+        :param index_path: where to store the byte-offset sidecar index, defaults to the path with ".idx" appended
+        :type index_path: str
+
+        :return: an indexed document
+        :rtype: corenlp_xml.indexed.IndexedDocument
+
+        """
+        from corenlp_xml.indexed import IndexedDocument
+        return IndexedDocument(path, index_path=index_path)
+
+    @classmethod
+    def load_columns(cls, xml_string):
+        """
+        Loads only the token columns, dependency edges and coreference table of a document,
+        routing parser events straight into them without building an XML tree
+
+        :param xml_string: the CoreNLP XML
+        :type xml_string: str
+
+        :return: the loaded columns
+        :rtype: corenlp_xml.target.ColumnarDocument
+
+        """
+        from corenlp_xml.target import load_columns
+        return load_columns(xml_string)
 
     @property
     def sentiment(self):
@@ -35,11 +290,20 @@ class Document:
         :type: float
 
         """
+        if self._sentiment is None and self._json is not None:
+            from corenlp_xml.json_backend import average_sentiment
+            average = average_sentiment(self._json)
+            self._sentiment = average if average is not None else 0.0
         if self._sentiment is None:
-            results = self._xml.xpath('/root/document/sentences')
+            results = self._tree().xpath('/root/document/sentences')
             self._sentiment = float(results[0].get("averageSentiment", 0)) if len(results) > 0 else None
         return self._sentiment
 
+    def _build_sentence(self, element):
+        if self._cache is not None:
+            return self._cache.sentence(element, self.thread_safe)
+        return Sentence(element, self.thread_safe)
+
     def _get_sentences_dict(self):
         """
         Returns sentence objects
@@ -49,19 +313,98 @@ class Document:
 
         """
         if self._sentences_dict is None:
-            sentences = [Sentence(element) for element in self._xml.xpath('/root/document/sentences/sentence')]
-            self._sentences_dict = OrderedDict([(s.id, s) for s in sentences])
+            with self._locks['sentences']:
+                if self._sentences_dict is None:
+                    elements = self._xml.xpath('/root/document/sentences/sentence')
+                    sentences = [self._build_sentence(element) for element in elements]
+                    self._sentences_dict = OrderedDict([(s.id, s) for s in sentences])
         return self._sentences_dict
 
+    def _get_sentence_elements(self):
+        """
+        Returns the sentence elements by ID, for documents with a bound on resident sentences
+
+        :return: ordered dict of sentence elements, or placeholders for released ones
+        :rtype: collections.OrderedDict
+
+        """
+        if self._sentence_elements is None:
+            with self._locks['sentences']:
+                if self._sentence_elements is None:
+                    elements = self._tree().xpath('/root/document/sentences/sentence')
+                    self._sentence_elements = OrderedDict([(int(e.get('id')), e) for e in elements])
+        return self._sentence_elements
+
+    def _get_resident_sentence(self, id):
+        """
+        Looks a sentence up in the LRU of resident sentences, materializing it on a miss and evicting
+        the least recently used sentences to stay within max_resident_sentences
+
+        :param id: the ID of the sentence
+        :type id: int
+
+        :return: the sentence, or None if the ID doesn't exist
+        :rtype: corenlp_xml.document.Sentence
+
+        """
+        elements = self._get_sentence_elements()
+        if id not in elements:
+            return None
+        with self._locks['resident']:
+            if self._sentences_dict is None:
+                self._sentences_dict = OrderedDict()
+            sentence = self._sentences_dict.pop(id, None)
+            if sentence is None:
+                sentence = self._build_sentence(self._restore_element(id))
+                if id in self._evicted_ids:
+                    self._evicted_ids.discard(id)
+                    self.sentence_rebuilds += 1
+            self._sentences_dict[id] = sentence
+            while len(self._sentences_dict) > self.max_resident_sentences:
+                self._evict(self._sentences_dict.popitem(last=False)[0])
+        return sentence
+
+    def _evict(self, id):
+        """
+        Records an evicted sentence, swapping its subtree for a placeholder holding only its ID
+        if elements are released; the subtree is kept compressed until it is needed again
+        """
+        self.sentence_evictions += 1
+        self._evicted_ids.add(id)
+        if self.release_elements and id not in self._released:
+            element = self._sentence_elements[id]
+            placeholder = etree.Element('sentence', id=element.get('id'))
+            placeholder.tail = element.tail
+            self._released[id] = zlib.compress(etree.tostring(element, with_tail=False), 1)
+            element.getparent().replace(element, placeholder)
+            self._sentence_elements[id] = placeholder
+
+    def _restore_element(self, id):
+        """
+        Returns a sentence's element, putting its subtree back into the tree if it was released
+        """
+        element = self._sentence_elements[id] if self._sentence_elements is not None else None
+        compressed = self._released.pop(id, None)
+        if compressed is None:
+            return element
+        restored = etree.fromstring(zlib.decompress(compressed))
+        restored.tail = element.tail
+        element.getparent().replace(element, restored)
+        self._sentence_elements[id] = restored
+        return restored
+
     @property
     def sentences(self):
         """
         Returns the ordered dict of sentences as a list.
+        With max_resident_sentences, this is a lazy sequence that materializes sentences as they are accessed.
 
         :getter: returns list of sentences, in order
         :type: list of corenlp_xml.document.Sentence
 
         """
+        if self.max_resident_sentences is not None:
+            return ResidentSentences(self)
         return self._get_sentences_dict().values()
 
     def get_sentence_by_id(self, id):
@@ -75,8 +418,100 @@ class Document:
         :rtype: corenlp_xml.document.Sentence
 
         """
+        if self.max_resident_sentences is not None:
+            return self._get_resident_sentence(id)
         return self._get_sentences_dict().get(id)
 
+    @property
+    def token_columns(self):
+        """
+        Array-backed columns for every token in the document, built in one pass over the XML
+
+        :getter: returns the token columns
+        :type: corenlp_xml.columns.TokenColumns
+
+        """
+        if self._token_columns is None:
+            with self._locks['token_columns']:
+                if self._token_columns is None and self._json is not None and not TOKEN_EXTRAS:
+                    from corenlp_xml.json_backend import build_columns
+                    self._token_columns = build_columns(self._json)
+                if self._token_columns is None:
+                    self._token_columns = TokenColumns.from_sentence_elements(self._iter_sentence_elements())
+        return self._token_columns
+
+    @property
+    def offset_index(self):
+        """
+        Sorted character offset arrays over the token columns, for binary search by offset
+
+        :getter: returns the offset index
+        :type: corenlp_xml.columns.OffsetIndex
+
+        """
+        if self._offset_index is None:
+            with self._locks['offset_index']:
+                if self._offset_index is None:
+                    self._offset_index = OffsetIndex(self.token_columns)
+        return self._offset_index
+
+    def token_at_index(self, index):
+        """
+        Accesses the token at a position in the token columns
+
+        :param index: the index into the token columns
+        :type index: int
+
+        :return: the token
+        :rtype: corenlp_xml.document.Token
+
+        """
+        columns = self.token_columns
+        return self.get_sentence_by_id(columns.sentence_id[index]).get_token_by_id(columns.token_id[index])
+
+    def token_at_offset(self, position):
+        """
+        Finds the token covering a character offset
+
+        :param position: the character offset
+        :type position: int
+
+        :return: the token, or None if the offset falls between tokens
+        :rtype: corenlp_xml.document.Token
+
+        """
+        index = self.offset_index.index_at(position)
+        return self.token_at_index(index) if index is not None else None
+
+    def tokens_in_span(self, begin, end):
+        """
+        Finds the tokens overlapping a span of characters
+
+        :param begin: the offset the span starts at
+        :type begin: int
+        :param end: the offset the span ends before
+        :type end: int
+
+        :return: the overlapping tokens, in order
+        :rtype: corenlp_xml.document.TokenList
+
+        """
+        return TokenList([self.token_at_index(i) for i in self.offset_index.indices_in_span(begin, end)])
+
+    def align_spans(self, spans):
+        """
+        Finds the tokens overlapping each of many character spans at once.
+        Use offset_index.align directly to get column indices without materializing tokens.
+
+        :param spans: (begin, end) character offset pairs
+        :type spans: list of tuple
+
+        :return: the overlapping tokens for each span, in the order the spans were given
+        :rtype: list of corenlp_xml.document.TokenList
+
+        """
+        return [TokenList([self.token_at_index(i) for i in indices]) for indices in self.offset_index.align(spans)]
+
     @property
     def coreferences(self):
         """
@@ -87,25 +522,157 @@ class Document:
 
         """
         if self._coreferences is None:
-            coreferences = self._xml.xpath('/root/document/coreference/coreference')
-            if len(coreferences) > 0:
-                self._coreferences = [Coreference(self, element) for element in coreferences]
+            with self._locks['coreferences']:
+                if self._coreferences is None:
+                    coreferences = self._tree().xpath('/root/document/coreference/coreference')
+                    if len(coreferences) > 0:
+                        self._coreferences = [Coreference(self, element) for element in coreferences]
         return self._coreferences
 
+    def resolve_coreferences(self):
+        """
+        Resolves the mentions of every coreference chain to token ranges and head tokens in a single pass,
+        without materializing Coreference, Mention or Sentence objects
+
+        :return: a table with one row per mention, grouped by sentence
+        :rtype: corenlp_xml.coreference.CoreferenceTable
+
+        """
+        if self._coreference_table is None:
+            with self._locks['coreference_table']:
+                if self._coreference_table is None and self._json is not None:
+                    from corenlp_xml.json_backend import mention_rows
+                    self._coreference_table = CoreferenceTable.from_rows(mention_rows(self._json),
+                                                                         self.token_columns)
+                if self._coreference_table is None:
+                    self._coreference_table = CoreferenceTable.from_document(self)
+        return self._coreference_table
+
+
+    @property
+    def entities(self):
+        """
+        Named entities, found by grouping consecutive tokens with the same NER tag in one pass over the token columns
+
+        :getter: Returns the entities in document order
+        :type: list of corenlp_xml.entities.Entity
+
+        """
+        return self.get_entities()
+
+    def get_entities(self, coreferences=False):
+        """
+        Accesses named entities, optionally joined with the coreference chains they are mentioned in
+
+        :param coreferences: whether to set each entity's chain from the resolved coreferences
+        :type coreferences: bool
+
+        :return: the entities in document order
+        :rtype: list of corenlp_xml.entities.Entity
+
+        """
+        if self._entities is None or (coreferences and self._linked_entities is None):
+            with self._locks['entities']:
+                if self._entities is None:
+                    self._entities = find_entities(self.token_columns)
+                if coreferences and self._linked_entities is None:
+                    self._linked_entities = link_coreferences(self._entities, self.resolve_coreferences())
+        return self._linked_entities if coreferences else self._entities
+
+    def get_entities_by_sentence_id(self, id):
+        """
+        Accesses the named entities of one sentence
+
+        :param id: The XML ID of the sentence
+        :type id: int
+
+        :return: the entities in the sentence
+        :rtype: list of corenlp_xml.entities.Entity
+
+        """
+        return [entity for entity in self.entities if entity.sentence == id]
+
+
+    def windows(self, size, stride=1, partial=False):
+        """
+        Slides a window of consecutive sentences over the document. Windows are views over the shared
+        token columns and coreference table, giving window-relative token indices, character offsets
+        and coreference links without copying tokens.
+
+        :param size: the number of sentences in each window
+        :type size: int
+        :param stride: the number of sentences between the starts of consecutive windows
+        :type stride: int
+        :param partial: whether to also yield shorter windows at the end of the document
+        :type partial: bool
+
+        :return: a generator of windows
+        :rtype: generator of corenlp_xml.windows.SentenceWindow
+
+        """
+        from corenlp_xml.windows import iter_windows
+        return iter_windows(self, size, stride, partial)
+
+    def dependency_batch(self, kind='collapsed-ccprocessed', relations=None):
+        """
+        Builds one block-diagonal sparse adjacency matrix over every sentence's dependencies,
+        straight from the <dep> elements and without creating graphs or nodes.
+        Rows and columns are indices into the token columns, and sentence_starts gives each sentence's offset.
+
+        :param kind: the kind of dependencies: "basic", "collapsed" or "collapsed-ccprocessed"
+        :type kind: str
+        :param relations: the vocabulary to encode relations with, e.g. to share ids across documents
+        :type relations: corenlp_xml.vocabulary.Vocabulary
+
+        :return: the matrix
+        :rtype: corenlp_xml.dependencies.DependencyMatrix
+
+        """
+        kind = dependency_kind(kind)
+        columns = self.token_columns
+        matrix = DependencyMatrix(len(columns), relations)
+        matrix.sentence_starts = array('i', columns.sentence_starts)
+        offsets = dict(zip(columns.sentence_ids, columns.sentence_starts))
+        if self._json is not None:
+            from corenlp_xml import json_backend
+            for sentence in self._json['sentences']:
+                matrix.add_edges(json_backend.iter_dependency_triples(sentence, kind), offsets[sentence['index'] + 1])
+            return matrix
+        for sentence_element in self._iter_sentence_elements():
+            for dependencies_element in sentence_element.iterfind('dependencies'):
+                if dependencies_element.get('type') == kind:
+                    matrix.add_edges(iter_dependency_triples(dependencies_element),
+                                     offsets[int(sentence_element.get('id'))])
+        return matrix
+
+
+def _restore_document(compressed_xml, thread_safe, token_columns, coreference_table):
+    """
+    Rebuilds a pickled document, see Document.__reduce__
+    """
+    document = Document.from_element(etree.fromstring(zlib.decompress(compressed_xml)), thread_safe=thread_safe)
+    document._token_columns = token_columns
+    document._coreference_table = coreference_table
+    return document
+
 
 class Sentence():
     """
     This abstracts a sentence
     """
 
-    def __init__(self, element):
+    def __init__(self, element, thread_safe=False):
         """
         Constructor method
 
         :param element: An etree element.
         :type element:class:lxml.etree.ElementBase
+        :param thread_safe: whether the sentence will be shared between threads
+        :type thread_safe: bool
 
         """
+        self.thread_safe = thread_safe
+        self._locks = self._field_locks(thread_safe)
         self._id = None
         self._sentiment = None
         self._tokens_dict = None
@@ -115,6 +682,8 @@ class Sentence():
         self._basic_dependencies = None
         self._collapsed_dependencies = None
         self._collapsed_ccprocessed_dependencies = None
+        self._entities = None
+        self._extra = None
         self._element = element
 
     @property
@@ -128,6 +697,45 @@ class Sentence():
             self._id = int(self._element.get('id'))
         return self._id
 
+    @staticmethod
+    def _field_locks(thread_safe):
+        return field_locks(thread_safe, 'tokens', 'parse', 'entities', 'extra', '_basic_dependencies',
+                           '_collapsed_dependencies', '_collapsed_ccprocessed_dependencies')
+
+    def __getstate__(self):
+        """
+        Pickles the sentence with its XML serialized. The id, sentiment and parse tree are kept,
+        while tokens and dependency graphs are rebuilt from the XML on demand after unpickling.
+        """
+        state = dict(self.__dict__)
+        state['_element'] = etree.tostring(self._element)
+        del state['_locks']
+        for name in ('_tokens_dict', '_basic_dependencies', '_collapsed_dependencies',
+                     '_collapsed_ccprocessed_dependencies'):
+            state[name] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._element = etree.fromstring(state['_element'])
+        self._locks = self._field_locks(self.thread_safe)
+
+    @property
+    def extra(self):
+        """
+        Fields registered with corenlp_xml.fields.register_sentence_field, read with one scan over the sentence's
+        children
+
+        :getter: Returns the value of each registered field, by name
+        :type: dict
+
+        """
+        if self._extra is None:
+            with self._locks['extra']:
+                if self._extra is None:
+                    self._extra = SENTENCE_EXTRAS.extract(self._element)
+        return self._extra
+
     @property
     def sentiment(self):
         """
@@ -150,8 +758,10 @@ class Sentence():
 
         """
         if self._tokens_dict is None:
-            tokens = [Token(element) for element in self._element.xpath('tokens/token')]
-            self._tokens_dict = OrderedDict([(t.id, t) for t in tokens])
+            with self._locks['tokens']:
+                if self._tokens_dict is None:
+                    tokens = [Token(element) for element in self._element.xpath('tokens/token')]
+                    self._tokens_dict = OrderedDict([(t.id, t) for t in tokens])
         return self._tokens_dict
 
     @property
@@ -165,6 +775,22 @@ class Sentence():
         """
         return TokenList(self._get_tokens_dict().values())
 
+    @property
+    def entities(self):
+        """
+        Named entities in this sentence, found by grouping consecutive tokens with the same NER tag.
+        Their ``*_index`` attributes count from the start of the sentence.
+
+        :getter: Returns the entities in the sentence
+        :type: list of corenlp_xml.entities.Entity
+
+        """
+        if self._entities is None:
+            with self._locks['entities']:
+                if self._entities is None:
+                    self._entities = find_entities(TokenColumns.from_sentence_elements([self._element]))
+        return self._entities
+
     def get_token_by_id(self, id):
         """
         Accesses token by the XML ID
@@ -239,9 +865,34 @@ class Sentence():
 
         """
         if self.parse_string is not None and self._parse is None:
-            self._parse = Tree.parse(self._parse_string)
+            with self._locks['parse']:
+                if self._parse is None:
+                    """ NLTK is slow to import, so only pay for it when a parse tree is actually needed """
+                    from nltk import Tree
+                    self._parse = Tree.parse(self._parse_string)
         return self._parse
 
+    def _get_dependencies(self, attribute, dependency_type):
+        """
+        Lazy-loads and memoizes the dependency graph of a given type
+
+        :param attribute: the attribute memoizing the graph
+        :type attribute: str
+        :param dependency_type: the type attribute of the dependencies element
+        :type dependency_type: str
+
+        :return: the dependency graph, or None if the XML doesn't have it
+        :rtype: corenlp_xml.dependencies.DependencyGraph
+
+        """
+        if getattr(self, attribute) is None:
+            with self._locks[attribute]:
+                if getattr(self, attribute) is None:
+                    deps = self._element.xpath('dependencies[@type="%s"]' % dependency_type)
+                    if len(deps) > 0:
+                        setattr(self, attribute, DependencyGraph(deps[0]))
+        return getattr(self, attribute)
+
     @property
     def basic_dependencies(self):
         """
@@ -251,11 +902,7 @@ class Sentence():
         :type: corenlp_xml.dependencies.DependencyGraph
 
         """
-        if self._basic_dependencies is None:
-            deps = self._element.xpath('dependencies[@type="basic-dependencies"]')
-            if len(deps) > 0:
-                self._basic_dependencies = DependencyGraph(deps[0])
-        return self._basic_dependencies
+        return self._get_dependencies('_basic_dependencies', 'basic-dependencies')
 
     @property
     def collapsed_dependencies(self):
@@ -266,11 +913,7 @@ class Sentence():
         :type: corenlp_xml.dependencies.DependencyGraph
 
         """
-        if self._basic_dependencies is None:
-            deps = self._element.xpath('dependencies[@type="collapsed-dependencies"]')
-            if len(deps) > 0:
-                self._basic_dependencies = DependencyGraph(deps[0])
-        return self._basic_dependencies
+        return self._get_dependencies('_collapsed_dependencies', 'collapsed-dependencies')
 
     @property
     def collapsed_ccprocessed_dependencies(self):
@@ -281,11 +924,36 @@ class Sentence():
         :type: corenlp_xml.dependencies.DependencyGraph
 
         """
-        if self._basic_dependencies is None:
-            deps = self._element.xpath('dependencies[@type="collapsed-ccprocessed-dependencies"]')
-            if len(deps) > 0:
-                self._basic_dependencies = DependencyGraph(deps[0])
-        return self._basic_dependencies
+        return self._get_dependencies('_collapsed_ccprocessed_dependencies', 'collapsed-ccprocessed-dependencies')
+
+
+class ResidentSentences(object):
+    """
+    The sentences of a document with a bound on resident sentences, materialized as they are accessed
+    """
+
+    def __init__(self, document):
+        """
+        Constructor method
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+
+        """
+        self._document = document
+        self._ids = list(document._get_sentence_elements())
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        for id in self._ids:
+            yield self._document.get_sentence_by_id(id)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._document.get_sentence_by_id(id) for id in self._ids[index]]
+        return self._document.get_sentence_by_id(self._ids[index])
 
 
 class TokenList(list):
@@ -337,6 +1005,7 @@ class Token():
         self._pos = None
         self._ner = None
         self._speaker = None
+        self._extra = None
         self._element = element
 
     @property
@@ -456,3 +1125,16 @@ class Token():
             if len(speakers) > 0:
                 self._speaker = speakers[0]
         return self._speaker
+
+    @property
+    def extra(self):
+        """
+        Fields registered with corenlp_xml.fields.register_token_field, read with one scan over the token's children
+
+        :getter: Returns the value of each registered field, by name
+        :type: dict
+
+        """
+        if self._extra is None:
+            self._extra = TOKEN_EXTRAS.extract(self._element)
+        return self._extra
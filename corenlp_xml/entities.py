@@ -0,0 +1,147 @@
+"""
+Sub-module for grouping consecutive tokens with the same NER tag into entity mentions
+"""
+from itertools import groupby
+
+"""
+The NER tag of tokens outside any entity
+"""
+OUTSIDE = 'O'
+
+
+class Entity(object):
+    """
+    A run of consecutive tokens in one sentence sharing an NER tag.
+
+    Like corenlp_xml.coreference.CoreferenceTable, token IDs follow the XML, so ``end`` is exclusive,
+    and the ``*_index`` attributes point into the token columns the entity was found in.
+    """
+
+    __slots__ = ('type', 'sentence', 'start', 'end', 'start_index', 'end_index',
+                 'character_offset_begin', 'character_offset_end', 'text', 'chain')
+
+    def __init__(self, type, sentence, start, end, start_index, end_index,
+                 character_offset_begin, character_offset_end, text, chain=None):
+        """
+        Constructor method
+
+        :param type: the NER tag, e.g. "PERSON" or "DATE"
+        :type type: str
+        :param sentence: the ID of the sentence
+        :type sentence: int
+        :param start: the ID of the first token
+        :type start: int
+        :param end: the ID of the token after the last one
+        :type end: int
+        :param start_index: the index of the first token in the token columns
+        :type start_index: int
+        :param end_index: the index after the last token in the token columns
+        :type end_index: int
+        :param character_offset_begin: the offset the entity starts at
+        :type character_offset_begin: int
+        :param character_offset_end: the offset the entity ends before
+        :type character_offset_end: int
+        :param text: the words of the entity, spaced as in the original text
+        :type text: str
+        :param chain: the position in Document.coreferences of the chain the entity is mentioned in, if any
+        :type chain: int
+
+        """
+        self.type = type
+        self.sentence = sentence
+        self.start = start
+        self.end = end
+        self.start_index = start_index
+        self.end_index = end_index
+        self.character_offset_begin = character_offset_begin
+        self.character_offset_end = character_offset_end
+        self.text = text
+        self.chain = chain
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __len__(self):
+        return self.end_index - self.start_index
+
+    def __repr__(self):
+        return "<Entity %s %r sentence %d tokens %d-%d>" % (self.type, self.text, self.sentence,
+                                                            self.start, self.end)
+
+
+def _join_words(columns, start_index, end_index):
+    """
+    Rebuilds the text of a run of tokens, with as much space between words as their offsets leave
+    """
+    words, begins, ends = columns.word, columns.character_offset_begin, columns.character_offset_end
+    parts = [words[start_index]]
+    for i in range(start_index + 1, end_index):
+        if begins[i] > ends[i - 1] > -1:
+            parts.append(u' ' * (begins[i] - ends[i - 1]))
+        parts.append(words[i])
+    return u''.join(parts)
+
+
+def find_entities(columns, start_index=0, end_index=None):
+    """
+    Groups runs of tokens with the same NER tag, never crossing a sentence boundary.
+    Runs are found by grouping the NER column, so each token is only looked at once.
+
+    :param columns: the token columns to search
+    :type columns: corenlp_xml.columns.TokenColumns
+    :param start_index: the index into the columns to start at; must be the start of a sentence
+    :type start_index: int
+    :param end_index: the index into the columns to stop before; must be the end of a sentence
+    :type end_index: int
+
+    :return: the entities, in document order
+    :rtype: list of corenlp_xml.entities.Entity
+
+    """
+    if end_index is None:
+        end_index = len(columns)
+    ner, sentence_id, token_id = columns.ner, columns.sentence_id, columns.token_id
+    begins, ends = columns.character_offset_begin, columns.character_offset_end
+    entities = []
+    run_end = start_index
+    for (sentence, tag), run in groupby(range(start_index, end_index), key=lambda i: (sentence_id[i], ner[i])):
+        run_start, run_end = run_end, run_end + sum(1 for _ in run)
+        if tag is None or tag == OUTSIDE:
+            continue
+        entities.append(Entity(tag, sentence, token_id[run_start], token_id[run_end - 1] + 1, run_start, run_end,
+                               begins[run_start], ends[run_end - 1], _join_words(columns, run_start, run_end)))
+    return entities
+
+
+def link_coreferences(entities, table):
+    """
+    Finds the coreference chain each entity is mentioned in: the chain of a mention whose head token
+    is inside the entity, preferring a mention that spans exactly the entity's tokens
+
+    :param entities: the entities to link
+    :type entities: list of corenlp_xml.entities.Entity
+    :param table: the document's resolved coreferences
+    :type table: corenlp_xml.coreference.CoreferenceTable
+
+    :return: copies of the entities with their chain set, or None where no mention matches
+    :rtype: list of corenlp_xml.entities.Entity
+
+    """
+    by_head = dict()
+    by_span = dict()
+    for chain, start_index, end_index, head_index in zip(table.chain, table.start_index, table.end_index,
+                                                         table.head_index):
+        by_head.setdefault(head_index, chain)
+        by_span.setdefault((start_index, end_index), chain)
+    linked = []
+    for entity in entities:
+        chain = by_span.get((entity.start_index, entity.end_index))
+        if chain is None:
+            chain = next((by_head[i] for i in range(entity.start_index, entity.end_index) if i in by_head), None)
+        state = entity.__getstate__()
+        linked.append(Entity(*(state[:-1] + (chain,))))
+    return linked
@@ -0,0 +1,276 @@
+"""
+Sub-module for bulk export of parsed documents to Apache Arrow record batches and Parquet files.
+
+Requires the optional pyarrow dependency.
+"""
+from corenlp_xml.dependencies import iter_dependency_edges
+from corenlp_xml.document import Document
+
+DEFAULT_BATCH_SIZE = 65536
+
+"""
+Column name, arrow type name and whether the column is dictionary-encoded, for each table
+"""
+TOKEN_SCHEMA = (
+    ('document', 'int32', False),
+    ('sentence', 'int32', False),
+    ('token', 'int32', False),
+    ('word', 'string', False),
+    ('lemma', 'string', False),
+    ('character_offset_begin', 'int32', False),
+    ('character_offset_end', 'int32', False),
+    ('pos', 'string', True),
+    ('ner', 'string', True),
+    ('speaker', 'string', True),
+)
+
+DEPENDENCY_SCHEMA = (
+    ('document', 'int32', False),
+    ('sentence', 'int32', False),
+    ('kind', 'string', True),
+    ('relation', 'string', True),
+    ('governor', 'int32', False),
+    ('dependent', 'int32', False),
+)
+
+MENTION_SCHEMA = (
+    ('document', 'int32', False),
+    ('chain', 'int32', False),
+    ('sentence', 'int32', False),
+    ('start', 'int32', False),
+    ('end', 'int32', False),
+    ('head', 'int32', False),
+    ('representative', 'bool_', False),
+    ('text', 'string', False),
+)
+
+
+def _pyarrow():
+    """
+    Imports pyarrow on demand
+
+    :return: the pyarrow module
+    :rtype: module
+
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("corenlp_xml.export requires pyarrow; install it with `pip install pyarrow`")
+    return pyarrow
+
+
+def _as_documents(documents):
+    """
+    Allows a single document to be passed where an iterable of documents is expected
+    """
+    return [documents] if isinstance(documents, Document) else documents
+
+
+class BatchBuilder(object):
+    """
+    Accumulates rows for one table column by column and cuts a record batch every batch_size rows,
+    so a large document is split across batches rather than producing one of any size
+    """
+
+    def __init__(self, schema, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Constructor method
+
+        :param schema: column name, arrow type name and dictionary flag for each column
+        :type schema: tuple
+        :param batch_size: the number of rows per batch
+        :type batch_size: int
+
+        """
+        pa = _pyarrow()
+        self.batch_size = batch_size
+        self._schema = schema
+        self._types = [getattr(pa, type_name)() for _, type_name, _ in schema]
+        self._columns = [[] for _ in schema]
+        self._ready = []
+        fields = []
+        for (name, _, dictionary), arrow_type in zip(schema, self._types):
+            if dictionary:
+                arrow_type = pa.dictionary(pa.int32(), arrow_type)
+            fields.append(pa.field(name, arrow_type))
+        self.schema = pa.schema(fields)
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def append(self, *row):
+        """
+        Buffers a row, given as one value per column in schema order
+        """
+        for column, value in zip(self._columns, row):
+            column.append(value)
+        self._cut()
+
+    def extend(self, *columns):
+        """
+        Buffers many rows, given as one sequence per column in schema order, cutting a batch
+        whenever batch_size rows are buffered
+        """
+        offset, total = 0, len(columns[0])
+        while offset < total:
+            end = offset + self.batch_size - len(self)
+            for column, values in zip(self._columns, columns):
+                column.extend(values[offset:end])
+            offset = end
+            self._cut()
+
+    def _cut(self):
+        if len(self) >= self.batch_size:
+            self._ready.append(self.flush())
+
+    def ready(self):
+        """
+        Hands over the batches cut since the last call
+
+        :return: the full record batches, in order
+        :rtype: list of pyarrow.RecordBatch
+
+        """
+        batches, self._ready = self._ready, []
+        return batches
+
+    def flush(self):
+        """
+        Converts the buffered rows into a record batch and empties the buffer
+
+        :return: the record batch
+        :rtype: pyarrow.RecordBatch
+
+        """
+        pa = _pyarrow()
+        arrays = []
+        for (_, _, dictionary), arrow_type, values in zip(self._schema, self._types, self._columns):
+            arr = pa.array(values, type=arrow_type)
+            arrays.append(arr.dictionary_encode() if dictionary else arr)
+        self._columns = [[] for _ in self._schema]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def _add_tokens(builder, index, document):
+    columns = document.token_columns
+    builder.extend([index] * len(columns), columns.sentence_id, columns.token_id, columns.word,
+                   columns.lemma, columns.character_offset_begin, columns.character_offset_end,
+                   columns.pos, columns.ner, columns.speaker)
+
+
+def _add_dependencies(builder, index, document):
+    for edge in iter_dependency_edges(document._iter_sentence_elements()):
+        builder.append(index, *edge)
+
+
+def _add_mentions(builder, index, document):
+    for chain, coreference in enumerate(document._tree().xpath('/root/document/coreference/coreference')):
+        for mention in coreference.iterfind('mention'):
+            builder.append(index, chain, int(mention.findtext('sentence')), int(mention.findtext('start')),
+                           int(mention.findtext('end')), int(mention.findtext('head')),
+                           mention.get('representative') == 'true', mention.findtext('text', ''))
+
+
+def _batches(documents, schema, add, batch_size):
+    builder = BatchBuilder(schema, batch_size)
+    for index, document in enumerate(_as_documents(documents)):
+        add(builder, index, document)
+        for batch in builder.ready():
+            yield batch
+    if len(builder) > 0:
+        yield builder.flush()
+
+
+def token_batches(documents, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Converts documents into record batches of tokens, one row per token
+
+    :param documents: a document or an iterable of documents
+    :type documents: corenlp_xml.document.Document or iterable
+    :param batch_size: the number of rows per batch; only the last one may be smaller
+    :type batch_size: int
+
+    :return: a generator of record batches
+    :rtype: generator of pyarrow.RecordBatch
+
+    """
+    return _batches(documents, TOKEN_SCHEMA, _add_tokens, batch_size)
+
+
+def dependency_batches(documents, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Converts documents into record batches of dependency edges, one row per edge of every dependency type
+
+    :param documents: a document or an iterable of documents
+    :type documents: corenlp_xml.document.Document or iterable
+    :param batch_size: the number of rows per batch; only the last one may be smaller
+    :type batch_size: int
+
+    :return: a generator of record batches
+    :rtype: generator of pyarrow.RecordBatch
+
+    """
+    return _batches(documents, DEPENDENCY_SCHEMA, _add_dependencies, batch_size)
+
+
+def mention_batches(documents, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Converts documents into record batches of coreference mentions, one row per mention
+
+    :param documents: a document or an iterable of documents
+    :type documents: corenlp_xml.document.Document or iterable
+    :param batch_size: the number of rows per batch; only the last one may be smaller
+    :type batch_size: int
+
+    :return: a generator of record batches
+    :rtype: generator of pyarrow.RecordBatch
+
+    """
+    return _batches(documents, MENTION_SCHEMA, _add_mentions, batch_size)
+
+
+def write_parquet(documents, tokens_path, dependencies_path=None, mentions_path=None,
+                  batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Streams documents into Parquet files, writing a row group whenever a table's buffer fills up.
+    Documents are consumed once, so memory use is bounded by the batch size rather than the corpus size.
+
+    :param documents: a document or an iterable of documents
+    :type documents: corenlp_xml.document.Document or iterable
+    :param tokens_path: where to write the tokens table
+    :type tokens_path: str
+    :param dependencies_path: where to write the dependency edge table, if at all
+    :type dependencies_path: str
+    :param mentions_path: where to write the coreference mention table, if at all
+    :type mentions_path: str
+    :param batch_size: the number of rows per row group; only the last one may be smaller
+    :type batch_size: int
+
+    :return: the number of documents written
+    :rtype: int
+
+    """
+    pa = _pyarrow()
+    import pyarrow.parquet as pq
+    tables = [(path, schema, add) for path, schema, add in ((tokens_path, TOKEN_SCHEMA, _add_tokens),
+                                                           (dependencies_path, DEPENDENCY_SCHEMA, _add_dependencies),
+                                                           (mentions_path, MENTION_SCHEMA, _add_mentions))
+              if path is not None]
+    builders = [BatchBuilder(schema, batch_size) for _, schema, _ in tables]
+    writers = [pq.ParquetWriter(path, builder.schema) for (path, _, _), builder in zip(tables, builders)]
+    count = 0
+    try:
+        for index, document in enumerate(_as_documents(documents)):
+            for (_, _, add), builder, writer in zip(tables, builders, writers):
+                add(builder, index, document)
+                for batch in builder.ready():
+                    writer.write_table(pa.Table.from_batches([batch]))
+            count += 1
+        for builder, writer in zip(builders, writers):
+            if len(builder) > 0:
+                writer.write_table(pa.Table.from_batches([builder.flush()]))
+    finally:
+        for writer in writers:
+            writer.close()
+    return count
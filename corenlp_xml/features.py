@@ -0,0 +1,310 @@
+"""
+Sub-module for extracting token features over whole documents into sparse matrices.
+
+Feature templates are declared once, e.g. the lemma two tokens to the left or the POS of the dependency head,
+and a FeatureExtractor computes every template for every token of a document or batch of documents at once,
+working on whole token columns rather than Token objects. Each feature string is mapped to a column either by
+hashing, or through a vocabulary; both are cached on the extractor, so each distinct value is only hashed or
+looked up once however many calls and documents it appears in.
+"""
+import zlib
+from array import array
+from corenlp_xml.vocabulary import Vocabulary
+
+DEFAULT_N_FEATURES = 1 << 20
+
+"""
+Stand-in values for positions outside the sentence, tokens without a head, and missing annotations
+"""
+BEFORE = u'<s>'
+AFTER = u'</s>'
+ROOT = u'<root>'
+MISSING = u'<none>'
+
+
+class FeatureTemplate(object):
+    """
+    A feature read from a string token column, for the token itself or one at a fixed offset within its sentence
+    """
+
+    def __init__(self, field, offset=0, name=None, transform=None):
+        """
+        Constructor method
+
+        :param field: the token column to read: "word", "lemma", "pos", "ner" or "speaker"
+        :type field: str
+        :param offset: the position relative to each token, e.g. -1 for the previous token
+        :type offset: int
+        :param name: the prefix of the feature strings, defaults to the field and offset, e.g. "lemma[-1]"
+        :type name: str
+        :param transform: a function applied to each value, e.g. to lowercase words
+        :type transform: callable
+
+        """
+        self.field = field
+        self.offset = offset
+        self.name = name if name is not None else '%s[%+d]' % (field, offset) if offset else field
+        self.transform = transform
+
+    def values(self, document, shared=None):
+        """
+        Reads the template's value for every token of a document
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+        :param shared: scratch space shared by every template computed for the document in one call
+        :type shared: dict
+
+        :return: one value per token, in token column order
+        :rtype: list of str
+
+        """
+        columns = document.token_columns
+        column = getattr(columns, self.field)
+        offset = self.offset
+        values = []
+        for i in range(len(columns.sentence_starts)):
+            start, end = columns.sentence_range(i)
+            length = end - start
+            """ Slice bounds are clamped to the sentence, so windows wider than it can't wrap around the column """
+            if offset > 0:
+                values.extend(column[min(end, start + offset):end])
+                values.extend([AFTER] * min(offset, length))
+            elif offset < 0:
+                values.extend([BEFORE] * min(-offset, length))
+                values.extend(column[start:max(start, end + offset)])
+            else:
+                values.extend(column[start:end])
+        assert len(values) == len(column), "A template should give exactly one value per token"
+        return self._finish(values)
+
+    def _finish(self, values):
+        if self.transform is not None:
+            values = [self.transform(value) if value is not None else value for value in values]
+        return [value if value is not None else MISSING for value in values]
+
+
+class HeadTemplate(FeatureTemplate):
+    """
+    A feature read from a string token column for the dependency head of each token
+    """
+
+    def __init__(self, field, kind='collapsed-ccprocessed', name=None, transform=None):
+        """
+        Constructor method
+
+        :param field: the token column to read
+        :type field: str
+        :param kind: the kind of dependencies to find heads in
+        :type kind: str
+        :param name: the prefix of the feature strings, defaults to e.g. "head.lemma"
+        :type name: str
+        :param transform: a function applied to each value
+        :type transform: callable
+
+        """
+        FeatureTemplate.__init__(self, field, name=name if name is not None else 'head.' + field,
+                                 transform=transform)
+        self.kind = kind
+
+    def values(self, document, shared=None):
+        column = getattr(document.token_columns, self.field)
+        shared = shared if shared is not None else dict()
+        heads = shared.get(('heads', self.kind))
+        if heads is None:
+            matrix = document.dependency_batch(self.kind)
+            heads = shared[('heads', self.kind)] = [None] * len(column)
+            for governor, dependent in zip(matrix.row, matrix.col):
+                if heads[dependent] is None:
+                    heads[dependent] = governor
+            for root in matrix.roots:
+                heads[root] = -1
+        return self._finish([column[head] if head is not None and head > -1 else ROOT if head == -1 else MISSING
+                             for head in heads])
+
+
+def window(field, size, name=None, transform=None):
+    """
+    Declares a template for each position in a window around the token
+
+    :param field: the token column to read
+    :type field: str
+    :param size: how many tokens to look at on either side
+    :type size: int
+    :param name: the prefix of the feature strings, followed by each template's offset, e.g. "w[-1]";
+                 defaults to the field
+    :type name: str
+    :param transform: a function applied to each value
+    :type transform: callable
+
+    :return: the templates, from -size to +size
+    :rtype: list of corenlp_xml.features.FeatureTemplate
+
+    """
+    prefix = name if name is not None else field
+    return [FeatureTemplate(field, offset, name='%s[%+d]' % (prefix, offset) if offset else prefix,
+                            transform=transform)
+            for offset in range(-size, size + 1)]
+
+
+def _hash(feature):
+    return zlib.crc32(feature.encode('utf-8')) & 0xffffffff
+
+
+class _Columns(dict):
+    """
+    Caches the column of each feature string, computing it on a miss
+    """
+
+    def __init__(self, lookup):
+        dict.__init__(self)
+        self.lookup = lookup
+
+    def __missing__(self, feature):
+        column = self[feature] = self.lookup(feature)
+        return column
+
+
+class FeatureMatrix(object):
+    """
+    Binary token features in compressed sparse row form: one row per token, in token column order,
+    and a column per feature. Hash collisions can put the same column in a row more than once.
+    """
+
+    def __init__(self, n_features):
+        """
+        Constructor method
+
+        :param n_features: the number of columns
+        :type n_features: int
+
+        """
+        self.n_features = n_features
+        self.indptr = array('i', [0])
+        self.indices = array('i')
+        self.document_starts = array('i')
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def shape(self):
+        """
+        :getter: Returns the number of rows and columns
+        :type: tuple
+
+        """
+        return len(self), self.n_features
+
+    def rows(self):
+        """
+        Iterates over the feature columns of each row
+
+        :return: a generator of column lists
+        :rtype: generator of list of int
+
+        """
+        indptr, indices = self.indptr, self.indices
+        for i in range(len(self)):
+            yield list(indices[indptr[i]:indptr[i + 1]])
+
+    def to_scipy(self):
+        """
+        Converts to a scipy sparse CSR matrix of ones; requires scipy
+
+        :return: the matrix
+        :rtype: scipy.sparse.csr_matrix
+
+        """
+        try:
+            from scipy import sparse
+        except ImportError:
+            raise ImportError("FeatureMatrix.to_scipy requires scipy")
+        return sparse.csr_matrix(([1] * len(self.indices), self.indices, self.indptr), shape=self.shape)
+
+
+class FeatureExtractor(object):
+    """
+    Computes a fixed set of feature templates for every token of whole documents
+    """
+
+    def __init__(self, templates, n_features=DEFAULT_N_FEATURES, vocabulary=None):
+        """
+        Constructor method
+
+        :param templates: the feature templates
+        :type templates: list of corenlp_xml.features.FeatureTemplate
+        :param n_features: the number of columns to hash features into, or None to give each feature string its
+                           own column through a vocabulary
+        :type n_features: int
+        :param vocabulary: the vocabulary of feature strings when not hashing, e.g. one loaded from a previous run;
+                           unseen features are left out if it is frozen
+        :type vocabulary: corenlp_xml.vocabulary.Vocabulary
+
+        """
+        self.templates = list(templates)
+        self.n_features = n_features
+        if n_features is None:
+            self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+            lookup = self.vocabulary.id
+        else:
+            self.vocabulary = None
+            lookup = lambda feature: _hash(feature) % n_features
+        self._columns = [_Columns(lambda value, prefix=template.name + u'=': lookup(prefix + value))
+                         for template in self.templates]
+
+    def _template_columns(self, document):
+        shared = dict()
+        return [[columns[value] for value in template.values(document, shared)]
+                for template, columns in zip(self.templates, self._columns)]
+
+    def transform(self, document):
+        """
+        Computes the features of every token in a document
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+
+        :return: one row per token
+        :rtype: corenlp_xml.features.FeatureMatrix
+
+        """
+        return self.transform_batch([document])
+
+    def transform_batch(self, documents):
+        """
+        Computes the features of every token in many documents, stacking their rows in order
+
+        :param documents: the documents
+        :type documents: iterable of corenlp_xml.document.Document
+
+        :return: one row per token; document_starts gives the first row of each document
+        :rtype: corenlp_xml.features.FeatureMatrix
+
+        """
+        matrix = FeatureMatrix(self.n_features if self.n_features is not None else 0)
+        indptr, indices = matrix.indptr, matrix.indices
+        for document in documents:
+            matrix.document_starts.append(len(indptr) - 1)
+            for row in zip(*self._template_columns(document)):
+                indices.extend([column for column in row if column > -1])
+                indptr.append(len(indices))
+        if self.n_features is None:
+            matrix.n_features = len(self.vocabulary)
+        return matrix
+
+    def feature_names(self, token_index, document):
+        """
+        Lists the feature strings of one token, e.g. to inspect what a row was built from
+
+        :param token_index: the index of the token in the document's token columns
+        :type token_index: int
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+
+        :return: the feature strings, one per template
+        :rtype: list of str
+
+        """
+        shared = dict()
+        return [template.name + u'=' + template.values(document, shared)[token_index] for template in self.templates]
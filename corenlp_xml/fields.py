@@ -0,0 +1,250 @@
+"""
+Sub-module for declaring extra annotations to read from tokens, sentences and mentions.
+
+CoreNLP writes more than the library exposes as properties, e.g. <NormalizedNER>, <Timex> or <TrueCase>
+under each token. Registering a field here makes Document and its objects read it in the same scan over an
+element's children as the built-in fields, by dispatching on the child's tag:
+
+    from corenlp_xml.fields import register_token_field
+    register_token_field('normalized_ner', 'NormalizedNER')
+    register_token_field('timex_type', 'Timex', attribute='type')
+
+Registered token fields appear in Token.extra and as columns in TokenColumns.extra; sentence and mention fields
+appear in Sentence.extra and Mention.extra. Fields should be registered before documents are loaded, since
+token columns built earlier won't include them.
+
+Documents loaded with Document.from_json read a token field from the JSON key CoreNLP writes for its tag,
+e.g. "truecase" for <TrueCase>, see JSON_KEYS; other tags are looked up under the tag itself unless the field
+is registered with a json_key.
+"""
+import threading
+
+"""
+The keys CoreNLP's JSON output writes token annotations under, by their tag in the XML output
+"""
+JSON_KEYS = (
+    ('NormalizedNER', 'normalizedNER'),
+    ('TrueCase', 'truecase'),
+    ('TrueCaseText', 'truecaseText'),
+    ('Speaker', 'speaker'),
+    ('Timex', 'timex'),
+)
+
+
+class FieldSpec(object):
+    """
+    Where to find one extra field of an element, and how to convert it
+    """
+
+    def __init__(self, name, tag=None, attribute=None, converter=None, default=None, json_key=None):
+        """
+        Constructor method
+
+        :param name: the name the field is exposed under
+        :type name: str
+        :param tag: the tag of the child element holding the value; None to read an attribute of the element itself
+        :type tag: str
+        :param attribute: the attribute holding the value; None to read the child's text
+        :type attribute: str
+        :param converter: applied to the raw string, e.g. int
+        :type converter: callable
+        :param default: the value when the element doesn't have the field
+        :type default: object
+        :param json_key: the key of the value in CoreNLP's JSON output; defaults to the key in JSON_KEYS, or the tag
+        :type json_key: str
+
+        """
+        if tag is None and attribute is None:
+            raise ValueError("A field needs a child tag, an attribute, or both")
+        self.name = name
+        self.tag = tag
+        self.attribute = attribute
+        self.converter = converter
+        self.default = default
+        self.json_key = json_key if json_key is not None else dict(JSON_KEYS).get(tag, tag)
+
+    def convert(self, raw):
+        """
+        Converts a raw string, falling back to the default for missing values
+
+        :param raw: the text or attribute value, or None
+        :type raw: str
+
+        :return: the value
+        :rtype: object
+
+        """
+        if raw is None:
+            return self.default
+        return self.converter(raw) if self.converter is not None else raw
+
+    def read(self, child):
+        """
+        Reads the raw value from the matching child element
+
+        :param child: the child element
+        :type child: lxml.etree.ElementBase
+
+        :return: the raw value
+        :rtype: str
+
+        """
+        return child.text if self.attribute is None else child.get(self.attribute)
+
+
+class FieldSet(object):
+    """
+    An immutable snapshot of the extra fields registered for one kind of element, indexed by child tag
+    for a single scan. Loading code takes one snapshot per element or batch of elements and reads only that,
+    so registering fields on another thread can't change the fields part way through.
+    """
+
+    def __init__(self, specs=()):
+        """
+        Constructor method
+
+        :param specs: the fields, in registration order
+        :type specs: iterable of corenlp_xml.fields.FieldSpec
+
+        """
+        self.specs = tuple(specs)
+        by_tag = dict()
+        for spec in self.specs:
+            if spec.tag is not None:
+                by_tag[spec.tag] = by_tag.get(spec.tag, ()) + (spec,)
+        self.by_tag = by_tag
+        self.attributes = tuple(spec for spec in self.specs if spec.tag is None)
+
+    def __len__(self):
+        return len(self.specs)
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def extract(self, element):
+        """
+        Reads every field of an element with one scan over its children
+
+        :param element: the token, sentence or mention element
+        :type element: lxml.etree.ElementBase
+
+        :return: the value of each field, by name
+        :rtype: dict
+
+        """
+        raw = dict((spec.name, element.get(spec.attribute)) for spec in self.attributes)
+        by_tag = self.by_tag
+        if by_tag:
+            for child in element:
+                for spec in by_tag.get(child.tag, ()):
+                    if raw.get(spec.name) is None:
+                        raw[spec.name] = spec.read(child)
+        return dict((spec.name, spec.convert(raw.get(spec.name))) for spec in self.specs)
+
+
+class FieldRegistry(object):
+    """
+    The extra fields registered for one kind of element.
+
+    The registry never changes a FieldSet in place: registering or unregistering builds a new one and swaps it
+    in with a single assignment to ``fields``, so readers on other threads always see a complete snapshot.
+    """
+
+    def __init__(self, reserved=()):
+        """
+        Constructor method
+
+        :param reserved: names already taken by built-in fields
+        :type reserved: tuple of str
+
+        """
+        self.reserved = frozenset(reserved)
+        self.fields = FieldSet()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def register(self, name, tag=None, attribute=None, converter=None, default=None, json_key=None):
+        """
+        Registers a field, replacing any registered under the same name
+
+        :return: the field
+        :rtype: corenlp_xml.fields.FieldSpec
+
+        """
+        if name in self.reserved:
+            raise ValueError("%r is a built-in field" % name)
+        spec = FieldSpec(name, tag, attribute, converter, default, json_key)
+        with self._lock:
+            self.fields = FieldSet([other for other in self.fields if other.name != name] + [spec])
+        return spec
+
+    def unregister(self, name):
+        """
+        Removes a field, if registered
+
+        :param name: the name of the field
+        :type name: str
+
+        """
+        with self._lock:
+            self.fields = FieldSet(spec for spec in self.fields if spec.name != name)
+
+    def extract(self, element):
+        """
+        Reads every registered field of an element with one scan over its children
+
+        :param element: the token, sentence or mention element
+        :type element: lxml.etree.ElementBase
+
+        :return: the value of each field, by name
+        :rtype: dict
+
+        """
+        return self.fields.extract(element)
+
+
+"""
+The registries for each kind of element
+"""
+TOKEN_EXTRAS = FieldRegistry(reserved=('id', 'word', 'lemma', 'character_offset_begin', 'character_offset_end',
+                                       'pos', 'ner', 'speaker', 'sentence_id', 'token_id'))
+SENTENCE_EXTRAS = FieldRegistry(reserved=('id', 'sentiment'))
+MENTION_EXTRAS = FieldRegistry(reserved=('sentence', 'start', 'end', 'head', 'text', 'representative'))
+
+
+def register_token_field(name, tag=None, attribute=None, converter=None, default=None, json_key=None):
+    """
+    Registers an extra token field, see corenlp_xml.fields.FieldSpec
+
+    :return: the field
+    :rtype: corenlp_xml.fields.FieldSpec
+
+    """
+    return TOKEN_EXTRAS.register(name, tag, attribute, converter, default, json_key)
+
+
+def register_sentence_field(name, tag=None, attribute=None, converter=None, default=None, json_key=None):
+    """
+    Registers an extra sentence field, see corenlp_xml.fields.FieldSpec
+
+    :return: the field
+    :rtype: corenlp_xml.fields.FieldSpec
+
+    """
+    return SENTENCE_EXTRAS.register(name, tag, attribute, converter, default, json_key)
+
+
+def register_mention_field(name, tag=None, attribute=None, converter=None, default=None, json_key=None):
+    """
+    Registers an extra coreference mention field, see corenlp_xml.fields.FieldSpec
+
+    :return: the field
+    :rtype: corenlp_xml.fields.FieldSpec
+
+    """
+    return MENTION_EXTRAS.register(name, tag, attribute, converter, default, json_key)
@@ -0,0 +1,166 @@
+"""
+Sub-module for random access into large CoreNLP XML files via a byte-offset sidecar index
+"""
+import json
+import mmap
+import os
+import re
+from lxml import etree
+from corenlp_xml.coreference import Coreference
+from corenlp_xml.document import Sentence
+
+INDEX_VERSION = 1
+SENTENCE_OPEN = re.compile(br'<sentence id="(\d+)"')
+SENTENCE_CLOSE = b'</sentence>'
+COREFERENCE_OPEN = b'<coreference>'
+COREFERENCE_CLOSE = b'</coreference>'
+MENTION_SENTENCE = re.compile(br'<sentence>(\d+)</sentence>')
+
+
+def build_index(data):
+    """
+    Scans raw CoreNLP XML for the byte ranges of each sentence and coreference chain
+
+    :param data: the raw XML, typically a memory map of the file
+    :type data: mmap.mmap or bytes
+
+    :return: a dict with "sentences" as [id, start, end] and "coreferences" as [start, end, sentence ids]
+    :rtype: dict
+
+    :raises ValueError: if a sentence isn't closed
+
+    """
+    sentences = []
+    pos = 0
+    while True:
+        match = SENTENCE_OPEN.search(data, pos)
+        if match is None:
+            break
+        close = data.find(SENTENCE_CLOSE, match.end())
+        if close == -1:
+            raise ValueError("Sentence %s at byte %d has no closing tag; is the file truncated or still being "
+                             "written?" % (match.group(1).decode('ascii'), match.start()))
+        end = close + len(SENTENCE_CLOSE)
+        sentences.append([int(match.group(1)), match.start(), end])
+        pos = end
+
+    coreferences = []
+    outer = data.find(COREFERENCE_OPEN, pos)
+    if outer > -1:
+        pos = outer + len(COREFERENCE_OPEN)
+        while True:
+            start = data.find(COREFERENCE_OPEN, pos)
+            close = data.find(COREFERENCE_CLOSE, pos)
+            if start == -1 or close < start:
+                """ The next close tag belongs to the wrapping element """
+                break
+            end = close + len(COREFERENCE_CLOSE)
+            sentence_ids = sorted(set(int(i) for i in MENTION_SENTENCE.findall(data[start:end])))
+            coreferences.append([start, end, sentence_ids])
+            pos = end
+
+    return {u'sentences': sentences, u'coreferences': coreferences}
+
+
+class IndexedDocument(object):
+    """
+    Provides sentence-level access to a CoreNLP XML file without parsing all of it.
+
+    Sentences and coreference chains are located with a sidecar index of byte offsets,
+    which is built by a single scan the first time a file is opened and reused afterwards.
+    """
+
+    def __init__(self, path, index_path=None):
+        """
+        Constructor method
+
+        :param path: path to the CoreNLP XML file
+        :type path: str
+        :param index_path: where to store the sidecar index, defaults to the path with ".idx" appended
+        :type index_path: str
+
+        """
+        self.path = path
+        self.index_path = index_path if index_path is not None else path + '.idx'
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._sentences_dict = dict()
+        self._index = self._load_index()
+        self._sentence_offsets = dict((sid, (start, end)) for sid, start, end in self._index[u'sentences'])
+
+    def _load_index(self):
+        """
+        Reads the sidecar index, rebuilding it if it is missing or stale
+
+        :return: the index
+        :rtype: dict
+
+        """
+        stat = os.stat(self.path)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as index_file:
+                index = json.load(index_file)
+            if (index.get(u'version') == INDEX_VERSION and index.get(u'size') == stat.st_size
+                    and index.get(u'mtime') == stat.st_mtime):
+                return index
+        index = build_index(self._mmap)
+        index.update({u'version': INDEX_VERSION, u'size': stat.st_size, u'mtime': stat.st_mtime})
+        with open(self.index_path, 'w') as index_file:
+            json.dump(index, index_file)
+        return index
+
+    @property
+    def sentence_ids(self):
+        """
+        The IDs of all sentences in the file, in document order
+
+        :getter: returns the sentence IDs
+        :type: list of int
+
+        """
+        return [sid for sid, _, _ in self._index[u'sentences']]
+
+    def get_sentence_by_id(self, id):
+        """
+        Parses only the XML fragment for the requested sentence
+
+        :param id: the ID of the sentence, as defined in the XML
+        :type id: int
+
+        :return: a sentence, or None if the ID doesn't exist
+        :rtype: corenlp_xml.document.Sentence
+
+        """
+        if id not in self._sentences_dict:
+            offsets = self._sentence_offsets.get(id)
+            if offsets is None:
+                return None
+            self._sentences_dict[id] = Sentence(etree.fromstring(self._mmap[offsets[0]:offsets[1]]))
+        return self._sentences_dict[id]
+
+    def coreferences_for_sentence(self, id):
+        """
+        Parses only the coreference chains with a mention in the given sentence
+
+        :param id: the ID of the sentence, as defined in the XML
+        :type id: int
+
+        :return: the matching coreference chains
+        :rtype: list of corenlp_xml.coreference.Coreference
+
+        """
+        return [Coreference(self, etree.fromstring(self._mmap[start:end]))
+                for start, end, sentence_ids in self._index[u'coreferences'] if id in sentence_ids]
+
+    def close(self):
+        """
+        Releases the memory map and file handle
+        """
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,262 @@
+"""
+Sub-module for reading CoreNLP's JSON output behind the same Document API as its XML.
+
+The JSON is decoded with the fastest parser available, orjson or ujson if installed and the standard library
+otherwise. Token columns, the coreference table, dependency matrices and the document sentiment are built
+straight from the decoded objects into arrays. Sentence, Token, DependencyGraph and Coreference objects wrap
+XML elements, so the first time one of them is needed, an element tree in the shape of CoreNLP's XML is built
+from the JSON, see build_tree; documents only ever used through their columns never build it.
+
+Sentence dependencies are read from the keys older CoreNLP versions write, e.g. "basic-dependencies",
+as well as newer ones, e.g. "basicDependencies" and "enhancedPlusPlusDependencies". Newer versions no longer
+write collapsed dependencies; like their XML output, the enhanced and enhanced++ dependencies stand in for the
+collapsed and collapsed-ccprocessed ones, see DEPENDENCY_KEYS.
+"""
+import json
+from array import array
+from xml.sax.saxutils import escape, quoteattr
+from lxml import etree
+from corenlp_xml.columns import TokenColumns
+from corenlp_xml.fields import TOKEN_EXTRAS
+
+"""
+Maps each token key to the XML tag it is written under and the column it fills, if any
+"""
+TOKEN_KEYS = (
+    ('word', 'word', 'word'),
+    ('lemma', 'lemma', 'lemma'),
+    ('characterOffsetBegin', 'CharacterOffsetBegin', 'character_offset_begin'),
+    ('characterOffsetEnd', 'CharacterOffsetEnd', 'character_offset_end'),
+    ('pos', 'POS', 'pos'),
+    ('ner', 'NER', 'ner'),
+    ('normalizedNER', 'NormalizedNER', None),
+    ('speaker', 'Speaker', 'speaker'),
+)
+
+"""
+Maps each sentence key holding dependencies to the type attribute of the XML dependencies element.
+The first key a sentence has wins for each type, so enhanced dependencies only fill in for collapsed ones
+missing from the JSON.
+"""
+DEPENDENCY_KEYS = (
+    ('basic-dependencies', 'basic-dependencies'),
+    ('basicDependencies', 'basic-dependencies'),
+    ('collapsed-dependencies', 'collapsed-dependencies'),
+    ('enhancedDependencies', 'collapsed-dependencies'),
+    ('collapsed-ccprocessed-dependencies', 'collapsed-ccprocessed-dependencies'),
+    ('enhancedPlusPlusDependencies', 'collapsed-ccprocessed-dependencies'),
+    ('enhancedDependencies', 'enhanced-dependencies'),
+    ('enhancedPlusPlusDependencies', 'enhanced-plus-plus-dependencies'),
+)
+
+def _select_decoder():
+    """
+    Picks the fastest JSON decoder installed, once, when the module is imported
+    """
+    for name in ('orjson', 'ujson'):
+        try:
+            return __import__(name).loads
+        except ImportError:
+            pass
+    return json.loads
+
+
+"""
+The decoder loads uses unless it is given one
+"""
+DECODER = _select_decoder()
+
+
+def loads(json_string, decoder=DECODER):
+    """
+    Decodes JSON with orjson or ujson when installed, falling back to the standard library
+
+    :param json_string: the JSON
+    :type json_string: str or bytes
+    :param decoder: the function to decode with, defaults to DECODER
+    :type decoder: callable
+
+    :return: the decoded document
+    :rtype: dict
+
+    """
+    if isinstance(json_string, bytes) and decoder is json.loads:
+        json_string = json_string.decode('utf-8')
+    return decoder(json_string)
+
+
+_STRING_TYPES = (str, type(u''))
+
+
+def _text(value):
+    return value if isinstance(value, _STRING_TYPES) else str(value)
+
+
+def _relation(dep):
+    """ The JSON names the relation from ROOT in capitals, where the XML has "root" """
+    relation = dep['dep']
+    return 'root' if relation == 'ROOT' else relation
+
+
+def iter_dependency_triples(sentence, kind):
+    """
+    Reads one kind of dependencies of a JSON sentence, like corenlp_xml.dependencies.iter_dependency_triples
+
+    :param sentence: the decoded sentence
+    :type sentence: dict
+    :param kind: the type attribute of the XML dependencies element, e.g. "basic-dependencies"
+    :type kind: str
+
+    :return: a generator of (relation, governor idx, dependent idx) tuples
+    :rtype: generator of tuple
+
+    """
+    for key, dependency_type in DEPENDENCY_KEYS:
+        if dependency_type == kind and key in sentence:
+            for dep in sentence[key]:
+                yield _relation(dep), dep['governor'], dep['dependent']
+            return
+
+
+def average_sentiment(data):
+    """
+    Averages the sentence sentiment values, as CoreNLP does for the averageSentiment attribute of its XML
+
+    :param data: the decoded document
+    :type data: dict
+
+    :return: the average, or None if any sentence has no sentiment
+    :rtype: float
+
+    """
+    values = [sentence.get('sentimentValue') for sentence in data['sentences']]
+    if not values or None in values:
+        return None
+    return float(sum(int(value) for value in values)) / len(values)
+
+
+def build_columns(data):
+    """
+    Builds token columns straight from the decoded tokens, without extra fields; Document.from_json reads
+    the columns from the tree instead while fields are registered with corenlp_xml.fields.register_token_field.
+    Other token keys only become elements of the tree when a token field with the key as its json_key is registered.
+
+    :param data: the decoded document
+    :type data: dict
+
+    :return: the populated columns
+    :rtype: corenlp_xml.columns.TokenColumns
+
+    """
+    columns = TokenColumns()
+    fields = [(key, getattr(columns, name), -1 if isinstance(getattr(columns, name), array) else None)
+              for key, _, name in TOKEN_KEYS if name is not None]
+    sentence_id, token_id = columns.sentence_id, columns.token_id
+    for sentence in data['sentences']:
+        sentence_index = sentence['index'] + 1
+        columns.sentence_ids.append(sentence_index)
+        columns.sentence_starts.append(len(token_id))
+        for token in sentence['tokens']:
+            sentence_id.append(sentence_index)
+            token_id.append(token['index'])
+            get = token.get
+            for key, column, default in fields:
+                value = get(key)
+                column.append(value if value is not None else default)
+    return columns
+
+
+def mention_rows(data):
+    """
+    Reads the coreference mentions as raw rows for corenlp_xml.coreference.CoreferenceTable.from_rows.
+    Chains are numbered in the order of their ids, which is the order they are written in the XML.
+
+    :param data: the decoded document
+    :type data: dict
+
+    :return: (sentence, start, chain, end, head, representative) tuples
+    :rtype: list of tuple
+
+    """
+    return [(mention['sentNum'], mention['startIndex'], chain, mention['endIndex'], mention['headIndex'],
+             bool(mention.get('isRepresentativeMention')))
+            for chain, mentions in enumerate(_chains(data)) for mention in mentions]
+
+
+def _chains(data):
+    corefs = data.get('corefs') or dict()
+    return [corefs[key] for key in sorted(corefs, key=int)]
+
+
+def _element(tag, value):
+    return u'<%s>%s</%s>' % (tag, escape(_text(value)), tag)
+
+
+def build_tree(data):
+    """
+    Builds an element tree in the shape of CoreNLP's XML from the decoded JSON.
+    The elements are written out as XML text and parsed in one go, which is quicker than creating them one by one.
+
+    :param data: the decoded document
+    :type data: dict
+
+    :return: the root element
+    :rtype: lxml.etree.ElementBase
+
+    """
+    written = frozenset([tag for _, tag, _ in TOKEN_KEYS] + ['Timex'])
+    extras = [(specs[0].json_key, tag) for tag, specs in TOKEN_EXTRAS.fields.by_tag.items() if tag not in written]
+    parts = [u'<root><document>']
+    write = parts.append
+    average = average_sentiment(data)
+    write(u'<sentences averageSentiment="%r">' % average if average is not None else u'<sentences>')
+    for sentence in data['sentences']:
+        write(u'<sentence id="%d"' % (sentence['index'] + 1))
+        if sentence.get('sentimentValue') is not None:
+            write(u' sentiment=%s' % quoteattr(_text(sentence['sentimentValue'])))
+        write(u'><tokens>')
+        for token in sentence['tokens']:
+            write(u'<token id="%d">' % token['index'])
+            for key, tag, _ in TOKEN_KEYS:
+                value = token.get(key)
+                if value is not None:
+                    write(_element(tag, value))
+            timex = token.get('timex')
+            if timex is not None:
+                write(u'<Timex tid=%s type=%s>%s</Timex>' % (quoteattr(timex['tid']), quoteattr(timex['type']),
+                                                             escape(timex.get('value') or u'')))
+            for key, tag in extras:
+                if token.get(key) is not None and not isinstance(token[key], dict):
+                    write(_element(tag, token[key]))
+            write(u'</token>')
+        write(u'</tokens>')
+        if sentence.get('parse') is not None:
+            write(_element('parse', sentence['parse']))
+        dependency_types = set()
+        for key, dependency_type in DEPENDENCY_KEYS:
+            if key not in sentence or dependency_type in dependency_types:
+                continue
+            dependency_types.add(dependency_type)
+            write(u'<dependencies type="%s">' % dependency_type)
+            for dep in sentence[key]:
+                write(u'<dep type=%s><governor idx="%d">%s</governor><dependent idx="%d">%s</dependent></dep>' % (
+                    quoteattr(_relation(dep)), dep['governor'], escape(dep.get('governorGloss') or u''),
+                    dep['dependent'], escape(dep.get('dependentGloss') or u'')))
+            write(u'</dependencies>')
+        write(u'</sentence>')
+    write(u'</sentences>')
+    chains = _chains(data)
+    if chains:
+        write(u'<coreference>')
+        for mentions in chains:
+            write(u'<coreference>')
+            for mention in mentions:
+                write(u'<mention representative="true">' if mention.get('isRepresentativeMention') else u'<mention>')
+                for tag, key in (('sentence', 'sentNum'), ('start', 'startIndex'), ('end', 'endIndex'),
+                                 ('head', 'headIndex'), ('text', 'text')):
+                    write(_element(tag, mention[key]))
+                write(u'</mention>')
+            write(u'</coreference>')
+        write(u'</coreference>')
+    write(u'</document></root>')
+    return etree.fromstring(u''.join(parts).encode('utf-8'))
@@ -0,0 +1,70 @@
+"""
+Sub-module for the once-only initialization of lazily-loaded fields in thread-safe mode.
+
+Each object in thread-safe mode owns one lock per lazily-loaded field. A field is checked without
+the lock, and only when it is still unset is the lock taken and the field checked again before it
+is built. Loaded fields therefore cost nothing to read, and threads only ever wait on each other
+while the same field of the same object is being built. There is no global lock.
+"""
+import threading
+
+
+class _NoLock(object):
+    """
+    A do-nothing context manager standing in for a lock outside of thread-safe mode
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class FieldLocks(object):
+    """
+    One lock per lazily-loaded field of an object
+    """
+
+    def __init__(self, *fields):
+        """
+        Constructor method; all locks are created up front, so creating them can't race
+
+        :param fields: the names of the fields to guard
+        :type fields: str
+
+        """
+        self._locks = dict((field, threading.Lock()) for field in fields)
+
+    def __getitem__(self, field):
+        return self._locks[field]
+
+
+class NoLocks(object):
+    """
+    Stands in for FieldLocks outside of thread-safe mode, handing out the same do-nothing lock for every field
+    """
+
+    _no_lock = _NoLock()
+
+    def __getitem__(self, field):
+        return self._no_lock
+
+
+NO_LOCKS = NoLocks()
+
+
+def field_locks(thread_safe, *fields):
+    """
+    Creates the locks for an object's lazily-loaded fields
+
+    :param thread_safe: whether the object is shared between threads
+    :type thread_safe: bool
+    :param fields: the names of the fields to guard
+    :type fields: str
+
+    :return: real locks in thread-safe mode, otherwise a shared do-nothing stand-in
+    :rtype: corenlp_xml.locking.FieldLocks or corenlp_xml.locking.NoLocks
+
+    """
+    return FieldLocks(*fields) if thread_safe else NO_LOCKS
@@ -0,0 +1,65 @@
+"""
+Sub-module for configuring and reusing lxml parsers.
+
+lxml parsers aren't safe to share between threads, but creating one for every document is wasted work,
+so get_parser keeps one parser per set of options on each thread.
+"""
+import threading
+from lxml import etree
+
+"""
+Options for CoreNLP output from a trusted source: no limits on text size or tree depth, no entity
+resolution or network access, and no nodes kept for whitespace between elements, comments or
+processing instructions such as the xml-stylesheet reference CoreNLP writes. They are kept as pairs
+so that they can't be changed under other threads; pass dict(TRUSTED_OPTIONS, huge_tree=False) to adjust them.
+"""
+TRUSTED_OPTIONS = (
+    ('remove_blank_text', True),
+    ('huge_tree', True),
+    ('remove_comments', True),
+    ('remove_pis', True),
+    ('resolve_entities', False),
+    ('no_network', True),
+)
+
+_local = threading.local()
+
+
+def get_parser(options):
+    """
+    Returns this thread's parser for a set of options, creating it on first use
+
+    :param options: keyword arguments for lxml.etree.XMLParser, e.g. corenlp_xml.parsers.TRUSTED_OPTIONS
+    :type options: dict or tuple of (name, value) pairs
+
+    :return: the parser
+    :rtype: lxml.etree.XMLParser
+
+    """
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = dict()
+    options = dict(options)
+    key = tuple(sorted(options.items()))
+    parser = parsers.get(key)
+    if parser is None:
+        parser = parsers[key] = etree.XMLParser(**options)
+    return parser
+
+
+def parse(xml_string, parser_options=None):
+    """
+    Parses XML, with lxml's default parser unless options are given
+
+    :param xml_string: the XML
+    :type xml_string: str
+    :param parser_options: keyword arguments for lxml.etree.XMLParser
+    :type parser_options: dict or tuple of (name, value) pairs
+
+    :return: the root element
+    :rtype: lxml.etree.ElementBase
+
+    """
+    if parser_options is None:
+        return etree.fromstring(xml_string)
+    return etree.fromstring(xml_string, get_parser(parser_options))
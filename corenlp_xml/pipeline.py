@@ -0,0 +1,331 @@
+"""
+Sub-module for composing generator-based processing pipelines over corpora of CoreNLP XML files.
+
+Items flow through the pipeline as (name, value) pairs. Each stage can run serially, on a thread pool,
+or on a process pool. Parallel stages keep at most ``queue_size`` items in flight, so a slow stage
+further down the pipeline stops upstream stages from reading and parsing more documents than it can take.
+"""
+import time
+from collections import deque
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from corenlp_xml.document import Document
+from corenlp_xml.readers import iter_sources
+
+MODES = ('serial', 'thread', 'process')
+
+
+def read_corpus(path):
+    """
+    Reads every XML file in a directory, or every file in a tar archive, without extracting anything to disk.
+    Compressed files are decompressed as they are read, see corenlp_xml.readers.iter_sources
+
+    :param path: a directory, or a tar archive with any compression tarfile understands
+    :type path: str
+
+    :return: a generator of (name, raw XML) pairs
+    :rtype: generator of tuple
+
+    """
+    for name, stream in iter_sources(path):
+        yield name, stream.read()
+
+
+def count_tokens(document):
+    """
+    Counts the tokens in a document without materializing any sentences
+
+    :param document: the document
+    :type document: corenlp_xml.document.Document
+
+    :return: the number of tokens
+    :rtype: int
+
+    """
+    return sum(int(element.xpath('count(tokens/token)')) for element in document._iter_sentence_elements())
+
+
+class StageStats(object):
+    """
+    Throughput counters for a single stage
+    """
+
+    def __init__(self, name):
+        """
+        Constructor method
+
+        :param name: the name of the stage
+        :type name: str
+
+        """
+        self.name = name
+        self.documents = 0
+        self.tokens = 0
+        self._started = None
+        self._stopped = None
+
+    def start(self):
+        self._started = time.time()
+
+    def stop(self):
+        self._stopped = time.time()
+
+    def record(self, tokens):
+        self.documents += 1
+        self.tokens += tokens
+
+    @property
+    def seconds(self):
+        """
+        Wall-clock time the stage has been running
+
+        :getter: returns elapsed seconds
+        :type: float
+
+        """
+        if self._started is None:
+            return 0.0
+        return (self._stopped if self._stopped is not None else time.time()) - self._started
+
+    @property
+    def documents_per_second(self):
+        """
+        :getter: returns documents processed per second
+        :type: float
+
+        """
+        return self.documents / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def tokens_per_second(self):
+        """
+        :getter: returns tokens processed per second
+        :type: float
+
+        """
+        return self.tokens / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return "<StageStats %s: %d documents (%.1f/s), %d tokens (%.1f/s)>" % (
+            self.name, self.documents, self.documents_per_second, self.tokens, self.tokens_per_second)
+
+
+class Stage(object):
+    """
+    Applies a function to the value of each item
+    """
+
+    def __init__(self, function, name=None, mode='serial', workers=1, queue_size=None):
+        """
+        Constructor method
+
+        :param function: the function applied to each value; must be picklable in process mode
+        :type function: callable
+        :param name: the name reported in stats, defaults to the function's name
+        :type name: str
+        :param mode: one of "serial", "thread" or "process"
+        :type mode: str
+        :param workers: the size of the pool for thread and process modes
+        :type workers: int
+        :param queue_size: the maximum number of items in flight, defaults to twice the number of workers
+        :type queue_size: int
+
+        """
+        if mode not in MODES:
+            raise ValueError("mode must be one of %s" % ", ".join(MODES))
+        self.function = function
+        self.name = name if name is not None else getattr(function, '__name__', type(function).__name__)
+        self.mode = mode
+        self.workers = workers
+        self.queue_size = queue_size if queue_size is not None else 2 * workers
+
+    def apply(self, name, value, tokens):
+        """
+        Processes one item
+
+        :return: the (name, value, tokens) triple for the next stage
+        :rtype: tuple
+
+        """
+        result = self.function(value)
+        return name, result, count_tokens(result) if isinstance(result, Document) else tokens
+
+
+class ParseStage(Stage):
+    """
+    Parses raw XML into documents, optionally selecting fields from each document in the same step.
+
+    Selecting in the parse stage lets a process pool return only the selected fields, rather than whole documents.
+    """
+
+    def __init__(self, select=None, **kwargs):
+        """
+        Constructor method
+
+        :param select: a function applied to each parsed document; must be picklable in process mode
+        :type select: callable
+
+        """
+        kwargs.setdefault('name', 'parse')
+        Stage.__init__(self, select, **kwargs)
+
+    def apply(self, name, value, tokens):
+        document = Document(value)
+        return name, self.function(document) if self.function else document, count_tokens(document)
+
+
+class SinkStage(Stage):
+    """
+    Hands each item to a sink, called as sink(name, value), and passes the item along unchanged
+    """
+
+    def apply(self, name, value, tokens):
+        self.function(name, value)
+        return name, value, tokens
+
+
+def _apply(stage, name, value, tokens):
+    """
+    Module-level entry point, so that stages can be sent to process pools
+    """
+    return stage.apply(name, value, tokens)
+
+
+def _execute(stage, upstream, stats):
+    """
+    Runs a stage over its upstream generator, yielding items in order
+    """
+    stats.start()
+    try:
+        if stage.mode == 'serial':
+            for item in upstream:
+                result = stage.apply(*item)
+                stats.record(result[2])
+                yield result
+            return
+        pool = ThreadPool(stage.workers) if stage.mode == 'thread' else Pool(stage.workers)
+        try:
+            pending = deque()
+            for item in upstream:
+                pending.append(pool.apply_async(_apply, (stage,) + tuple(item)))
+                if len(pending) >= stage.queue_size:
+                    result = pending.popleft().get()
+                    stats.record(result[2])
+                    yield result
+            while pending:
+                result = pending.popleft().get()
+                stats.record(result[2])
+                yield result
+        finally:
+            pool.terminate()
+    finally:
+        stats.stop()
+
+
+class Pipeline(object):
+    """
+    Composes read, parse, select, transform and write stages over a stream of (name, value) items
+    """
+
+    def __init__(self, source):
+        """
+        Constructor method
+
+        :param source: an iterable of (name, raw XML) pairs
+        :type source: iterable
+
+        """
+        self._source = source
+        self._stages = []
+        self.stats = []
+
+    @classmethod
+    def from_path(cls, path):
+        """
+        Builds a pipeline reading from a directory or tar archive of CoreNLP XML files
+
+        :param path: a directory or tar archive
+        :type path: str
+
+        :return: a pipeline
+        :rtype: corenlp_xml.pipeline.Pipeline
+
+        """
+        return cls(read_corpus(path))
+
+    def add(self, stage):
+        """
+        Appends a stage
+
+        :param stage: the stage
+        :type stage: corenlp_xml.pipeline.Stage
+
+        :return: self, provides fluent interface
+        :rtype: corenlp_xml.pipeline.Pipeline
+
+        """
+        self._stages.append(stage)
+        return self
+
+    def parse(self, select=None, **kwargs):
+        """
+        Parses each raw XML value into a document, see corenlp_xml.pipeline.ParseStage
+
+        :return: self, provides fluent interface
+        :rtype: corenlp_xml.pipeline.Pipeline
+
+        """
+        return self.add(ParseStage(select, **kwargs))
+
+    def select(self, function, **kwargs):
+        """
+        Picks fields out of each document
+
+        :return: self, provides fluent interface
+        :rtype: corenlp_xml.pipeline.Pipeline
+
+        """
+        return self.add(Stage(function, **kwargs))
+
+    def transform(self, function, **kwargs):
+        """
+        Transforms each value
+
+        :return: self, provides fluent interface
+        :rtype: corenlp_xml.pipeline.Pipeline
+
+        """
+        return self.add(Stage(function, **kwargs))
+
+    def write(self, sink, **kwargs):
+        """
+        Hands each item to a sink, called as sink(name, value)
+
+        :return: self, provides fluent interface
+        :rtype: corenlp_xml.pipeline.Pipeline
+
+        """
+        return self.add(SinkStage(sink, **kwargs))
+
+    def __iter__(self):
+        """
+        Chains the stages into a single generator of (name, value) pairs, resetting stats
+        """
+        self.stats = [StageStats(stage.name) for stage in self._stages]
+        stream = ((name, value, 0) for name, value in self._source)
+        for stage, stats in zip(self._stages, self.stats):
+            stream = _execute(stage, stream, stats)
+        return ((name, value) for name, value, _ in stream)
+
+    def run(self):
+        """
+        Drains the pipeline
+
+        :return: throughput stats for each stage
+        :rtype: list of corenlp_xml.pipeline.StageStats
+
+        """
+        for _ in self:
+            pass
+        return self.stats
+
@@ -0,0 +1,252 @@
+"""
+Sub-module for reading CoreNLP XML from compressed files and archives without decompressing them into memory first
+"""
+import bz2
+import os
+import tarfile
+import threading
+import zlib
+from lxml import etree
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+CHUNK_SIZE = 1 << 16
+QUEUE_SIZE = 8
+XML_EXTENSIONS = ('.xml', '.xml.gz', '.xml.bz2', '.xml.xz')
+
+
+def open_compressed(fileobj, name):
+    """
+    Wraps a binary file object in a streaming decompressor chosen by the file name's extension
+
+    :param fileobj: a binary file object, which needn't be seekable
+    :type fileobj: file
+    :param name: the file name; ".gz", ".bz2" and ".xz" are decompressed, anything else is read as is
+    :type name: str
+
+    :return: a binary file object yielding uncompressed XML
+    :rtype: file
+
+    """
+    if name.endswith('.gz'):
+        return DecompressingStream(fileobj, lambda: zlib.decompressobj(zlib.MAX_WBITS | 16))
+    if name.endswith('.bz2'):
+        return DecompressingStream(fileobj, bz2.BZ2Decompressor)
+    if name.endswith('.xz'):
+        if lzma is None:
+            raise ImportError("Reading .xz files requires the lzma module")
+        return DecompressingStream(fileobj, lzma.LZMADecompressor)
+    return fileobj
+
+
+class DecompressingStream(object):
+    """
+    Minimal read-only file object that decompresses another file object as it is read.
+    Unlike gzip.GzipFile on older Pythons, it never seeks, so it works on streamed tar members.
+    """
+
+    def __init__(self, fileobj, decompressor_factory):
+        """
+        Constructor method
+
+        :param fileobj: the compressed binary file object
+        :type fileobj: file
+        :param decompressor_factory: creates a decompressor for each concatenated stream in the file
+        :type decompressor_factory: callable
+
+        """
+        self._fileobj = fileobj
+        self._factory = decompressor_factory
+        self._decompressor = decompressor_factory()
+
+    def read(self, size=-1):
+        """
+        Reads up to size compressed bytes and returns whatever they decompress to
+
+        :param size: how many compressed bytes to read; a negative size reads the rest of the file
+        :type size: int
+
+        :return: decompressed bytes, or an empty string at the end of the file
+        :rtype: bytes
+
+        """
+        if size < 0:
+            return b''.join(iter(lambda: self.read(CHUNK_SIZE), b''))
+        while True:
+            data = self._fileobj.read(size)
+            if not data:
+                return b''
+            chunks = []
+            while data:
+                if getattr(self._decompressor, 'eof', False):
+                    self._decompressor = self._factory()
+                chunks.append(self._decompressor.decompress(data))
+                data = self._decompressor.unused_data
+                if data:
+                    self._decompressor = self._factory()
+            data = b''.join(chunks)
+            if data:
+                return data
+
+    def close(self):
+        self._fileobj.close()
+
+
+def _read_chunks(fileobj, chunk_size, queue, stop):
+    """
+    Reads (and so decompresses) chunks on a background thread, handing them to the parser through a bounded queue
+    """
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            queue.put(chunk)
+            if stop.is_set():
+                break
+        queue.put(None)
+    except Exception as e:
+        queue.put(e)
+
+
+def parse_stream(fileobj, chunk_size=CHUNK_SIZE, threaded=True, parser=None):
+    """
+    Feeds a file object into lxml's incremental parser chunk by chunk
+
+    :param fileobj: a binary file object, typically from open_compressed
+    :type fileobj: file
+    :param chunk_size: how many bytes to read at a time
+    :type chunk_size: int
+    :param threaded: whether to read and decompress on a separate thread while this one parses
+    :type threaded: bool
+    :param parser: the parser to feed, defaults to a new lxml.etree.XMLParser
+    :type parser: lxml.etree.XMLParser
+
+    :return: the root element
+    :rtype: lxml.etree.ElementBase
+
+    """
+    parser = parser if parser is not None else etree.XMLParser()
+    complete = False
+    try:
+        root = _feed(fileobj, chunk_size, threaded, parser)
+        complete = True
+        return root
+    finally:
+        if not complete:
+            """ Reset a parser that is reused across documents, so the next one doesn't continue this one """
+            try:
+                parser.close()
+            except etree.XMLSyntaxError:
+                pass
+
+
+def _feed(fileobj, chunk_size, threaded, parser):
+    if not threaded:
+        for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+            parser.feed(chunk)
+        return parser.close()
+    queue = Queue(QUEUE_SIZE)
+    stop = threading.Event()
+    reader = threading.Thread(target=_read_chunks, args=(fileobj, chunk_size, queue, stop))
+    reader.daemon = True
+    reader.start()
+    done = False
+    try:
+        while True:
+            chunk = queue.get()
+            done = chunk is None or isinstance(chunk, Exception)
+            if chunk is None:
+                break
+            if done:
+                raise chunk
+            parser.feed(chunk)
+        return parser.close()
+    finally:
+        """ Stop the reader if parsing failed part way through, rather than decompressing the rest to throw it away """
+        stop.set()
+        while not done:
+            chunk = queue.get()
+            done = chunk is None or isinstance(chunk, Exception)
+        reader.join()
+
+
+def read_path(path, chunk_size=CHUNK_SIZE, threaded=True, parser=None):
+    """
+    Parses a possibly compressed CoreNLP XML file
+
+    :param path: path to a .xml, .xml.gz, .xml.bz2 or .xml.xz file
+    :type path: str
+    :param parser: the parser to feed, defaults to a new lxml.etree.XMLParser
+    :type parser: lxml.etree.XMLParser
+
+    :return: the root element
+    :rtype: lxml.etree.ElementBase
+
+    """
+    with open(path, 'rb') as raw:
+        stream = open_compressed(raw, path)
+        try:
+            return parse_stream(stream, chunk_size=chunk_size, threaded=threaded, parser=parser)
+        finally:
+            stream.close()
+
+
+def iter_sources(path):
+    """
+    Iterates over the CoreNLP XML files in a directory or tar archive, as decompressing file objects
+
+    Tar archives are read in streaming mode, so members are never extracted to disk. Files without one of
+    XML_EXTENSIONS, such as READMEs or JSON sidecars, are skipped in both.
+
+    :param path: a directory, or a tar archive with any compression tarfile understands
+    :type path: str
+
+    :return: a generator of (name, file object) pairs; each file object is only valid until the next is produced
+    :rtype: generator of tuple
+
+    """
+    if os.path.isdir(path):
+        for directory, _, filenames in sorted(os.walk(path)):
+            for filename in sorted(filenames):
+                if filename.endswith(XML_EXTENSIONS):
+                    full_path = os.path.join(directory, filename)
+                    with open(full_path, 'rb') as raw:
+                        stream = open_compressed(raw, filename)
+                        yield os.path.relpath(full_path, path), stream
+                        stream.close()
+    else:
+        archive = tarfile.open(path, 'r|*')
+        try:
+            for member in archive:
+                if member.isfile() and member.name.endswith(XML_EXTENSIONS):
+                    yield member.name, open_compressed(archive.extractfile(member), member.name)
+        finally:
+            archive.close()
+
+
+def iter_documents(path, chunk_size=CHUNK_SIZE, threaded=True):
+    """
+    Parses every CoreNLP XML file in a directory or tar archive, decompressing as it goes
+
+    :param path: a directory, or a tar archive
+    :type path: str
+
+    :return: a generator of (name, document) pairs
+    :rtype: generator of tuple
+
+    """
+    from corenlp_xml.document import Document
+    for name, stream in iter_sources(path):
+        yield name, Document.from_element(parse_stream(stream, chunk_size=chunk_size, threaded=threaded))
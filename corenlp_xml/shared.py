@@ -0,0 +1,224 @@
+"""
+Sub-module for sharing a parsed document's token, dependency and coreference arrays between processes.
+
+A parent process parses a document once and calls share_document, which packs the arrays into a
+single multiprocessing.shared_memory block. The returned handle is small and picklable; worker
+processes pass it to attach_document to get read-only views over the same memory, without copying.
+Strings are dictionary-encoded, and their vocabularies travel with the handle.
+
+Requires Python 3.8 or later.
+"""
+from array import array
+from corenlp_xml.dependencies import iter_dependency_edges
+from corenlp_xml.vocabulary import Vocabulary
+
+ITEM_SIZE = array('i').itemsize
+
+"""
+The integer columns of each table, in the order they are laid out in shared memory
+"""
+TOKEN_COLUMNS = ('sentence_id', 'token_id', 'character_offset_begin', 'character_offset_end',
+                 'word', 'lemma', 'pos', 'ner', 'speaker')
+DEPENDENCY_COLUMNS = ('sentence_id', 'kind', 'relation', 'governor', 'dependent')
+MENTION_COLUMNS = ('chain', 'sentence', 'start', 'end', 'head', 'start_index', 'end_index', 'head_index')
+
+"""
+Which vocabulary encodes each string column
+"""
+ENCODED_COLUMNS = {
+    'tokens.word': 'word',
+    'tokens.lemma': 'word',
+    'tokens.pos': 'pos',
+    'tokens.ner': 'ner',
+    'tokens.speaker': 'speaker',
+    'dependencies.kind': 'kind',
+    'dependencies.relation': 'relation',
+}
+
+
+def _shared_memory():
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError("corenlp_xml.shared requires multiprocessing.shared_memory, available from Python 3.8")
+    return shared_memory
+
+
+def document_arrays(document, vocabularies=None):
+    """
+    Flattens a document into dictionary-encoded integer arrays
+
+    :param document: the document
+    :type document: corenlp_xml.document.Document
+    :param vocabularies: vocabularies to encode with, by name; missing ones are created
+    :type vocabularies: dict
+
+    :return: the arrays keyed by "table.column", and the vocabularies used
+    :rtype: tuple of (dict, dict)
+
+    """
+    vocabularies = dict(vocabularies or {})
+    for name in set(ENCODED_COLUMNS.values()):
+        vocabularies.setdefault(name, Vocabulary())
+    arrays = dict()
+    columns = document.token_columns
+    for name in TOKEN_COLUMNS:
+        key = 'tokens.' + name
+        values = getattr(columns, name)
+        arrays[key] = vocabularies[ENCODED_COLUMNS[key]].encode(values) if key in ENCODED_COLUMNS else values
+    edges = list(iter_dependency_edges(document._iter_sentence_elements()))
+    for position, name in enumerate(DEPENDENCY_COLUMNS):
+        key = 'dependencies.' + name
+        values = [edge[position] for edge in edges]
+        arrays[key] = vocabularies[ENCODED_COLUMNS[key]].encode(values) if key in ENCODED_COLUMNS else array('i', values)
+    table = document.resolve_coreferences()
+    for name in MENTION_COLUMNS:
+        arrays['mentions.' + name] = getattr(table, name)
+    return arrays, vocabularies
+
+
+class SharedDocument(object):
+    """
+    The owner's side of a document's arrays in shared memory
+    """
+
+    def __init__(self, document, vocabularies=None):
+        """
+        Copies the document's arrays into a new shared memory block
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+        :param vocabularies: vocabularies to encode with, by name, e.g. to share ids across documents
+        :type vocabularies: dict
+
+        """
+        shared_memory = _shared_memory()
+        arrays, self.vocabularies = document_arrays(document, vocabularies)
+        layout = dict()
+        offset = 0
+        for key in sorted(arrays):
+            layout[key] = (offset, len(arrays[key]))
+            offset += len(arrays[key]) * ITEM_SIZE
+        self._memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for key, (start, length) in layout.items():
+            self._memory.buf[start:start + length * ITEM_SIZE] = array('i', arrays[key]).tobytes()
+        self.handle = SharedDocumentHandle(self._memory.name, layout,
+                                           dict((name, v.terms) for name, v in self.vocabularies.items()))
+
+    def close(self):
+        """
+        Releases this process's mapping and frees the shared memory; attached views must be closed first
+        """
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedDocumentHandle(object):
+    """
+    A small, picklable description of a shared document: the memory block's name, where each array lives in it,
+    and the vocabularies needed to decode string columns
+    """
+
+    def __init__(self, name, layout, vocabularies):
+        self.name = name
+        self.layout = layout
+        self.vocabularies = vocabularies
+
+
+class SharedDocumentView(object):
+    """
+    A worker's read-only view of a shared document. Columns are memoryviews of C ints over the shared memory.
+    """
+
+    def __init__(self, handle):
+        """
+        Attaches to the shared memory block described by a handle
+
+        :param handle: the handle from SharedDocument.handle
+        :type handle: corenlp_xml.shared.SharedDocumentHandle
+
+        """
+        shared_memory = _shared_memory()
+        try:
+            """ Only the owner should ever unlink the block """
+            self._memory = shared_memory.SharedMemory(name=handle.name, track=False)
+        except TypeError:
+            self._memory = shared_memory.SharedMemory(name=handle.name)
+        self._views = dict()
+        self._handle = handle
+        self.vocabularies = dict((name, Vocabulary(terms, frozen=True)) for name, terms in handle.vocabularies.items())
+
+    def column(self, key):
+        """
+        Accesses an integer column without copying it
+
+        :param key: "table.column", e.g. "tokens.pos" or "dependencies.governor"
+        :type key: str
+
+        :return: the column
+        :rtype: memoryview
+
+        """
+        if key not in self._views:
+            start, length = self._handle.layout[key]
+            self._views[key] = self._memory.buf[start:start + length * ITEM_SIZE].cast('i')
+        return self._views[key]
+
+    def strings(self, key):
+        """
+        Decodes a dictionary-encoded column
+
+        :param key: "table.column", e.g. "tokens.word"
+        :type key: str
+
+        :return: the decoded strings
+        :rtype: list of str
+
+        """
+        return self.vocabularies[ENCODED_COLUMNS[key]].decode(self.column(key))
+
+    def __len__(self):
+        return self._handle.layout['tokens.token_id'][1]
+
+    def close(self):
+        """
+        Releases the views and this process's mapping
+        """
+        for view in self._views.values():
+            view.release()
+        self._views = dict()
+        self._memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def share_document(document, vocabularies=None):
+    """
+    Copies a document's arrays into shared memory, see corenlp_xml.shared.SharedDocument
+
+    :return: the owner's side of the shared document; pass its handle to workers
+    :rtype: corenlp_xml.shared.SharedDocument
+
+    """
+    return SharedDocument(document, vocabularies)
+
+
+def attach_document(handle):
+    """
+    Attaches to a shared document from another process, see corenlp_xml.shared.SharedDocumentView
+
+    :return: the view
+    :rtype: corenlp_xml.shared.SharedDocumentView
+
+    """
+    return SharedDocumentView(handle)
@@ -0,0 +1,237 @@
+"""
+Sub-module for corpus statistics computed with a streaming scan, without materializing sentences or tokens.
+
+Only sentence sentiment attributes, token elements and <POS> text are read. Elements are discarded as soon as
+each sentence, mention or coreference chain has been passed, so memory stays flat however large the document.
+Aggregates from different documents, processes or machines are combined with DocumentStats.merge, or through
+DocumentStats.to_dict.
+"""
+from collections import Counter
+from io import BytesIO
+from lxml import etree
+
+"""
+The elements the scan is told about; lxml skips every other element before it reaches Python
+"""
+SCANNED_TAGS = ('sentences', 'sentence', 'token', 'POS', 'mention', 'coreference')
+
+
+class DocumentStats(object):
+    """
+    Mergeable counts over one or more documents
+    """
+
+    def __init__(self):
+        """
+        Constructor method
+        """
+        self.documents = 0
+        self.sentences = 0
+        self.tokens = 0
+        self.sentiment = Counter()
+        self.pos = Counter()
+        self.sentence_lengths = Counter()
+        self.document_sentiment_total = 0.0
+        self.document_sentiment_count = 0
+
+    def merge(self, other):
+        """
+        Adds another aggregate's counts to this one
+
+        :param other: the other aggregate
+        :type other: corenlp_xml.stats.DocumentStats
+
+        :return: self, provides fluent interface
+        :rtype: corenlp_xml.stats.DocumentStats
+
+        """
+        self.documents += other.documents
+        self.sentences += other.sentences
+        self.tokens += other.tokens
+        self.sentiment.update(other.sentiment)
+        self.pos.update(other.pos)
+        self.sentence_lengths.update(other.sentence_lengths)
+        self.document_sentiment_total += other.document_sentiment_total
+        self.document_sentiment_count += other.document_sentiment_count
+        return self
+
+    def __add__(self, other):
+        return DocumentStats().merge(self).merge(other)
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    @property
+    def mean_sentence_length(self):
+        """
+        :getter: Returns the average number of tokens per sentence, or None without sentences
+        :type: float
+
+        """
+        return float(self.tokens) / self.sentences if self.sentences else None
+
+    @property
+    def mean_sentiment(self):
+        """
+        :getter: Returns the average of the documents' average sentiment, or None without sentiment annotations
+        :type: float
+
+        """
+        if not self.document_sentiment_count:
+            return None
+        return self.document_sentiment_total / self.document_sentiment_count
+
+    def to_dict(self):
+        """
+        Converts the counts to plain types, e.g. to store partial aggregates as JSON
+
+        :return: the counts
+        :rtype: dict
+
+        """
+        return {
+            'documents': self.documents,
+            'sentences': self.sentences,
+            'tokens': self.tokens,
+            'sentiment': dict((str(value), count) for value, count in self.sentiment.items()),
+            'pos': dict(self.pos),
+            'sentence_lengths': dict((str(length), count) for length, count in self.sentence_lengths.items()),
+            'document_sentiment_total': self.document_sentiment_total,
+            'document_sentiment_count': self.document_sentiment_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restores counts converted with DocumentStats.to_dict
+
+        :param data: the counts
+        :type data: dict
+
+        :return: the aggregate
+        :rtype: corenlp_xml.stats.DocumentStats
+
+        """
+        stats = cls()
+        stats.documents = data['documents']
+        stats.sentences = data['sentences']
+        stats.tokens = data['tokens']
+        stats.sentiment = Counter(dict((int(value), count) for value, count in data['sentiment'].items()))
+        stats.pos = Counter(data['pos'])
+        stats.sentence_lengths = Counter(dict((int(length), count)
+                                              for length, count in data['sentence_lengths'].items()))
+        stats.document_sentiment_total = data['document_sentiment_total']
+        stats.document_sentiment_count = data['document_sentiment_count']
+        return stats
+
+    def __repr__(self):
+        return "<DocumentStats %d documents, %d sentences, %d tokens>" % (self.documents, self.sentences,
+                                                                          self.tokens)
+
+
+def _release(element):
+    """
+    Frees an element the scan is done with, along with its preceding siblings
+    """
+    element.clear()
+    while element.getprevious() is not None:
+        del element.getparent()[0]
+
+
+def scan(source, stats=None):
+    """
+    Counts one document with a streaming scan
+
+    :param source: a file object, or a path to a file, containing CoreNLP XML
+    :type source: str or file
+    :param stats: an aggregate to add the counts to, defaults to a new one
+    :type stats: corenlp_xml.stats.DocumentStats
+
+    :return: the aggregate
+    :rtype: corenlp_xml.stats.DocumentStats
+
+    """
+    stats = stats if stats is not None else DocumentStats()
+    sentiment, pos, sentence_lengths = stats.sentiment, stats.pos, stats.sentence_lengths
+    tokens = 0
+    for _, element in etree.iterparse(source, events=('end',), tag=SCANNED_TAGS):
+        tag = element.tag
+        if tag == 'POS':
+            pos[element.text] += 1
+        elif tag == 'token':
+            tokens += 1
+        elif tag == 'sentence':
+            if element.get('id') is None:
+                """ The sentence of a coreference mention """
+                continue
+            stats.sentences += 1
+            stats.tokens += tokens
+            sentence_lengths[tokens] += 1
+            tokens = 0
+            value = element.get('sentiment')
+            if value is not None:
+                sentiment[int(value)] += 1
+            _release(element)
+        elif tag in ('mention', 'coreference'):
+            """ Nothing is counted from coreferences, but they have to be freed like sentences """
+            _release(element)
+        else:
+            average = element.get('averageSentiment')
+            if average is not None:
+                stats.document_sentiment_total += float(average)
+                stats.document_sentiment_count += 1
+    stats.documents += 1
+    return stats
+
+
+def xml_stats(xml_string):
+    """
+    Counts one document held in memory
+
+    :param xml_string: the CoreNLP XML
+    :type xml_string: str
+
+    :return: the counts for the document
+    :rtype: corenlp_xml.stats.DocumentStats
+
+    """
+    if not isinstance(xml_string, bytes):
+        xml_string = xml_string.encode('utf-8')
+    return scan(BytesIO(xml_string))
+
+
+def merge_stats(aggregates):
+    """
+    Combines partial aggregates, e.g. from different processes
+
+    :param aggregates: the partial aggregates
+    :type aggregates: iterable of corenlp_xml.stats.DocumentStats
+
+    :return: the combined aggregate
+    :rtype: corenlp_xml.stats.DocumentStats
+
+    """
+    total = DocumentStats()
+    for aggregate in aggregates:
+        total.merge(aggregate)
+    return total
+
+
+def corpus_stats(path, mode='serial', workers=1):
+    """
+    Counts every document in a directory or tar archive, scanning documents in parallel and merging as they finish
+
+    :param path: a directory or tar archive of CoreNLP XML files
+    :type path: str
+    :param mode: how to scan documents, one of the corenlp_xml.pipeline modes
+    :type mode: str
+    :param workers: the number of processes or threads
+    :type workers: int
+
+    :return: the combined aggregate
+    :rtype: corenlp_xml.stats.DocumentStats
+
+    """
+    from corenlp_xml.pipeline import Pipeline
+    pipeline = Pipeline.from_path(path).transform(xml_stats, mode=mode, workers=workers)
+    return merge_stats(stats for _, stats in pipeline)
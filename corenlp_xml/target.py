@@ -0,0 +1,210 @@
+"""
+Sub-module for loading CoreNLP XML straight into columns with an lxml parser target.
+
+CoreNLP output has a fixed, shallow schema, so instead of building an element tree and querying it,
+a parser target can route each start, data and end event into the token columns, dependency edges
+and coreference table as the parser produces it. No element is ever created, which makes this the
+fastest way to load a document when only those structures are needed. The result has no tree behind
+it, so the object API of corenlp_xml.document.Document isn't available on it.
+"""
+from lxml import etree
+from corenlp_xml.columns import TOKEN_FIELDS, OffsetIndex, TokenColumns
+from corenlp_xml.coreference import CoreferenceTable
+
+"""
+The children of a <mention> whose integer text makes up a coreference row
+"""
+MENTION_FIELDS = ('sentence', 'start', 'end', 'head')
+
+
+class ColumnarDocument(object):
+    """
+    The column-oriented parts of a CoreNLP document, as loaded by CoreNLPTarget
+    """
+
+    def __init__(self):
+        """
+        Constructor method; use corenlp_xml.target.load_columns to populate an instance
+        """
+        self.token_columns = TokenColumns()
+        self.dependency_edges = []
+        self.coreference_table = None
+        self.sentiment = None
+        self.sentence_sentiments = dict()
+        self.parse_strings = dict()
+        self._offset_index = None
+
+    @property
+    def offset_index(self):
+        """
+        Sorted character offsets for offset and span queries over the token columns
+
+        :getter: Returns the offset index
+        :type: corenlp_xml.columns.OffsetIndex
+
+        """
+        if self._offset_index is None:
+            self._offset_index = OffsetIndex(self.token_columns)
+        return self._offset_index
+
+
+class CoreNLPTarget(object):
+    """
+    An lxml parser target that fills a ColumnarDocument from parse events.
+
+    Every callback from the parser is a Python call, so each one does as little as possible:
+    start and end events go through one dict lookup on the tag, and text is only buffered
+    inside the leaf elements that are read, so whitespace and unused fields such as <text>
+    or <NormalizedNER> cost next to nothing. The tags of the schema are distinct enough that
+    no stack of open elements is needed; <sentence> is told apart from a mention's sentence
+    by its id attribute.
+    """
+
+    def __init__(self):
+        self.document = ColumnarDocument()
+        columns = self._columns = self.document.token_columns
+        self._defaults = []
+        self._starts = {
+            'sentences': self._start_sentences,
+            'sentence': self._start_sentence,
+            'token': self._start_token,
+            'parse': self._start_text,
+            'dependencies': self._start_dependencies,
+            'dep': self._start_dep,
+            'governor': self._start_governor,
+            'dependent': self._start_dependent,
+            'coreference': self._start_coreference,
+            'mention': self._start_mention,
+            'start': self._start_text,
+            'end': self._start_text,
+            'head': self._start_text,
+        }
+        self._ends = {
+            'token': self._end_token,
+            'dep': self._end_dep,
+            'mention': self._end_mention,
+        }
+        self._text_ends = {
+            'parse': self._end_parse,
+            'sentence': self._end_mention_field,
+            'start': self._end_mention_field,
+            'end': self._end_mention_field,
+            'head': self._end_mention_field,
+        }
+        for name, tag, converter in TOKEN_FIELDS:
+            column = getattr(columns, name)
+            self._starts[tag] = self._start_text
+            self._text_ends[tag] = self._token_field_end(column, converter)
+            self._defaults.append((column, -1 if converter is int else None))
+        self._text = None
+        self._sentence_id = None
+        self._dependency_kind = None
+        self._dependency = None
+        self._depth = 0
+        self._chain = -1
+        self._mention = None
+        self._mentions = []
+
+    def start(self, tag, attrib):
+        handler = self._starts.get(tag)
+        if handler is not None:
+            handler(tag, attrib)
+
+    def data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def end(self, tag):
+        if self._text is not None:
+            text = ''.join(self._text)
+            self._text = None
+            self._text_ends[tag](tag, text)
+        else:
+            handler = self._ends.get(tag)
+            if handler is not None:
+                handler()
+
+    def close(self):
+        self.document.coreference_table = CoreferenceTable.from_rows(self._mentions, self._columns)
+        return self.document
+
+    def _start_text(self, tag, attrib):
+        self._text = []
+
+    def _start_sentences(self, tag, attrib):
+        self.document.sentiment = float(attrib.get('averageSentiment', 0))
+
+    def _start_sentence(self, tag, attrib):
+        if 'id' not in attrib:
+            """ The sentence a mention is in """
+            self._text = []
+            return
+        sentence_id = self._sentence_id = int(attrib['id'])
+        self._columns.sentence_ids.append(sentence_id)
+        self._columns.sentence_starts.append(len(self._columns.token_id))
+        if 'sentiment' in attrib:
+            self.document.sentence_sentiments[sentence_id] = int(attrib['sentiment'])
+
+    def _start_token(self, tag, attrib):
+        self._columns.sentence_id.append(self._sentence_id)
+        self._columns.token_id.append(int(attrib['id']))
+
+    def _start_dependencies(self, tag, attrib):
+        self._dependency_kind = attrib.get('type')
+
+    def _start_dep(self, tag, attrib):
+        self._dependency = [self._sentence_id, self._dependency_kind, attrib.get('type'), None, None]
+
+    def _start_governor(self, tag, attrib):
+        self._dependency[3] = int(attrib['idx'])
+
+    def _start_dependent(self, tag, attrib):
+        self._dependency[4] = int(attrib['idx'])
+
+    def _start_coreference(self, tag, attrib):
+        """ Chains are nested inside a single outer <coreference> """
+        self._depth += 1
+        if self._depth > 1:
+            self._chain += 1
+
+    def _start_mention(self, tag, attrib):
+        self._mention = {'representative': attrib.get('representative') == 'true'}
+
+    def _token_field_end(self, column, converter):
+        if converter is None:
+            return lambda tag, text: column.append(text)
+        return lambda tag, text: column.append(converter(text))
+
+    def _end_parse(self, tag, text):
+        self.document.parse_strings[self._sentence_id] = text
+
+    def _end_mention_field(self, tag, text):
+        self._mention[tag] = int(text)
+
+    def _end_token(self):
+        length = len(self._columns.token_id)
+        for column, default in self._defaults:
+            if len(column) < length:
+                column.append(default)
+
+    def _end_dep(self):
+        self.document.dependency_edges.append(tuple(self._dependency))
+
+    def _end_mention(self):
+        mention = self._mention
+        self._mentions.append((mention['sentence'], mention['start'], self._chain, mention['end'],
+                               mention['head'], mention['representative']))
+
+
+def load_columns(xml_string):
+    """
+    Loads the token columns, dependency edges and coreference table of a document without building a tree
+
+    :param xml_string: the CoreNLP XML
+    :type xml_string: str
+
+    :return: the loaded columns
+    :rtype: corenlp_xml.target.ColumnarDocument
+
+    """
+    return etree.fromstring(xml_string, etree.XMLParser(target=CoreNLPTarget()))
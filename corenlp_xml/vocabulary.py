@@ -0,0 +1,149 @@
+"""
+Sub-module for mapping strings such as words, tags and relation types to dense integer ids
+"""
+import io
+import json
+from array import array
+
+
+class Vocabulary(object):
+    """
+    A growable, two-way mapping between strings and the integers 0..n-1.
+
+    Ids are assigned in order of first appearance, so they stay stable as the vocabulary grows
+    and one vocabulary can be reused across calls, documents and jobs.
+    """
+
+    def __init__(self, terms=(), frozen=False, unknown=None):
+        """
+        Constructor method
+
+        :param terms: terms to assign ids to, in order
+        :type terms: iterable of str
+        :param frozen: whether unseen terms map to the unknown id instead of being added
+        :type frozen: bool
+        :param unknown: a term to reserve an id for and return for unseen terms when frozen
+        :type unknown: str
+
+        """
+        self.terms = []
+        self._ids = dict()
+        self.unknown = unknown
+        if unknown is not None:
+            self.add(unknown)
+        for term in terms:
+            self.add(term)
+        self.frozen = frozen
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return term in self._ids
+
+    def add(self, term):
+        """
+        Assigns the next id to a term if it doesn't have one yet
+
+        :param term: the term
+        :type term: str
+
+        :return: the term's id
+        :rtype: int
+
+        """
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = self._ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def id(self, term):
+        """
+        Looks up a term's id, adding the term unless the vocabulary is frozen
+
+        :param term: the term
+        :type term: str
+
+        :return: the term's id, or the unknown id (-1 without an unknown term) for unseen terms when frozen
+        :rtype: int
+
+        """
+        if not self.frozen:
+            return self.add(term)
+        term_id = self._ids.get(term)
+        if term_id is None:
+            return self._ids.get(self.unknown, -1)
+        return term_id
+
+    def term(self, term_id):
+        """
+        Looks up the term for an id
+
+        :param term_id: the id
+        :type term_id: int
+
+        :return: the term
+        :rtype: str
+
+        """
+        return self.terms[term_id]
+
+    def encode(self, terms):
+        """
+        Maps many terms to ids at once
+
+        :param terms: the terms
+        :type terms: iterable of str
+
+        :return: the ids
+        :rtype: array.array
+
+        """
+        return array('i', [self.id(term) for term in terms])
+
+    def decode(self, ids):
+        """
+        Maps many ids to terms at once
+
+        :param ids: the ids
+        :type ids: iterable of int
+
+        :return: the terms
+        :rtype: list of str
+
+        """
+        return [self.terms[term_id] for term_id in ids]
+
+    def save(self, path):
+        """
+        Writes the vocabulary to a JSON file
+
+        :param path: where to write it
+        :type path: str
+
+        """
+        with io.open(path, 'w', encoding='utf-8') as vocabulary_file:
+            vocabulary_file.write(json.dumps({u'terms': self.terms, u'unknown': self.unknown}, ensure_ascii=False))
+
+    @classmethod
+    def load(cls, path, frozen=False):
+        """
+        Reads a vocabulary written by Vocabulary.save
+
+        :param path: where to read it from
+        :type path: str
+        :param frozen: whether unseen terms map to the unknown id instead of being added
+        :type frozen: bool
+
+        :return: the vocabulary, with the same ids as when it was saved
+        :rtype: corenlp_xml.vocabulary.Vocabulary
+
+        """
+        with io.open(path, 'r', encoding='utf-8') as vocabulary_file:
+            data = json.loads(vocabulary_file.read())
+        vocabulary = cls(frozen=frozen)
+        vocabulary.unknown = data[u'unknown']
+        for term in data[u'terms']:
+            vocabulary.add(term)
+        return vocabulary
@@ -0,0 +1,256 @@
+"""
+Sub-module for sliding windows of consecutive sentences over a document.
+
+A window doesn't copy anything: it holds the bounds of its sentences and tokens in the document's
+corenlp_xml.columns.TokenColumns, and of its mentions in the document's corenlp_xml.coreference.CoreferenceTable,
+which every window of the document shares. Token indices, character offsets and coreference links are
+given relative to the start of the window.
+"""
+from bisect import bisect_left, bisect_right
+from corenlp_xml.document import TokenList
+
+
+class ColumnView(object):
+    """
+    A read-only slice of a token column, without copying it
+    """
+
+    __slots__ = ('column', 'start', 'end')
+
+    def __init__(self, column, start, end):
+        """
+        Constructor method
+
+        :param column: the column, a list or array
+        :type column: list or array.array
+        :param start: the index of the first entry in the view
+        :type start: int
+        :param end: the index the view ends before
+        :type end: int
+
+        """
+        self.column = column
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column view index out of range")
+        return self.column[self.start + index]
+
+    def __iter__(self):
+        column = self.column
+        for i in range(self.start, self.end):
+            yield column[i]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "<ColumnView %r>" % list(self)
+
+
+class SentenceWindow(object):
+    """
+    A view of consecutive sentences of a document, see Document.windows
+    """
+
+    __slots__ = ('document', 'sentence_start', 'sentence_end', 'start', 'end', 'mention_start', 'mention_end')
+
+    def __init__(self, document, sentence_start, sentence_end):
+        """
+        Constructor method
+
+        :param document: the document
+        :type document: corenlp_xml.document.Document
+        :param sentence_start: the position of the window's first sentence in the document, counting from 0
+        :type sentence_start: int
+        :param sentence_end: the position of the sentence the window ends before
+        :type sentence_end: int
+
+        """
+        columns = document.token_columns
+        table = document.resolve_coreferences()
+        self.document = document
+        self.sentence_start = sentence_start
+        self.sentence_end = sentence_end
+        self.start = columns.sentence_starts[sentence_start]
+        self.end = columns.sentence_range(sentence_end - 1)[1]
+        self.mention_start = bisect_left(table.sentence, columns.sentence_ids[sentence_start])
+        self.mention_end = bisect_right(table.sentence, columns.sentence_ids[sentence_end - 1], self.mention_start)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return "<SentenceWindow sentences %d-%d, %d tokens>" % (self.sentence_start, self.sentence_end, len(self))
+
+    @property
+    def sentence_ids(self):
+        """
+        :getter: Returns the XML IDs of the window's sentences
+        :type: corenlp_xml.windows.ColumnView
+
+        """
+        return ColumnView(self.document.token_columns.sentence_ids, self.sentence_start, self.sentence_end)
+
+    @property
+    def sentence_starts(self):
+        """
+        :getter: Returns the window-relative index of each sentence's first token
+        :type: list of int
+
+        """
+        return [start - self.start for start in ColumnView(self.document.token_columns.sentence_starts,
+                                                           self.sentence_start, self.sentence_end)]
+
+    def column(self, name):
+        """
+        Views one of the document's token columns over the window
+
+        :param name: the name of the column, e.g. "word" or "character_offset_begin"
+        :type name: str
+
+        :return: the view
+        :rtype: corenlp_xml.windows.ColumnView
+
+        """
+        return ColumnView(getattr(self.document.token_columns, name), self.start, self.end)
+
+    def token_index(self, index):
+        """
+        Converts a window-relative token index to an index into the document's token columns
+
+        :param index: the index within the window
+        :type index: int
+
+        :return: the index into the token columns
+        :rtype: int
+
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self.start + index
+
+    def relative_index(self, index):
+        """
+        Converts an index into the document's token columns to a window-relative token index
+
+        :param index: the index into the token columns
+        :type index: int
+
+        :return: the index within the window, or None if the token is outside the window
+        :rtype: int
+
+        """
+        return index - self.start if self.start <= index < self.end else None
+
+    @property
+    def character_offset(self):
+        """
+        :getter: Returns the character offset of the window's first token in the document
+        :type: int
+
+        """
+        return self.document.token_columns.character_offset_begin[self.start] if len(self) else 0
+
+    def offsets(self):
+        """
+        Character offsets of the window's tokens, relative to the start of the window
+
+        :return: a generator of (begin, end) pairs
+        :rtype: generator of tuple
+
+        """
+        columns = self.document.token_columns
+        base = self.character_offset
+        begins, ends = columns.character_offset_begin, columns.character_offset_end
+        for i in range(self.start, self.end):
+            yield begins[i] - base, ends[i] - base
+
+    @property
+    def tokens(self):
+        """
+        Materializes the window's tokens
+
+        :getter: Returns the tokens, in order
+        :type: corenlp_xml.document.TokenList
+
+        """
+        return TokenList([self.document.token_at_index(i) for i in range(self.start, self.end)])
+
+    @property
+    def sentences(self):
+        """
+        Materializes the window's sentences
+
+        :getter: Returns the sentences, in order
+        :type: list of corenlp_xml.document.Sentence
+
+        """
+        return [self.document.get_sentence_by_id(id) for id in self.sentence_ids]
+
+    @property
+    def mentions(self):
+        """
+        The coreference mentions in the window, in document order
+
+        :getter: Returns (chain, start, end, head) rows, with window-relative token indices and an exclusive end
+        :type: list of tuple
+
+        """
+        table, base = self.document.resolve_coreferences(), self.start
+        return [(table.chain[i], table.start_index[i] - base, table.end_index[i] - base, table.head_index[i] - base)
+                for i in range(self.mention_start, self.mention_end)]
+
+    def coreference_links(self):
+        """
+        Links each mention to the closest earlier mention of the same chain within the window
+
+        :return: (antecedent, mention) pairs of positions in SentenceWindow.mentions
+        :rtype: list of tuple
+
+        """
+        chains = self.document.resolve_coreferences().chain
+        last, links = dict(), []
+        for position, i in enumerate(range(self.mention_start, self.mention_end)):
+            chain = chains[i]
+            if chain in last:
+                links.append((last[chain], position))
+            last[chain] = position
+        return links
+
+
+def iter_windows(document, size, stride=1, partial=False):
+    """
+    Slides a window of consecutive sentences over a document
+
+    :param document: the document
+    :type document: corenlp_xml.document.Document
+    :param size: the number of sentences in each window
+    :type size: int
+    :param stride: the number of sentences between the starts of consecutive windows
+    :type stride: int
+    :param partial: whether to also yield shorter windows at the end of the document
+    :type partial: bool
+
+    :return: a generator of windows
+    :rtype: generator of corenlp_xml.windows.SentenceWindow
+
+    """
+    if size < 1 or stride < 1:
+        raise ValueError("Window size and stride must be positive")
+    count = len(document.token_columns.sentence_ids)
+    last = count if partial else count - size + 1
+    for start in range(0, last, stride):
+        yield SentenceWindow(document, start, min(start + size, count))
@@ -9,5 +9,6 @@ setup(
     url="https://github.com/relwell/corenlp-xml-lib",
     license="Other",
     packages=["corenlp_xml"],
-    install_requires=["PyYAML>=3.10", "bidict>=0.1.1", "lxml>=3.2.4", "nltk>=2.0.4"]
+    install_requires=["PyYAML>=3.10", "bidict>=0.1.1", "lxml>=3.2.4", "nltk>=2.0.4"],
+    extras_require={"arrow": ["pyarrow>=0.15"], "dedup": ["numpy"], "batching": ["numpy"]}
     )
@@ -6,6 +6,26 @@ import unittest
 
 import test_document
 import test_dependencies
+import test_coreference
+import test_indexed
+import test_export
+import test_pipeline
+import test_readers
+import test_cache
+import test_imports
+import test_threading
+import test_batch
+import test_shared
+import test_target
+import test_stats
+import test_parsers
+import test_features
+import test_fields
+import test_json_backend
+import test_windows
+import test_dedup
+import test_counts
+import test_batching
 
 def suite():
     """
@@ -14,6 +34,26 @@ def suite():
     test_suite = unittest.TestSuite()
     test_suite.addTests(test_document.suite())
     test_suite.addTests(test_dependencies.suite())
+    test_suite.addTests(test_coreference.suite())
+    test_suite.addTests(test_indexed.suite())
+    test_suite.addTests(test_export.suite())
+    test_suite.addTests(test_pipeline.suite())
+    test_suite.addTests(test_readers.suite())
+    test_suite.addTests(test_cache.suite())
+    test_suite.addTests(test_imports.suite())
+    test_suite.addTests(test_threading.suite())
+    test_suite.addTests(test_batch.suite())
+    test_suite.addTests(test_shared.suite())
+    test_suite.addTests(test_target.suite())
+    test_suite.addTests(test_stats.suite())
+    test_suite.addTests(test_parsers.suite())
+    test_suite.addTests(test_features.suite())
+    test_suite.addTests(test_fields.suite())
+    test_suite.addTests(test_json_backend.suite())
+    test_suite.addTests(test_windows.suite())
+    test_suite.addTests(test_dedup.suite())
+    test_suite.addTests(test_counts.suite())
+    test_suite.addTests(test_batching.suite())
     return test_suite
 
 if __name__ == "__main__":
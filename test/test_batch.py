@@ -0,0 +1,72 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from corenlp_xml import batch, columns, coreference, dependencies, document, fields, json_backend, locking, \
+    parsers
+from corenlp_xml.document import Document
+from corenlp_xml.batch import load_documents, iter_documents
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "r") as xml_file:
+            self._xml = xml_file.read()
+
+    def test_load_documents(self):
+        documents = load_documents([self._xml] * 6, workers=3, materialize=("sentences", "token_columns"))
+        self.assertEquals(6, len(documents))
+        self.assertEquals(6, len(set(id(d) for d in documents)), "Each source should get its own document")
+        for document in documents:
+            self.assertIsInstance(document, Document)
+            self.assertIsNotNone(document._sentences_dict, "Requested fields should be built on the workers")
+            self.assertIsNotNone(document._token_columns, "Requested fields should be built on the workers")
+            self.assertIsNone(document._coreferences, "Other fields should stay lazy")
+
+    def test_materialize_everything(self):
+        document = load_documents([self._xml], workers=1, materialize=("tokens", "dependencies", "coreferences"),
+                                  thread_safe=True)[0]
+        self.assertTrue(document.thread_safe)
+        sentence = document.sentences[0]
+        self.assertIsNotNone(sentence._tokens_dict)
+        self.assertIsNotNone(sentence._collapsed_ccprocessed_dependencies)
+        self.assertIsNotNone(document.coreferences[0]._mentions)
+
+    def test_iter_documents(self):
+        sources = [self._xml.replace('averageSentiment="1.2173913043478262"', 'averageSentiment="%d"' % i)
+                   for i in range(4)]
+        self.assertEquals([0.0, 1.0, 2.0, 3.0], [d.sentiment for d in iter_documents(sources, workers=2)],
+                          "Documents should come back in input order")
+
+    def test_unknown_field(self):
+        self.assertRaises(ValueError, load_documents, [self._xml], 1, ("everything",))
+
+    def test_no_module_level_mutable_state(self):
+        for module in (batch, columns, coreference, dependencies, document, fields, json_backend, locking,
+                       parsers):
+            for name, value in vars(module).items():
+                if not name.startswith("__"):
+                    self.assertNotIsInstance(value, (list, dict, set),
+                                             "%s.%s is module-level mutable state" % (module.__name__, name))
+        for registry in (fields.TOKEN_EXTRAS, fields.SENTENCE_EXTRAS, fields.MENTION_EXTRAS):
+            self.assertIsInstance(registry.fields, fields.FieldSet)
+            self.assertIsInstance(registry.fields.specs, tuple, "Registries should only swap immutable snapshots")
+        self.assertNotIsInstance(columns.TokenColumns().extra_fields, list, "Columns should keep a snapshot")
+        decoder = json_backend.DECODER
+        with open("test.json", "rb") as json_file:
+            Document.from_json(json_file.read()).token_columns
+        self.assertIs(decoder, json_backend.DECODER, "The JSON decoder should be chosen once, at import")
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestBatch))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
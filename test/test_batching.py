@@ -0,0 +1,127 @@
+import os
+import shutil
+import sys
+import tempfile
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.batching import NO_HEAD, SentenceBatcher, load_vocabularies, save_vocabularies
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy isn't installed")
+class TestBatching(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._xml = xml_file.read()
+        self._document = Document(self._xml)
+        self._sentences = dict((s.id, s) for s in self._document.sentences)
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_batches(self):
+        batcher = SentenceBatcher(batch_size=4)
+        batches = list(batcher.batches([('doc', self._document)]))
+        self.assertEquals(sorted(('doc', i) for i in self._sentences),
+                          sorted(key for batch in batches for key in batch.sentences))
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        lengths = [length for batch in batches for length in batch.lengths]
+        self.assertEquals(sorted(lengths), lengths, "Sentences should be sorted by length")
+        for batch in batches:
+            self.assertEquals(max(batch.lengths), batch.word.shape[1])
+            for row, (_, sentence_id) in enumerate(batch.sentences):
+                tokens = self._sentences[sentence_id].tokens
+                length = batch.lengths[row]
+                self.assertEquals(len(tokens), length)
+                for field in ('word', 'pos', 'ner'):
+                    self.assertEquals([getattr(t, field) for t in tokens],
+                                      batcher.vocabularies[field].decode(getattr(batch, field)[row, :length]))
+                self.assertTrue((batch.word[row, length:] == 0).all())
+                self.assertTrue((batch.heads[row, length:] == NO_HEAD).all())
+                self.assertEquals(list(batch.mask[row]), [True] * length + [False] * (batch.word.shape[1] - length))
+
+    def test_heads(self):
+        batch = next(SentenceBatcher(batch_size=100).batches(self._document))
+        for row, (_, sentence_id) in enumerate(batch.sentences):
+            expected = [NO_HEAD] * batch.lengths[row]
+            for link in self._sentences[sentence_id].basic_dependencies.links:
+                expected[link.dependent.idx - 1] = link.governor.idx
+            self.assertEquals(expected, list(batch.heads[row, :batch.lengths[row]]))
+
+    def test_pools(self):
+        batches = list(SentenceBatcher(batch_size=2, pool_size=2).batches(self._document))
+        self.assertEquals(len(self._sentences), sum(len(batch) for batch in batches))
+        for start in range(0, len(batches), 2):
+            lengths = [length for batch in batches[start:start + 2] for length in batch.lengths]
+            self.assertEquals(sorted(lengths), lengths)
+        self.assertNotEquals(sorted(length for batch in batches for length in batch.lengths),
+                             [length for batch in batches for length in batch.lengths])
+
+    def test_threaded(self):
+        threaded = list(SentenceBatcher(batch_size=3).batches([self._document, self._document]))
+        serial = list(SentenceBatcher(batch_size=3, threaded=False).batches([self._document, self._document]))
+        self.assertEquals([b.sentences for b in serial], [b.sentences for b in threaded])
+        for a, b in zip(serial, threaded):
+            self.assertTrue((a.word == b.word).all())
+            self.assertTrue((a.heads == b.heads).all())
+        self.assertEquals([(0, 1), (1, 1)], sorted(k for b in threaded for k in b.sentences if k[1] == 1))
+
+    def test_early_exit(self):
+        batches = SentenceBatcher(batch_size=1, prefetch=1).batches([self._document] * 5)
+        next(batches)
+        batches.close()
+
+    def test_errors(self):
+        def documents():
+            yield self._document
+            raise ValueError("bad document")
+        self.assertRaises(ValueError, list, SentenceBatcher().batches(documents()))
+
+    def test_max_length(self):
+        batcher = SentenceBatcher(max_length=20)
+        batches = list(batcher.batches(self._document))
+        kept = [s for s in self._sentences.values() if len(s.tokens) <= 20]
+        self.assertEquals(len(kept), sum(len(b) for b in batches))
+        self.assertEquals(len(self._sentences) - len(kept), batcher.skipped)
+
+    def test_path(self):
+        path = os.path.join(self._directory, 'doc.xml')
+        with open(path, 'wb') as xml_file:
+            xml_file.write(self._xml)
+        self.assertEquals([(path, 1)], [k for b in SentenceBatcher().batches(path) for k in b.sentences if k[1] == 1])
+        self.assertEquals([('doc.xml', 1)],
+                          [k for b in SentenceBatcher().batches(self._directory) for k in b.sentences if k[1] == 1])
+
+    def test_vocabularies(self):
+        batcher = SentenceBatcher()
+        list(batcher.batches(self._document))
+        save_vocabularies(batcher.vocabularies, os.path.join(self._directory, 'vocabularies'))
+        vocabularies = load_vocabularies(os.path.join(self._directory, 'vocabularies'))
+        self.assertEquals(batcher.vocabularies['word'].terms, vocabularies['word'].terms)
+        self.assertEquals(0, vocabularies['word'].id(u'<pad>'))
+        edited = Document(self._xml.replace(b'<word>chop-shop</word>', b'<word>garage</word>'))
+        reloaded = SentenceBatcher(vocabularies)
+        batches = list(reloaded.batches(edited))
+        self.assertEquals(len(batcher.vocabularies['word']), len(reloaded.vocabularies['word']))
+        self.assertIn(1, [i for batch in batches for i in batch.word.flatten()], "Unseen words should be unknown")
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestBatching))
+    return test_suite
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
@@ -0,0 +1,113 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import pickle
+import shutil
+import tempfile
+import threading
+import unittest
+from lxml import etree
+from corenlp_xml.document import Document, Sentence
+from corenlp_xml.cache import ResultCache, content_key
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "r") as xml_file:
+            self._xml = xml_file.read()
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_bytes=10)
+        cache.put("a", 1, 4)
+        cache.put("b", 2, 4)
+        self.assertEquals(1, cache.get("a"), "Getting should promote an entry")
+        cache.put("c", 3, 4)
+        self.assertNotIn("b", cache, "The least recently used entry should be evicted")
+        self.assertIn("a", cache)
+        self.assertIn("c", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEquals((1, 1, 1), (cache.hits, cache.misses, cache.evictions))
+
+    def test_document_cache(self):
+        cache = ResultCache()
+        document = cache.document(self._xml)
+        self.assertIsInstance(document, Document)
+        self.assertIs(document, cache.document(self._xml), "Identical XML should return the cached document")
+        self.assertEquals((1, 1), (cache.hits, cache.misses))
+
+    def test_sentence_cache(self):
+        cache = ResultCache()
+        first = Document(self._xml, cache=cache)
+        second = Document(self._xml, cache=cache)
+        tokens = first.sentences[0].tokens
+        self.assertIs(first.sentences[0], second.sentences[0], "Identical sentences should be shared")
+        self.assertIs(tokens[0], second.sentences[0].tokens[0], "Materialized tokens should be reused")
+        self.assertEquals(len(first.sentences), cache.misses)
+        self.assertEquals(len(first.sentences), cache.hits)
+
+    def test_tail_is_ignored(self):
+        first = etree.fromstring('<sentences><sentence id="1"><a/></sentence>\n  </sentences>')[0]
+        last = etree.fromstring('<sentences><sentence id="1"><a/></sentence>\n</sentences>')[0]
+        self.assertEquals(content_key(first), content_key(last), "Whitespace after an element isn't its content")
+        cache = ResultCache()
+        self.assertIs(cache.get_or_build(first, len), cache.get_or_build(last, len))
+        self.assertEquals((1, 1), (cache.hits, cache.misses))
+        self.assertEquals(len(b'<sentence id="1"><a/></sentence>'), cache._bytes)
+
+    def test_disk_tier(self):
+        element = Document(self._xml).sentences[0]._element
+        ResultCache(directory=self._directory).sentence(element)
+        self.assertTrue(os.path.exists(os.path.join(self._directory, content_key(element) + ".pickle")))
+        cache = ResultCache(directory=self._directory)
+        sentence = cache.sentence(element)
+        self.assertIsInstance(sentence, Sentence)
+        self.assertEquals(1, cache.disk_hits)
+        self.assertEquals("Taking", sentence.tokens[0].word)
+        self.assertIs(sentence, cache.sentence(element), "Disk hits should be promoted into memory")
+        self.assertEquals((1, 1, 1), (cache.disk_hits, cache.hits, len(cache)))
+        self.assertEquals(len(etree.tostring(element, with_tail=False)), cache._bytes)
+
+    def test_sentences_are_detached(self):
+        element = Document(self._xml).sentences[0]._element
+        sentence = ResultCache().sentence(element)
+        self.assertIsNot(element, sentence._element)
+        self.assertIsNone(sentence._element.getparent(), "Cached sentences shouldn't keep the document alive")
+        self.assertEquals(etree.tostring(element, with_tail=False), etree.tostring(sentence._element))
+
+    def test_unpicklable_values_stay_in_memory(self):
+        cache = ResultCache(directory=self._directory)
+        lock = cache.get_or_build(self._xml, lambda xml: threading.Lock())
+        self.assertIs(lock, cache.get_or_build(self._xml, lambda xml: threading.Lock()))
+        self.assertEquals([], [f for f in os.listdir(self._directory) if not f.startswith(".")])
+
+    def test_documents_spill_to_disk(self):
+        cache = ResultCache(directory=self._directory)
+        cache.document(self._xml)
+        reloaded = ResultCache(directory=self._directory).document(self._xml)
+        self.assertEquals(len(Document(self._xml).sentences), len(reloaded.sentences))
+
+    def test_sentence_pickle(self):
+        sentence = Document(self._xml).sentences[2]
+        sentence.tokens
+        restored = pickle.loads(pickle.dumps(sentence, pickle.HIGHEST_PROTOCOL))
+        self.assertEquals(sentence.id, restored.id)
+        self.assertIsNone(restored._tokens_dict, "Tokens should be rebuilt lazily")
+        self.assertEquals(str(sentence.tokens), str(restored.tokens))
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestResultCache))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
@@ -31,6 +31,22 @@ class TestCoreference(unittest.TestCase):
         self.assertIsInstance(coref._representative, Mention, "Representative mention should be memoized")
         self.assertIsInstance(coref._mentions[0], Mention, "Mentions should be lazy-loaded and memoized too")
 
+    def test_resolve_coreferences(self):
+        table = self._document.resolve_coreferences()
+        self.assertIsInstance(table, CoreferenceTable)
+        self.assertIs(table, self._document.resolve_coreferences(), "Resolved table should be memoized")
+        mentions = [(chain, m) for chain, c in enumerate(self._document.coreferences) for m in c.mentions]
+        self.assertEquals(len(mentions), len(table))
+        self.assertEquals(sorted(table.sentence), list(table.sentence), "Rows should be grouped by sentence")
+        expected = sorted((m.sentence.id, m._start, chain, m._end, m._head_id) for chain, m in mentions)
+        self.assertEquals(expected, sorted((s, start, c, end, head) for c, s, start, end, head in table))
+        words = self._document.token_columns.word
+        for i in table.rows_for_chain(0):
+            self.assertEquals(table.end[i] - table.start[i], table.end_index[i] - table.start_index[i])
+            self.assertEquals(self._document.get_sentence_by_id(table.sentence[i]).get_token_by_id(table.head[i]).word,
+                              words[table.head_index[i]])
+        self.assertEquals(len(self._document.coreferences), sum(table.representative))
+
 
 class TestMention(unittest.TestCase):
 
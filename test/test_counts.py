@@ -0,0 +1,125 @@
+import gzip
+import math
+import os
+import shutil
+import sys
+import tempfile
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from collections import Counter
+from corenlp_xml.document import Document
+from corenlp_xml.counts import DependencyCounter, NgramCounter, count_corpus, list_files, merge_runs
+
+
+class TestCounts(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._xml = xml_file.read()
+        self._document = Document(self._xml)
+        self._directory = tempfile.mkdtemp()
+        self._corpus = os.path.join(self._directory, 'corpus')
+        os.makedirs(os.path.join(self._corpus, 'nested'))
+        with open(os.path.join(self._corpus, 'first.xml'), 'wb') as first:
+            first.write(self._xml)
+        with gzip.open(os.path.join(self._corpus, 'nested', 'second.xml.gz'), 'wb') as second:
+            second.write(self._xml)
+        with open(os.path.join(self._corpus, 'notes.txt'), 'wb') as notes:
+            notes.write(b'not a document')
+        self._counters = [NgramCounter('lemma', 2), NgramCounter('pos', 3), DependencyCounter()]
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _expected(self, copies=2):
+        ngrams = dict(lemma_2gram=Counter(), pos_3gram=Counter(), lemma_1gram=Counter(), pos_1gram=Counter(),
+                      dependency_triples=Counter())
+        for sentence in self._document.sentences:
+            lemmas = [token.lemma for token in sentence.tokens]
+            tags = [token.pos for token in sentence.tokens]
+            for n, field, values in ((1, 'lemma', lemmas), (2, 'lemma', lemmas), (1, 'pos', tags), (3, 'pos', tags)):
+                for i in range(len(values) - n + 1):
+                    ngrams['%s_%dgram' % (field, n)][tuple(values[i:i + n])] += copies
+            for link in sentence.collapsed_ccprocessed_dependencies.links:
+                if link.governor.idx != 0:
+                    governor = sentence.get_token_by_id(link.governor.idx)
+                    dependent = sentence.get_token_by_id(link.dependent.idx)
+                    ngrams['dependency_triples'][(governor.lemma, link.type, dependent.lemma)] += copies
+        return ngrams
+
+    def test_list_files(self):
+        self.assertEquals([os.path.join(self._corpus, 'first.xml'),
+                           os.path.join(self._corpus, 'nested', 'second.xml.gz')], list_files(self._corpus))
+
+    def test_counts(self):
+        tables = count_corpus(self._corpus, self._counters, os.path.join(self._directory, 'counts'))
+        expected = self._expected()
+        self.assertEquals(sorted(expected), tables.names)
+        for name in expected:
+            self.assertEquals(expected[name], tables.counts(name), name)
+            self.assertEquals(sum(expected[name].values()), tables.totals[name])
+            keys = [key for key, _ in tables.iter_counts(name)]
+            self.assertEquals(sorted(keys), keys)
+
+    def test_spilling(self):
+        expected = self._expected()
+        for workers in (1, 2):
+            directory = os.path.join(self._directory, 'counts%d' % workers)
+            tables = count_corpus(list_files(self._corpus), self._counters, directory, workers=workers,
+                                  max_items=50)
+            for name in expected:
+                self.assertEquals(expected[name], tables.counts(name), name)
+            self.assertEquals(sorted(name + '.tsv' for name in expected), sorted(os.listdir(directory)),
+                              "Runs should be removed once merged")
+
+    def test_merge_runs(self):
+        paths = []
+        for i, rows in enumerate([[(u'a', u'b'), (u'b', u'c')], [(u'a', u'b'), (u'c', u'd')]]):
+            paths.append(os.path.join(self._directory, '%d.run' % i))
+            with open(paths[-1], 'wb') as run:
+                run.write(u''.join(u'\t'.join(key) + u'\t2\n' for key in rows).encode('utf-8'))
+        self.assertEquals([((u'a', u'b'), 4), ((u'b', u'c'), 2), ((u'c', u'd'), 2)], list(merge_runs(paths)))
+
+    def test_top_k(self):
+        tables = count_corpus(self._corpus, self._counters, os.path.join(self._directory, 'counts'))
+        expected = sorted(self._expected()['lemma_2gram'].items(), key=lambda item: (-item[1], item[0]))
+        self.assertEquals(expected[:10], tables.top_k('lemma_2gram', 10))
+        self.assertEquals(len(expected), len(tables.top_k('lemma_2gram', len(expected) + 5)))
+
+    def test_pmi(self):
+        tables = count_corpus(self._corpus, self._counters, os.path.join(self._directory, 'counts'))
+        expected = self._expected()
+        bigrams, unigrams = expected['lemma_2gram'], expected['lemma_1gram']
+        bigram_total, unigram_total = float(sum(bigrams.values())), float(sum(unigrams.values()))
+        top = tables.pmi('lemma_2gram', 5, min_count=4)
+        self.assertEquals(5, len(top))
+        for key, count, pmi in top:
+            self.assertGreaterEqual(count, 4)
+            independent = (unigrams[key[:1]] / unigram_total) * (unigrams[key[1:]] / unigram_total)
+            self.assertAlmostEqual(math.log((count / bigram_total) / independent), pmi)
+        scores = [pmi for _, _, pmi in top]
+        self.assertEquals(sorted(scores, reverse=True), scores)
+        self.assertRaises(ValueError, tables.pmi, 'dependency_triples', 5)
+
+    def test_pmi_custom_names(self):
+        counters = [NgramCounter('lemma', 2, name='bigrams'), NgramCounter('lemma', 1, name='words'),
+                    NgramCounter('pos', 1, name='lemma_1gram')]
+        tables = count_corpus(self._corpus, counters, os.path.join(self._directory, 'counts'))
+        self.assertEquals(['bigrams', 'lemma_1gram', 'words'], tables.names,
+                          "A unigram counter under any name should provide the marginals")
+        expected = count_corpus(self._corpus, self._counters, os.path.join(self._directory, 'expected'))
+        self.assertEquals(expected.pmi('lemma_2gram', 5, min_count=4), tables.pmi('bigrams', 5, min_count=4))
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestCounts))
+    return test_suite
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
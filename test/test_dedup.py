@@ -0,0 +1,99 @@
+import os
+import shutil
+import sys
+import tempfile
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.dedup import LSHIndex, MinHasher, iter_unique_sentences, jaccard, optimal_bands
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._xml = xml_file.read()
+        self._document = Document(self._xml)
+        self._edited = Document(self._xml.replace(b'<lemma>chop-shop</lemma>', b'<lemma>garage</lemma>'))
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_signatures(self):
+        signatures = MinHasher(vectorized=False).signatures(self._document)
+        self.assertEquals([s.id for s in self._document.sentences], [sentence_id for sentence_id, _ in signatures])
+        self.assertTrue(all(len(signature) == 128 for _, signature in signatures))
+        self.assertEquals(signatures, MinHasher(vectorized=False).signatures(Document(self._xml)))
+        self.assertNotEquals(signatures, MinHasher(seed=2, vectorized=False).signatures(self._document))
+
+    @unittest.skipIf(numpy is None, "numpy isn't installed")
+    def test_vectorized(self):
+        for shingle_size in (1, 3, 40):
+            self.assertEquals(MinHasher(shingle_size=shingle_size, vectorized=False).signatures(self._document),
+                              MinHasher(shingle_size=shingle_size, vectorized=True).signatures(self._document))
+
+    def test_jaccard(self):
+        hasher = MinHasher()
+        original = dict(hasher.signatures(self._document))
+        edited = dict(hasher.signatures(self._edited))
+        self.assertEquals(1.0, jaccard(original[2], edited[2]))
+        self.assertTrue(0.5 < jaccard(original[1], edited[1]) < 1.0)
+        self.assertLess(jaccard(original[1], original[2]), 0.2)
+
+    def test_optimal_bands(self):
+        self.assertEquals(0, 128 % optimal_bands(128, 0.8))
+        self.assertGreater(optimal_bands(128, 0.5), optimal_bands(128, 0.9))
+
+    def test_add(self):
+        index = LSHIndex(threshold=0.7)
+        self.assertEquals({}, index.add('first', self._document))
+        self.assertEquals(len(self._document.sentences), len(index))
+        duplicates = index.add('second', self._edited)
+        self.assertEquals(set(s.id for s in self._document.sentences), set(duplicates))
+        self.assertEquals(('first', 1), duplicates[1][0][:2])
+        self.assertEquals(('first', 2, 1.0), duplicates[2][0])
+        self.assertEquals(len(self._document.sentences), len(index), "Duplicates shouldn't be indexed")
+
+    def test_duplicates(self):
+        index = LSHIndex(threshold=0.9)
+        index.add('first', self._document)
+        duplicates = index.duplicates(self._edited)
+        self.assertNotIn(1, duplicates)
+        self.assertIn(2, duplicates)
+        self.assertEquals(len(self._document.sentences), len(index))
+
+    def test_persistence(self):
+        path = os.path.join(self._directory, 'index.db')
+        with LSHIndex(path) as index:
+            index.add('first', self._document)
+        with LSHIndex(path) as index:
+            self.assertEquals(len(self._document.sentences), len(index))
+            self.assertEquals(len(self._document.sentences), len(index.duplicates(self._document)))
+        self.assertRaises(ValueError, LSHIndex, path, threshold=0.5)
+        self.assertRaises(ValueError, LSHIndex, num_perm=128, bands=7)
+
+    def test_iter_unique_sentences(self):
+        index = LSHIndex()
+        unique = list(iter_unique_sentences(index, [('first', self._document), ('second', Document(self._xml))]))
+        self.assertEquals([('first', s.id) for s in self._document.sentences],
+                          [(name, sentence.id) for name, sentence in unique])
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestDedup))
+    return test_suite
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
@@ -28,6 +28,102 @@ class TestDependencyGraph(unittest.TestCase):
                            0,
                            "You should be able to filter dependencies by type using kwargs")
 
+    def test_to_coo(self):
+        matrix = self._graph.to_coo()
+        self.assertIsInstance(matrix, DependencyMatrix)
+        edges = set((link.governor.idx - 1, link.dependent.idx - 1, link.type) for link in self._graph.links
+                    if link.governor.idx > 0)
+        self.assertEquals(edges, set(zip(matrix.row, matrix.col, matrix.relations.decode(matrix.data))))
+        self.assertEquals([self._graph.links_by_type('root')[0].dependent.idx - 1], list(matrix.roots))
+        size = len(self._document.sentences[0].tokens)
+        self.assertEquals((size, size), self._graph.to_coo(size=size).shape)
+
+    def test_all_pairs_paths(self):
+        paths = self._graph.all_pairs_paths([1, 4, 24])
+        self.assertEquals(6, len(paths))
+        self.assertEquals(('>dobj',), paths[(1, 4)])
+        self.assertEquals(('<dobj', '<ccomp', '>nsubj'), paths[(4, 24)])
+        self.assertEquals(tuple(reversed(paths[(24, 1)])), tuple(
+            ('>' if label[0] == '<' else '<') + label[1:] for label in paths[(1, 24)]))
+        self.assertIs(paths[(1, 4)], self._graph.all_pairs_paths([4, 1])[(1, 4)], "Paths should be memoized")
+        self.assertIsNone(self._graph.all_pairs_paths([1, 1000])[(1, 1000)])
+
+    def test_all_pairs_paths_search(self):
+        for sentence in self._document.sentences:
+            for graph in (sentence.basic_dependencies, sentence.collapsed_ccprocessed_dependencies):
+                nodes = [link.dependent.idx for link in graph.links][:6]
+                expected = dict(((a, b), path) for a in nodes
+                                for b, path in graph._search_paths(a, [n for n in nodes if n != a],
+                                                                   graph._neighbours()).items())
+                paths = graph.all_pairs_paths(nodes)
+                for pair, path in expected.items():
+                    self.assertEquals(len(path), len(paths[pair]), "Paths should be shortest paths")
+        self.assertIn(None, [s.collapsed_ccprocessed_dependencies._depths for s in self._document.sentences],
+                      "Graphs that aren't trees should be searched instead")
+
+    def test_all_pairs_paths_scans_once(self):
+        import corenlp_xml.dependencies as dependencies
+        graphs = [s.collapsed_ccprocessed_dependencies for s in self._document.sentences]
+        for graph in graphs:
+            graph._root()
+        graph = [graph for graph in graphs if graph._depths is None][0]
+        scans = []
+        original = dependencies.iter_dependency_triples
+
+        def counting(element):
+            scans.append(element)
+            return original(element)
+
+        dependencies.iter_dependency_triples = counting
+        try:
+            graph.all_pairs_paths([link.dependent.idx for link in graph.links][:8])
+        finally:
+            dependencies.iter_dependency_triples = original
+        self.assertEquals(1, len(scans), "The adjacency should be built once, not once per source")
+
+
+class TestDependencyMatrix(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "r") as xml_file:
+            self._document = Document(xml_file.read())
+            self._batch = self._document.dependency_batch()
+
+    def test_dependency_batch(self):
+        sentences = self._document.sentences
+        columns = self._document.token_columns
+        self.assertEquals((len(columns), len(columns)), self._batch.shape)
+        self.assertEquals(list(columns.sentence_starts), list(self._batch.sentence_starts))
+        self.assertEquals(len(sentences), len(self._batch.roots))
+        expected = sum(len(s.collapsed_ccprocessed_dependencies.links) for s in sentences) - len(sentences)
+        self.assertEquals(expected, len(self._batch))
+        for row, col in zip(self._batch.row, self._batch.col):
+            self.assertEquals(columns.sentence_id[row], columns.sentence_id[col], "Blocks should be diagonal")
+        self.assertNotEquals(len(self._batch), len(self._document.dependency_batch("basic")))
+
+    def test_block_matches_sentence(self):
+        start, end = self._document.token_columns.sentence_range(2)
+        block = self._document.sentences[2].collapsed_ccprocessed_dependencies.to_coo(
+            relations=self._batch.relations)
+        rows = [(r - start, c - start, d) for r, c, d in zip(self._batch.row, self._batch.col, self._batch.data)
+                if start <= r < end]
+        self.assertEquals(sorted(rows), sorted(zip(block.row, block.col, block.data)))
+
+    def test_to_csr(self):
+        indptr, indices, data = self._batch.to_csr()
+        self.assertEquals(len(self._batch), indptr[-1])
+        self.assertEquals(sorted(zip(self._batch.row, self._batch.col, self._batch.data)),
+                          [(row, indices[i], data[i]) for row in range(self._batch.size)
+                           for i in range(indptr[row], indptr[row + 1])])
+
+    def test_to_scipy(self):
+        try:
+            import scipy
+        except ImportError:
+            raise unittest.SkipTest("scipy isn't installed")
+        self.assertEquals(len(self._batch), self._batch.to_scipy().nnz)
+        self.assertEquals(list(self._batch.to_csr()[0]), list(self._batch.to_scipy("csr").indptr))
+
 
 class TestDependencyLink(unittest.TestCase):
 
@@ -82,6 +178,7 @@ def suite():
     """
     test_suite = unittest.TestSuite()
     test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestDependencyGraph))
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestDependencyMatrix))
     test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestDependencyLink))
     test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestDependencyNode))
     return test_suite
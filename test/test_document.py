@@ -2,9 +2,13 @@ import os
 import sys
 sys.path.insert(0, os.path.join(".."))
 
+import gc
+import pickle
 import unittest
+import weakref
 from corenlp_xml.document import Document, Sentence, Token, TokenList
 from corenlp_xml.dependencies import DependencyNode
+from corenlp_xml.entities import Entity
 from collections import OrderedDict
 from nltk import Tree
 
@@ -38,6 +42,62 @@ class TestDocument(unittest.TestCase):
         self.assertEquals(sentence.id, 1, "Sentence returned should have the appropriate ID")
         self.assertIsNone(self._document.get_sentence_by_id(-1), "If the ID doesn't exist, we should get None")
 
+    def test_token_columns(self):
+        self.assertIsNone(self._document._token_columns, "Token columns should be lazy-loaded")
+        columns = self._document.token_columns
+        self.assertIs(columns, self._document._token_columns, "Token columns should be memoized")
+        tokens = [token for sentence in self._document.sentences for token in sentence.tokens]
+        self.assertEquals(len(tokens), len(columns))
+        self.assertEquals([t.word for t in tokens], columns.word)
+        self.assertEquals([t.ner for t in tokens], columns.ner)
+        self.assertEquals([t.character_offset_end for t in tokens], list(columns.character_offset_end))
+        start, end = columns.sentence_range(1)
+        self.assertEquals(list(range(1, end - start + 1)), list(columns.token_id[start:end]))
+        self.assertEquals([2] * (end - start), list(columns.sentence_id[start:end]))
+
+    def test_token_at_offset(self):
+        self.assertIsNone(self._document._offset_index, "Offset index should be lazy-loaded")
+        token = self._document.token_at_offset(17)
+        self.assertEquals("property", token.word)
+        self.assertIs(token, self._document.sentences[0].get_token_by_id(4), "Tokens should come from their sentence")
+        self.assertIsNotNone(self._document._offset_index, "Offset index should be memoized")
+        self.assertEquals("Taking", self._document.token_at_offset(0).word)
+        self.assertIsNone(self._document.token_at_offset(6), "Offsets between tokens should return None")
+        self.assertIsNone(self._document.token_at_offset(10 ** 9))
+
+    def test_tokens_in_span(self):
+        tokens = self._document.tokens_in_span(7, 24)
+        self.assertIsInstance(tokens, TokenList)
+        self.assertEquals("a flawed property", str(tokens))
+        self.assertEquals("flawed property", str(self._document.tokens_in_span(12, 17)), "Partial overlaps count")
+        self.assertEquals(0, len(self._document.tokens_in_span(6, 7)))
+
+    def test_align_spans(self):
+        spans = [(16, 24), (0, 8), (6, 7), (7, 24)]
+        aligned = self._document.align_spans(spans)
+        self.assertEquals([str(self._document.tokens_in_span(*span)) for span in spans], [str(t) for t in aligned])
+
+    def test_entities(self):
+        entities = self._document.entities
+        self.assertIs(entities, self._document.entities, "Entities should be memoized")
+        self.assertIsInstance(entities[0], Entity)
+        self.assertEquals(("PERSON", "John Lasseter", 3, 1, 3),
+                          (entities[1].type, entities[1].text, entities[1].sentence, entities[1].start, entities[1].end))
+        self.assertEquals("John Lasseter", str(self._document.tokens_in_span(entities[1].character_offset_begin,
+                                                                             entities[1].character_offset_end)))
+        self.assertNotIn("O", [entity.type for entity in entities])
+        self.assertEquals(["Owen Wilson", "Dane Cook", "last month"],
+                          [entity.text for entity in self._document.get_entities_by_sentence_id(9)])
+
+    def test_entities_with_coreferences(self):
+        self.assertIsNone(self._document.entities[0].chain, "Entities shouldn't be linked unless asked")
+        linked = self._document.get_entities(coreferences=True)
+        self.assertIs(linked, self._document.get_entities(coreferences=True), "Linked entities should be memoized")
+        pixar = [entity.chain for entity in linked if entity.text == "Pixar"]
+        self.assertEquals(3, len(pixar))
+        self.assertIsNotNone(pixar[0])
+        self.assertEquals(1, len(set(pixar)), "Mentions of the same entity should share a chain")
+
 
 class TestSentence(unittest.TestCase):
 
@@ -82,6 +142,12 @@ class TestSentence(unittest.TestCase):
         self.assertIsInstance(t, Tree)
         self.assertEquals("property", t[-1].leaves()[0])
 
+    def test_entities(self):
+        self.assertIsNone(self._sentence._entities, "Entities should be lazy-loaded")
+        self.assertEquals(["Pixar"], [entity.text for entity in self._sentence.entities])
+        self.assertEquals("ORGANIZATION", self._sentence.entities[0].type)
+        self.assertIsNotNone(self._sentence._entities, "Entities should be memoized")
+
     def test_get_token_by_id(self):
         token = self._sentence.get_token_by_id(1)
         self.assertIsInstance(token, Token, "Should return a Token instance")
@@ -151,6 +217,93 @@ class TestToken(unittest.TestCase):
         self.assertIsNotNone(self._token._speaker, "speaker property should be memoized")
 
 
+class TestResidentSentences(unittest.TestCase):
+
+    """ Tests bounding the sentences a document keeps materialized """
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._xml = xml_file.read()
+        self._full = Document(self._xml)
+        self._document = Document(self._xml, max_resident_sentences=3)
+
+    def test_eviction(self):
+        words = [[token.word for token in sentence.tokens] for sentence in self._document.sentences]
+        self.assertEquals([[token.word for token in sentence.tokens] for sentence in self._full.sentences], words)
+        self.assertEquals(3, len(self._document._sentences_dict))
+        self.assertEquals(len(words) - 3, self._document.sentence_evictions)
+        self.assertEquals(0, self._document.sentence_rebuilds)
+
+    def test_rebuild(self):
+        first = self._document.get_sentence_by_id(1)
+        list(self._document.sentences)
+        rebuilt = self._document.get_sentence_by_id(1)
+        self.assertIsNot(first, rebuilt)
+        self.assertEquals(1, self._document.sentence_rebuilds)
+        self.assertEquals([t.word for t in first.tokens], [t.word for t in rebuilt.tokens])
+
+    def test_least_recently_used(self):
+        for id in (1, 2, 3, 1, 4):
+            self._document.get_sentence_by_id(id)
+        self.assertEquals([3, 1, 4], list(self._document._sentences_dict))
+        self.assertIsNone(self._document.get_sentence_by_id(1000))
+
+    def test_sequence(self):
+        sentences = self._document.sentences
+        self.assertEquals(len(self._full.sentences), len(sentences))
+        self.assertEquals(2, sentences[1].id)
+        self.assertEquals([3, 4], [sentence.id for sentence in sentences[2:4]])
+        self.assertRaises(ValueError, Document, self._xml, max_resident_sentences=0)
+
+    def test_coreferences(self):
+        mentions = [(m.sentence.id, m.head.word) for c in self._document.coreferences for m in c.mentions]
+        self.assertEquals([(m.sentence.id, m.head.word) for c in self._full.coreferences for m in c.mentions],
+                          mentions)
+        self.assertLessEqual(len(self._document._sentences_dict), 3)
+
+    def test_released_elements(self):
+        document = Document.from_path("test.xml", max_resident_sentences=2)
+        list(document.sentences)
+        self.assertEquals(len(self._full.sentences) - 2, len(document._released))
+        self.assertEquals([], document._tree().xpath('/root/document/sentences/sentence[@id="1"]/tokens'))
+        sentence = document.get_sentence_by_id(1)
+        self.assertEquals([t.word for t in list(self._full.sentences)[0].tokens], [t.word for t in sentence.tokens])
+        self.assertEquals(1, len(document._tree().xpath('/root/document/sentences/sentence[@id="1"]/tokens')))
+        released = len(document._released)
+        self.assertEquals(list(self._full.token_columns.word), list(document.token_columns.word))
+        self.assertEquals(list(self._full.dependency_batch().row), list(document.dependency_batch().row))
+        restored = pickle.loads(pickle.dumps(document))
+        self.assertEquals([s.id for s in self._full.sentences], [s.id for s in restored.sentences])
+        self.assertEquals(list(self._full.sentences)[5].parse_string, restored.get_sentence_by_id(6).parse_string)
+        self.assertEquals(released, len(document._released), "Reading every sentence shouldn't undo the bound")
+        self.assertEquals(released, len(document._tree().xpath('/root/document/sentences/sentence[not(tokens)]')))
+
+    def test_mentions_follow_the_bound(self):
+        document = Document(self._xml, max_resident_sentences=2)
+        sentences = []
+        for coreference in document.coreferences:
+            for mention in coreference.mentions:
+                self.assertEquals(mention.head.word, mention.sentence.get_token_by_id(mention.head.id).word)
+                self.assertIs(mention.sentence, document.get_sentence_by_id(mention.sentence.id))
+                sentences.append(weakref.ref(mention.sentence))
+        gc.collect()
+        alive = [ref() for ref in sentences if ref() is not None]
+        self.assertLessEqual(len(set(id(sentence) for sentence in alive)), 2, "Evicted sentences should be freed")
+        root = document._tree()
+        live = [o for o in gc.get_objects() if isinstance(o, Sentence) and o._element.getroottree().getroot() is root]
+        self.assertLessEqual(len(live), 2, "Only resident sentences should be alive")
+        mention = document.coreferences[0].mentions[0]
+        first = mention.sentence
+        list(document.sentences)
+        self.assertIs(mention.sentence, document.get_sentence_by_id(first.id),
+                      "Mentions should resolve the sentence the document currently holds")
+
+    def test_thread_safe(self):
+        document = Document(self._xml, thread_safe=True, max_resident_sentences=2)
+        self.assertEquals(len(self._full.sentences), len([sentence.id for sentence in document.sentences]))
+        self.assertEquals(2, len(document._sentences_dict))
+
+
 def suite():
     """
     Generates test suite
@@ -159,6 +312,7 @@ def suite():
     test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestDocument))
     test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestSentence))
     test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestToken))
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestResidentSentences))
     return test_suite
 
 if __name__ == "__main__":
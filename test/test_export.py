@@ -0,0 +1,75 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import shutil
+import tempfile
+import unittest
+from corenlp_xml.document import Document
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    from corenlp_xml.export import token_batches, dependency_batches, mention_batches, write_parquet
+except ImportError:
+    pyarrow = None
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._document = Document(xml_file.read())
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_token_batches(self):
+        batches = list(token_batches([self._document, self._document], batch_size=100))
+        total = 2 * len(self._document.token_columns)
+        self.assertEquals([100] * (total // 100) + [total % 100], [b.num_rows for b in batches],
+                          "Documents should be split across batches of batch_size rows")
+        self.assertEquals(list(self._document.token_columns.token_id) * 2,
+                          sum((b.column(2).to_pylist() for b in batches), []))
+        batch = batches[0]
+        self.assertIsInstance(batch.schema.types[7], pyarrow.DictionaryType,
+                              "Categorical columns should be dictionary-encoded")
+        token = list(self._document.sentences)[0].tokens[0]
+        self.assertEquals(token.word, batch.column(3)[0].as_py())
+        self.assertEquals(token.pos, batch.column(7).to_pylist()[0])
+
+    def test_dependency_batches(self):
+        batch = list(dependency_batches(self._document))[0]
+        expected = sum(len(s._element.xpath('dependencies/dep')) for s in self._document.sentences)
+        self.assertEquals(expected, batch.num_rows)
+        self.assertIn('root', batch.column(3).to_pylist())
+
+    def test_mention_batches(self):
+        batch = list(mention_batches(self._document))[0]
+        self.assertEquals(sum(len(c.mentions) for c in self._document.coreferences), batch.num_rows)
+        self.assertEquals("Pixar 's", batch.column(7)[0].as_py())
+
+    def test_write_parquet(self):
+        paths = [os.path.join(self._directory, name) for name in ("tokens.parquet", "deps.parquet", "mentions.parquet")]
+        count = write_parquet([self._document] * 3, paths[0], paths[1], paths[2], batch_size=1000)
+        self.assertEquals(3, count)
+        tokens = pyarrow.parquet.read_table(paths[0])
+        self.assertEquals(3 * len(self._document.token_columns), tokens.num_rows)
+        self.assertEquals(-(-tokens.num_rows // 1000), pyarrow.parquet.ParquetFile(paths[0]).num_row_groups,
+                          "Rows should be streamed out in row groups of batch_size rows")
+        mentions = pyarrow.parquet.read_table(paths[2])
+        self.assertEquals(3 * sum(len(c.mentions) for c in self._document.coreferences), mentions.num_rows)
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestExport))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
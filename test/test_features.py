@@ -0,0 +1,99 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.vocabulary import Vocabulary
+from corenlp_xml.features import FeatureExtractor, FeatureMatrix, FeatureTemplate, HeadTemplate, window
+
+
+class TestFeatures(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._document = Document(xml_file.read())
+        self._templates = window("lemma", 2) + [FeatureTemplate("pos"), HeadTemplate("pos")]
+
+    def test_feature_names(self):
+        extractor = FeatureExtractor(self._templates)
+        self.assertEquals(["lemma[-2]=<s>", "lemma[-1]=<s>", "lemma=take", "lemma[+1]=a", "lemma[+2]=flawed",
+                           "pos=VBG", "head.pos=VBZ"], extractor.feature_names(0, self._document))
+        last = len(list(self._document.sentences)[0].tokens) - 1
+        self.assertEquals(["lemma[+1]=</s>", "lemma[+2]=</s>"], extractor.feature_names(last, self._document)[3:5],
+                          "Windows shouldn't cross sentence boundaries")
+
+    def test_window_names(self):
+        templates = window("word", 1, name="w", transform=lambda value: value.lower())
+        self.assertEquals(["w[-1]", "w", "w[+1]"], [template.name for template in templates])
+        self.assertEquals(["w[-1]=<s>", "w=taking", "w[+1]=a"],
+                          FeatureExtractor(templates).feature_names(0, self._document))
+
+    def test_short_sentences(self):
+        token = '<token id="%d"><word>%s</word><lemma>%s</lemma><POS>NN</POS></token>'
+        sentences = ''.join('<sentence id="%d"><tokens>%s</tokens></sentence>'
+                            % (i + 1, ''.join(token % (j + 1, word, word) for j, word in enumerate(words)))
+                            for i, words in enumerate([["a", "b"], ["c", "d", "e", "f", "g"], ["h"]]))
+        document = Document('<root><document><sentences>%s</sentences></document></root>' % sentences)
+        self.assertEquals(["<s>", "<s>", "<s>", "<s>", "c", "d", "e", "<s>"],
+                          FeatureTemplate("word", -2).values(document))
+        self.assertEquals(["</s>", "</s>", "e", "f", "g", "</s>", "</s>", "</s>"],
+                          FeatureTemplate("word", 2).values(document))
+        self.assertEquals(["<s>", "<s>", "<s>", "<s>", "<s>", "c", "d", "<s>"],
+                          FeatureTemplate("word", -3).values(document))
+        matrix = FeatureExtractor(window("word", 3), n_features=None).transform(document)
+        self.assertEquals(8, len(list(matrix.rows())))
+
+    def test_matches_tokens(self):
+        sentence = list(self._document.sentences)[1]
+        start, _ = self._document.token_columns.sentence_range(1)
+        graph = sentence.collapsed_ccprocessed_dependencies
+        extractor = FeatureExtractor(self._templates, n_features=None)
+        matrix = extractor.transform(self._document)
+        for token in sentence.tokens:
+            row = list(matrix.rows())[start + token.id - 1]
+            self.assertEquals(len(self._templates), len(row))
+            self.assertEquals("pos=" + token.pos, extractor.vocabulary.term(row[5]))
+            governors = graph.get_node_by_idx(token.id).governors if graph.get_node_by_idx(token.id) else []
+            if governors and governors[0].idx > 0:
+                head = sentence.get_token_by_id(governors[0].idx)
+                self.assertEquals("head.pos=" + head.pos, extractor.vocabulary.term(row[6]))
+
+    def test_hashing(self):
+        matrix = FeatureExtractor(self._templates, n_features=1024).transform(self._document)
+        self.assertIsInstance(matrix, FeatureMatrix)
+        self.assertEquals((len(self._document.token_columns), 1024), matrix.shape)
+        self.assertTrue(all(0 <= column < 1024 for column in matrix.indices))
+        again = FeatureExtractor(list(reversed(self._templates)), n_features=1024).transform(self._document)
+        self.assertEquals([sorted(row) for row in matrix.rows()], [sorted(row) for row in again.rows()],
+                          "Hashing should be stable across extractors")
+
+    def test_batch_and_vocabulary_reuse(self):
+        extractor = FeatureExtractor(self._templates, n_features=None)
+        single = extractor.transform(self._document)
+        size = len(extractor.vocabulary)
+        batch = extractor.transform_batch([self._document, self._document])
+        self.assertEquals(size, len(extractor.vocabulary), "The vocabulary should be reused across calls")
+        self.assertEquals([0, len(single)], list(batch.document_starts))
+        self.assertEquals(2 * len(single), len(batch))
+        self.assertEquals(list(single.rows()), list(batch.rows())[len(single):])
+
+    def test_frozen_vocabulary(self):
+        vocabulary = Vocabulary([u"pos=NN"], frozen=True)
+        matrix = FeatureExtractor([FeatureTemplate("pos")], n_features=None, vocabulary=vocabulary).transform(
+            self._document)
+        self.assertEquals(list(self._document.token_columns.pos).count("NN"), len(matrix.indices),
+                          "Unseen features should be left out")
+        self.assertEquals(1, matrix.shape[1])
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestFeatures))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
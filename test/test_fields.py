@@ -0,0 +1,111 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import threading
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.fields import TOKEN_EXTRAS, SENTENCE_EXTRAS, MENTION_EXTRAS, FieldSpec, \
+    register_token_field, register_sentence_field, register_mention_field
+
+
+class TestFields(unittest.TestCase):
+
+    def setUp(self):
+        register_token_field("normalized_ner", "NormalizedNER")
+        register_token_field("timex_type", "Timex", attribute="type", default="NONE")
+        register_sentence_field("sentiment_label", attribute="sentiment", converter=int, default=-1)
+        register_mention_field("is_representative", attribute="representative", converter=lambda v: v == "true",
+                               default=False)
+        register_mention_field("mention_text", "text")
+        with open("test.xml", "rb") as xml_file:
+            self._document = Document(xml_file.read())
+
+    def tearDown(self):
+        for registry in (TOKEN_EXTRAS, SENTENCE_EXTRAS, MENTION_EXTRAS):
+            for spec in list(registry):
+                registry.unregister(spec.name)
+
+    def test_token_extra(self):
+        tokens = [token for sentence in self._document.sentences for token in sentence.tokens]
+        dated = [token for token in tokens if token.ner == "DATE"]
+        self.assertEquals("THIS P1M OFFSET P-1M", dated[0].extra["normalized_ner"])
+        self.assertEquals("DATE", dated[0].extra["timex_type"])
+        self.assertEquals({"normalized_ner": None, "timex_type": "NONE"}, tokens[0].extra)
+        self.assertIs(tokens[0].extra, tokens[0].extra, "Extra fields should be memoized")
+
+    def test_token_columns_extra(self):
+        tokens = [token for sentence in self._document.sentences for token in sentence.tokens]
+        columns = self._document.token_columns
+        for name in ("normalized_ner", "timex_type"):
+            self.assertEquals([token.extra[name] for token in tokens], columns.extra[name])
+
+    def test_sentence_extra(self):
+        for sentence in self._document.sentences:
+            self.assertEquals(sentence.sentiment, sentence.extra["sentiment_label"])
+
+    def test_mention_extra(self):
+        for coreference in self._document.coreferences:
+            for mention in coreference.mentions:
+                self.assertEquals(mention.representative, mention.extra["is_representative"])
+                self.assertEquals(mention.text, mention.extra["mention_text"])
+
+    def test_registration(self):
+        self.assertRaises(ValueError, register_token_field, "pos", "POS")
+        self.assertRaises(ValueError, FieldSpec, "nothing")
+        register_token_field("normalized_ner", "NormalizedNER", converter=len)
+        self.assertEquals(2, len(TOKEN_EXTRAS), "Registering a name again should replace the field")
+        self.assertIn(len("THIS P1M OFFSET P-1M"),
+                      Document(self._document._xml_string).token_columns.extra["normalized_ner"])
+        TOKEN_EXTRAS.unregister("timex_type")
+        self.assertNotIn("timex_type", Document(self._document._xml_string).token_columns.extra)
+
+    def test_snapshots(self):
+        snapshot = TOKEN_EXTRAS.fields
+        specs = snapshot.specs
+        register_token_field("true_case", "TrueCase")
+        self.assertIsNot(snapshot, TOKEN_EXTRAS.fields, "Registering should swap in a new snapshot")
+        self.assertIs(specs, snapshot.specs, "Existing snapshots should never change")
+        self.assertIsInstance(TOKEN_EXTRAS.fields.specs, tuple)
+        self.assertEquals(["normalized_ner", "timex_type"], [spec.name for spec in snapshot])
+        self.assertEquals(["normalized_ner", "timex_type", "true_case"], [spec.name for spec in TOKEN_EXTRAS])
+
+    def test_register_while_loading(self):
+        xml = self._document._xml_string
+        done = threading.Event()
+        errors = []
+
+        def load():
+            try:
+                while not done.is_set():
+                    columns = Document(xml).token_columns
+                    self.assertEquals(sorted(spec.name for spec in columns.extra_fields), sorted(columns.extra))
+                    for name in columns.extra:
+                        self.assertEquals(len(columns), len(columns.extra[name]))
+            except Exception as e:
+                errors.append(e)
+
+        loaders = [threading.Thread(target=load) for _ in range(2)]
+        for loader in loaders:
+            loader.start()
+        try:
+            for i in range(200):
+                register_token_field("field%d" % (i % 5), "Timex", attribute="tid")
+                TOKEN_EXTRAS.unregister("field%d" % ((i + 2) % 5))
+        finally:
+            done.set()
+            for loader in loaders:
+                loader.join()
+        self.assertEquals([], errors)
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestFields))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
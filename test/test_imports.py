@@ -0,0 +1,74 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import subprocess
+import unittest
+
+"""
+Cumulative import time budget for corenlp_xml.document, in microseconds, as reported by python -X importtime
+"""
+IMPORT_BUDGET_US = 500000
+
+
+def run_python(code, *options):
+    """ Runs code in a fresh interpreter from the repository root, returning stdout and stderr """
+    process = subprocess.Popen([sys.executable] + list(options) + ["-c", code],
+                               cwd=os.path.abspath(".."), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    return out.decode("utf-8"), err.decode("utf-8")
+
+
+class TestImports(unittest.TestCase):
+
+    def test_nltk_is_lazy(self):
+        out, _ = run_python("import sys; import corenlp_xml.document; print('nltk' in sys.modules)")
+        self.assertEquals("False", out.strip(), "Importing the document module shouldn't import nltk")
+
+    def test_parse_imports_nltk(self):
+        out, _ = run_python("import sys\n"
+                            "from corenlp_xml.document import Document\n"
+                            "d = Document(open('test/test.xml', 'rb').read())\n"
+                            "s = list(d.sentences)[0]\n"
+                            "print('nltk' in sys.modules)\n"
+                            "try:\n"
+                            "    s.parse\n"
+                            "except AttributeError:\n"
+                            "    pass\n"
+                            "print('nltk' in sys.modules)")
+        self.assertEquals(["False", "True"], out.split())
+
+    def test_package_is_lazy(self):
+        out, _ = run_python("import sys; import corenlp_xml; print('lxml' in sys.modules)")
+        self.assertEquals("False", out.strip(), "Importing the package shouldn't import the document module")
+
+    @unittest.skipIf(sys.version_info < (3, 7), "Lazy package attributes need Python 3.7")
+    def test_package_document(self):
+        out, _ = run_python("import corenlp_xml; print(corenlp_xml.Document.__module__)")
+        self.assertEquals("corenlp_xml.document", out.strip())
+
+    def test_package_docstring(self):
+        import corenlp_xml
+        self.assertTrue(corenlp_xml.__doc__.strip().startswith("Data abstraction library"))
+
+    @unittest.skipIf(sys.version_info < (3, 7), "-X importtime needs Python 3.7")
+    def test_import_time(self):
+        _, err = run_python("import corenlp_xml.document", "-X", "importtime")
+        timings = dict((line.split("|")[2].strip(), int(line.split("|")[1].split(":")[-1]))
+                       for line in err.splitlines() if line.startswith("import time:") and "|" in line
+                       and not line.split("|")[1].strip().startswith("cumulative"))
+        self.assertNotIn("nltk", timings)
+        self.assertLess(timings["corenlp_xml.document"], IMPORT_BUDGET_US,
+                        "corenlp_xml.document took %dus to import" % timings["corenlp_xml.document"])
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestImports))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
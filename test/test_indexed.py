@@ -0,0 +1,82 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import shutil
+import tempfile
+import unittest
+from corenlp_xml.document import Document, Sentence
+from corenlp_xml.coreference import Coreference
+from corenlp_xml.indexed import IndexedDocument, build_index
+
+
+class TestIndexedDocument(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._index_path = os.path.join(self._directory, "test.xml.idx")
+        self._indexed = Document.open_indexed("test.xml", index_path=self._index_path)
+        with open("test.xml", "rb") as xml_file:
+            self._document = Document(xml_file.read())
+
+    def tearDown(self):
+        self._indexed.close()
+        shutil.rmtree(self._directory)
+
+    def test_open_indexed(self):
+        self.assertIsInstance(self._indexed, IndexedDocument)
+        self.assertTrue(os.path.exists(self._index_path), "Sidecar index should be written on first open")
+        self.assertEquals([s.id for s in self._document.sentences], self._indexed.sentence_ids)
+
+    def test_index_reused(self):
+        with open(self._index_path, "r") as index_file:
+            written = index_file.read()
+        with IndexedDocument("test.xml", index_path=self._index_path) as reopened:
+            self.assertEquals(self._indexed._index, reopened._index, "Index should be loaded from the sidecar")
+        with open(self._index_path, "r") as index_file:
+            self.assertEquals(written, index_file.read(), "A fresh index shouldn't be rewritten")
+
+    def test_get_sentence_by_id(self):
+        sentence = self._indexed.get_sentence_by_id(4)
+        self.assertIsInstance(sentence, Sentence)
+        self.assertEquals(4, sentence.id)
+        self.assertEquals(str(self._document.get_sentence_by_id(4).tokens), str(sentence.tokens))
+        self.assertIs(sentence, self._indexed.get_sentence_by_id(4), "Sentences should be memoized")
+        self.assertIsNone(self._indexed.get_sentence_by_id(-1), "If the ID doesn't exist, we should get None")
+
+    def test_coreferences_for_sentence(self):
+        corefs = self._indexed.coreferences_for_sentence(1)
+        expected = [c for c in self._document.coreferences if 1 in [m.sentence.id for m in c.mentions]]
+        self.assertEquals(len(expected), len(corefs))
+        for coref in corefs:
+            self.assertIsInstance(coref, Coreference)
+            self.assertIn(1, [m.sentence.id for m in coref.mentions])
+        self.assertEquals("Pixar 's", str(corefs[0].representative.tokens))
+
+    def test_truncated_file(self):
+        with open("test.xml", "rb") as xml_file:
+            data = xml_file.read()
+        truncated = data[:data.index(b'<sentence id="3"') + 100]
+        self.assertRaises(ValueError, build_index, truncated)
+        try:
+            build_index(truncated)
+        except ValueError as e:
+            self.assertIn("byte %d" % data.index(b'<sentence id="3"'), str(e))
+
+    def test_build_index(self):
+        with open("test.xml", "rb") as xml_file:
+            index = build_index(xml_file.read())
+        self.assertEquals(len(self._document.sentences), len(index['sentences']))
+        self.assertEquals(len(self._document.coreferences), len(index['coreferences']))
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestIndexedDocument))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
@@ -0,0 +1,153 @@
+import json
+import os
+import pickle
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.columns import TOKEN_FIELDS
+from corenlp_xml.fields import TOKEN_EXTRAS, register_token_field
+from corenlp_xml.json_backend import build_tree, loads
+
+
+def token_rows(sentence):
+    return [(token.id, token.word, token.lemma, token.character_offset_begin, token.character_offset_end,
+             token.pos, token.ner, token.speaker) for token in sentence.tokens]
+
+
+def link_rows(graph):
+    return [(link.type, link.governor.idx, link.governor.text, link.dependent.idx, link.dependent.text)
+            for link in graph.links]
+
+
+def mention_rows(document):
+    return [[(mention.sentence.id, [token.id for token in mention.tokens], mention.head.id, mention.representative)
+             for mention in coreference.mentions] for coreference in document.coreferences]
+
+
+class TestJsonBackend(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._xml = Document(xml_file.read())
+        with open("test.json", "rb") as json_file:
+            self._json_string = json_file.read()
+        self._json = Document.from_json(self._json_string)
+
+    def tearDown(self):
+        TOKEN_EXTRAS.unregister('timex_type')
+        TOKEN_EXTRAS.unregister('true_case')
+
+    def test_loads(self):
+        self.assertEquals(json.loads(self._json_string.decode('utf-8')), loads(self._json_string))
+        self.assertEquals(loads(self._json_string), loads(self._json_string, decoder=json.loads))
+        self.assertEquals(loads(self._json_string), loads(self._json_string.decode('utf-8'), decoder=json.loads))
+
+    def test_columns_without_tree(self):
+        self._json.token_columns
+        self._json.resolve_coreferences()
+        self._json.dependency_batch()
+        self._json.sentiment
+        self.assertIsNone(self._json._root, "Columns shouldn't build the XML-shaped tree")
+
+    def test_token_columns(self):
+        expected, actual = self._xml.token_columns, self._json.token_columns
+        self.assertEquals(len(expected), len(actual))
+        for name in ['sentence_id', 'token_id', 'sentence_ids', 'sentence_starts'] + [f[0] for f in TOKEN_FIELDS]:
+            self.assertEquals(list(getattr(expected, name)), list(getattr(actual, name)), name)
+
+    def test_coreference_table(self):
+        expected, actual = self._xml.resolve_coreferences(), self._json.resolve_coreferences()
+        for name in expected.COLUMNS + ('representative',):
+            self.assertEquals(list(getattr(expected, name)), list(getattr(actual, name)), name)
+
+    def test_dependency_batch(self):
+        for kind in ('basic', 'collapsed', 'collapsed-ccprocessed'):
+            expected, actual = self._xml.dependency_batch(kind), self._json.dependency_batch(kind)
+            self.assertEquals(expected.to_csr(), actual.to_csr(), kind)
+            self.assertEquals(list(expected.roots), list(actual.roots), kind)
+
+    def test_sentiment(self):
+        self.assertAlmostEquals(self._xml.sentiment, self._json.sentiment)
+        self.assertEquals([s.sentiment for s in self._xml.sentences], [s.sentiment for s in self._json.sentences])
+
+    def test_sentences(self):
+        self.assertEquals(len(self._xml.sentences), len(self._json.sentences))
+        for expected, actual in zip(self._xml.sentences, self._json.sentences):
+            self.assertEquals(expected.id, actual.id)
+            self.assertEquals(expected.parse_string, actual.parse_string)
+            self.assertEquals(token_rows(expected), token_rows(actual))
+
+    def test_dependencies(self):
+        for expected, actual in zip(self._xml.sentences, self._json.sentences):
+            for name in ('basic_dependencies', 'collapsed_dependencies', 'collapsed_ccprocessed_dependencies'):
+                self.assertEquals(link_rows(getattr(expected, name)), link_rows(getattr(actual, name)), name)
+
+    def test_coreferences(self):
+        self.assertEquals(mention_rows(self._xml), mention_rows(self._json))
+
+    def test_entities(self):
+        self.assertEquals([(e.type, e.start_index, e.end_index, e.text, e.chain)
+                           for e in self._xml.get_entities(coreferences=True)],
+                          [(e.type, e.start_index, e.end_index, e.text, e.chain)
+                           for e in self._json.get_entities(coreferences=True)])
+
+    def test_newer_keys(self):
+        data = loads(self._json_string)
+        for sentence in data['sentences']:
+            sentence['basicDependencies'] = sentence.pop('basic-dependencies')
+        document = Document.from_json(json.dumps(data))
+        self.assertEquals(link_rows(list(self._xml.sentences)[0].basic_dependencies),
+                          link_rows(list(document.sentences)[0].basic_dependencies))
+        self.assertEquals(self._xml.dependency_batch('basic').to_csr(), document.dependency_batch('basic').to_csr())
+
+    def test_registered_fields(self):
+        register_token_field('timex_type', 'Timex', attribute='type')
+        document = Document.from_json(self._json_string)
+        self.assertEquals(self._xml.token_columns.extra, document.token_columns.extra)
+        tree = build_tree(loads(self._json_string))
+        self.assertEquals(len(self._xml._xml.xpath('//Timex')), len(tree.xpath('//Timex')))
+
+    def test_corenlp4_keys(self):
+        with open("test_corenlp4.json", "rb") as json_file:
+            document = Document.from_json(json_file.read())
+        for kind in ('basic', 'collapsed', 'collapsed-ccprocessed'):
+            self.assertEquals(self._xml.dependency_batch(kind).to_csr(), document.dependency_batch(kind).to_csr(),
+                              "Enhanced dependencies should stand in for %s ones" % kind)
+        for expected, actual in zip(self._xml.sentences, document.sentences):
+            self.assertEquals(link_rows(expected.collapsed_ccprocessed_dependencies),
+                              link_rows(actual.collapsed_ccprocessed_dependencies))
+        self.assertEquals(1, len(document._xml.xpath('/root/document/sentences/sentence[1]/dependencies'
+                                                     '[@type="collapsed-ccprocessed-dependencies"]')))
+        self.assertEquals(1, len(document._xml.xpath('/root/document/sentences/sentence[1]/dependencies'
+                                                     '[@type="enhanced-plus-plus-dependencies"]')))
+
+    def test_json_keys(self):
+        spec = register_token_field('true_case', 'TrueCase')
+        self.assertEquals('truecase', spec.json_key)
+        with open("test_corenlp4.json", "rb") as json_file:
+            document = Document.from_json(json_file.read())
+        self.assertEquals('INIT_UPPER', list(document.sentences)[0].tokens[0].extra['true_case'])
+        self.assertNotIn(None, document.token_columns.extra['true_case'])
+        self.assertEquals('normalizedNER', register_token_field('true_case', 'NormalizedNER').json_key)
+        self.assertEquals('case', register_token_field('true_case', 'TrueCase', json_key='case').json_key)
+
+    def test_pickle(self):
+        self._json.token_columns
+        restored = pickle.loads(pickle.dumps(self._json))
+        self.assertEquals(token_rows(list(self._xml.sentences)[0]), token_rows(list(restored.sentences)[0]))
+        self.assertEquals(list(self._xml.token_columns.pos), list(restored.token_columns.pos))
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestJsonBackend))
+    return test_suite
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
@@ -0,0 +1,89 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import shutil
+import tempfile
+import threading
+import unittest
+from lxml import etree
+from corenlp_xml.document import Document
+from corenlp_xml.parsers import TRUSTED_OPTIONS, get_parser, parse
+
+
+class TestParsers(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._xml = xml_file.read()
+
+    def test_get_parser(self):
+        parser = get_parser(TRUSTED_OPTIONS)
+        self.assertIs(parser, get_parser(dict(TRUSTED_OPTIONS)), "Parsers should be reused on the same thread")
+        self.assertIsNot(parser, get_parser({'remove_blank_text': True}))
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_parser(TRUSTED_OPTIONS)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(parser, other[0], "Each thread should get its own parser")
+
+    def test_trusted_parse(self):
+        root = parse(self._xml, TRUSTED_OPTIONS)
+        self.assertIsNone(root.getprevious(), "Processing instructions should be dropped")
+        self.assertIsNone(root.find("document").text, "Whitespace between elements should be dropped")
+        self.assertIsNotNone(parse(self._xml).getprevious())
+
+    def test_document_parser_options(self):
+        default = Document(self._xml)
+        trusted = Document(self._xml, parser_options=TRUSTED_OPTIONS)
+        self.assertEquals(default.token_columns.word, trusted.token_columns.word)
+        self.assertEquals(default.resolve_coreferences().head_index, trusted.resolve_coreferences().head_index)
+        self.assertEquals([s.parse_string for s in default.sentences], [s.parse_string for s in trusted.sentences])
+        self.assertEquals(default.sentiment, trusted.sentiment)
+
+    def test_from_path_parser_options(self):
+        document = Document.from_path("test.xml", parser_options=TRUSTED_OPTIONS)
+        self.assertIsNone(document._xml.getprevious())
+        self.assertEquals(Document(self._xml).token_columns.pos, document.token_columns.pos)
+
+    def test_from_path_reuses_parser(self):
+        from corenlp_xml import readers
+        read_path = readers.read_path
+        used = []
+
+        def recording_read_path(path, **kwargs):
+            used.append(kwargs['parser'])
+            return read_path(path, **kwargs)
+
+        readers.read_path = recording_read_path
+        try:
+            Document.from_path("test.xml", parser_options=TRUSTED_OPTIONS)
+            Document.from_path("test.xml", parser_options=dict(TRUSTED_OPTIONS))
+        finally:
+            readers.read_path = read_path
+        self.assertIs(get_parser(TRUSTED_OPTIONS), used[0], "from_path should use this thread's parser")
+        self.assertIs(used[0], used[1])
+
+    def test_reused_parser_recovers(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "truncated.xml")
+            with open(path, "wb") as truncated:
+                truncated.write(self._xml[:len(self._xml) // 2])
+            self.assertRaises(etree.XMLSyntaxError, Document.from_path, path, parser_options=TRUSTED_OPTIONS)
+        finally:
+            shutil.rmtree(directory)
+        document = Document.from_path("test.xml", parser_options=TRUSTED_OPTIONS)
+        self.assertEquals(Document(self._xml).token_columns.word, document.token_columns.word)
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestParsers))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
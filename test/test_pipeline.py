@@ -0,0 +1,90 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import shutil
+import tarfile
+import tempfile
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.pipeline import Pipeline, Stage, StageStats, read_corpus
+
+
+def sentence_count(document):
+    """ Module-level so that it can be sent to a process pool """
+    return len(document.sentences)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._corpus = os.path.join(self._directory, "corpus")
+        os.mkdir(self._corpus)
+        for i in range(5):
+            shutil.copy("test.xml", os.path.join(self._corpus, "doc%d.xml" % i))
+        self._tar = os.path.join(self._directory, "corpus.tar.gz")
+        with tarfile.open(self._tar, "w:gz") as archive:
+            for i in range(5):
+                archive.add(os.path.join(self._corpus, "doc%d.xml" % i), arcname="corpus/doc%d.xml" % i)
+        with open("test.xml", "r") as xml_file:
+            self._document = Document(xml_file.read())
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_read_corpus(self):
+        from_directory = list(read_corpus(self._corpus))
+        self.assertEquals(["doc%d.xml" % i for i in range(5)], [name for name, _ in from_directory])
+        from_tar = list(read_corpus(self._tar))
+        self.assertEquals(["corpus/doc%d.xml" % i for i in range(5)], [name for name, _ in from_tar])
+        self.assertEquals(from_directory[0][1], from_tar[0][1])
+
+    def test_stages(self):
+        written = []
+        pipeline = (Pipeline.from_path(self._corpus)
+                    .parse(mode="thread", workers=2)
+                    .select(sentence_count)
+                    .transform(lambda count: count * 2, name="double", mode="thread", workers=2, queue_size=1)
+                    .write(lambda name, value: written.append((name, value))))
+        stats = pipeline.run()
+        expected = len(self._document.sentences) * 2
+        self.assertEquals([("doc%d.xml" % i, expected) for i in range(5)], written, "Order should be preserved")
+        self.assertEquals(["parse", "sentence_count", "double", "<lambda>"], [s.name for s in stats])
+        for stage_stats in stats:
+            self.assertIsInstance(stage_stats, StageStats)
+            self.assertEquals(5, stage_stats.documents)
+            self.assertEquals(5 * len(self._document.token_columns), stage_stats.tokens,
+                              "Token counts should be carried from the parse stage")
+            self.assertGreaterEqual(stage_stats.tokens_per_second, 0)
+
+    def test_process_parse_with_select(self):
+        results = list(Pipeline.from_path(self._tar).parse(select=sentence_count, mode="process", workers=2))
+        self.assertEquals([len(self._document.sentences)] * 5, [value for _, value in results])
+
+    def test_backpressure(self):
+        pulled = []
+
+        def source():
+            for i in range(20):
+                pulled.append(i)
+                yield str(i), i
+
+        stream = iter(Pipeline(source()).transform(lambda i: i, mode="thread", workers=2, queue_size=3))
+        next(stream)
+        self.assertLessEqual(len(pulled), 4, "A stage shouldn't read further ahead than its queue size")
+
+    def test_invalid_mode(self):
+        self.assertRaises(ValueError, Stage, sentence_count, mode="fibers")
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestPipeline))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
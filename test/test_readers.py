@@ -0,0 +1,133 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import bz2
+import gzip
+import shutil
+import tarfile
+import tempfile
+import unittest
+from lxml import etree
+from corenlp_xml.document import Document
+from corenlp_xml.readers import QUEUE_SIZE, open_compressed, parse_stream, iter_documents, lzma
+
+
+class TestReaders(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        with open("test.xml", "rb") as xml_file:
+            self._xml = xml_file.read()
+        self._document = Document(self._xml)
+        self._paths = {".xml": os.path.join(self._directory, "doc.xml")}
+        shutil.copy("test.xml", self._paths[".xml"])
+        self._paths[".xml.gz"] = os.path.join(self._directory, "doc.xml.gz")
+        with gzip.open(self._paths[".xml.gz"], "wb") as gz_file:
+            gz_file.write(self._xml)
+        self._paths[".xml.bz2"] = os.path.join(self._directory, "doc.xml.bz2")
+        with open(self._paths[".xml.bz2"], "wb") as bz2_file:
+            bz2_file.write(bz2.compress(self._xml))
+        if lzma is not None:
+            self._paths[".xml.xz"] = os.path.join(self._directory, "doc.xml.xz")
+            with open(self._paths[".xml.xz"], "wb") as xz_file:
+                xz_file.write(lzma.compress(self._xml))
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def assertSameDocument(self, document):
+        self.assertIsInstance(document, Document)
+        self.assertEquals(self._document.token_columns.word, document.token_columns.word)
+        self.assertEquals(self._document.sentiment, document.sentiment)
+
+    def test_from_path(self):
+        for extension, path in self._paths.items():
+            self.assertSameDocument(Document.from_path(path))
+            self.assertSameDocument(Document.from_path(path, threaded=False))
+
+    def test_multiple_gzip_members(self):
+        path = os.path.join(self._directory, "split.xml.gz")
+        half = len(self._xml) // 2
+        with open(path, "wb") as gz_file:
+            for part in (self._xml[:half], self._xml[half:]):
+                with gzip.GzipFile(fileobj=gz_file, mode="wb") as member:
+                    member.write(part)
+        self.assertSameDocument(Document.from_path(path))
+
+    def test_open_compressed(self):
+        with open(self._paths[".xml.bz2"], "rb") as raw:
+            self.assertEquals(self._xml, open_compressed(raw, "doc.xml.bz2").read())
+
+    def test_parse_errors_propagate(self):
+        with open(self._paths[".xml.gz"], "rb") as raw:
+            raw.read(100)
+            stream = open_compressed(raw, "doc.xml.gz")
+            self.assertRaises(Exception, parse_stream, stream, 1024)
+
+        class Broken(object):
+            def read(self, size):
+                raise IOError("disk on fire")
+
+        self.assertRaises(IOError, parse_stream, Broken())
+        self.assertRaises(etree.XMLSyntaxError, parse_stream, _Truncated(self._xml))
+
+    def test_parse_errors_stop_reading(self):
+        stream = _Endless(b"<root></wrong>")
+        self.assertRaises(etree.XMLSyntaxError, parse_stream, stream, 1024)
+        self.assertLess(stream.reads, QUEUE_SIZE + 4, "The reader should stop once parsing has failed")
+
+    def test_iter_documents(self):
+        tar_path = os.path.join(self._directory, "corpus.tar.bz2")
+        with tarfile.open(tar_path, "w:bz2") as archive:
+            for extension in sorted(self._paths):
+                archive.add(self._paths[extension], arcname="corpus/doc" + extension)
+            readme = os.path.join(self._directory, "README")
+            with open(readme, "wb") as readme_file:
+                readme_file.write(b"not a document")
+            archive.add(readme, arcname="corpus/README")
+            archive.add(readme, arcname="corpus/doc.json")
+        documents = list(iter_documents(tar_path))
+        self.assertEquals(sorted("corpus/doc" + extension for extension in self._paths),
+                          [name for name, _ in documents])
+        for _, document in documents:
+            self.assertSameDocument(document)
+        self.assertEquals(sorted("doc" + extension for extension in self._paths),
+                          [name for name, _ in iter_documents(self._directory)])
+
+
+class _Truncated(object):
+    """ A stream that ends half way through the XML """
+
+    def __init__(self, xml):
+        self._chunks = [xml[:len(xml) // 2]]
+
+    def read(self, size):
+        return self._chunks.pop() if self._chunks else b''
+
+
+class _Endless(object):
+    """ A stream that starts with some XML and then keeps producing whitespace for a long time """
+
+    def __init__(self, xml, limit=100000):
+        self._xml = xml
+        self._limit = limit
+        self.reads = 0
+
+    def read(self, size):
+        self.reads += 1
+        if self.reads == 1:
+            return self._xml
+        return b" " * size if self.reads < self._limit else b""
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestReaders))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
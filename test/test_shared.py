@@ -0,0 +1,85 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import pickle
+import unittest
+from multiprocessing import Pool
+from corenlp_xml.document import Document
+from corenlp_xml.vocabulary import Vocabulary
+from corenlp_xml.shared import share_document, attach_document
+
+
+def count_nouns(handle):
+    """ Runs in a worker process against the shared arrays """
+    with attach_document(handle) as view:
+        return sum(1 for tag in view.strings("tokens.pos") if tag.startswith("NN"))
+
+
+class TestPickle(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._document = Document(xml_file.read())
+
+    def test_pickle_document(self):
+        self._document.token_columns
+        data = pickle.dumps(self._document, pickle.HIGHEST_PROTOCOL)
+        self.assertLess(len(data), len(self._document._xml_string) / 4, "Pickled form should be compact")
+        restored = pickle.loads(data)
+        self.assertIsInstance(restored, Document)
+        self.assertIsNotNone(restored._token_columns, "Built token columns should travel with the document")
+        self.assertEquals(self._document.token_columns.word, restored.token_columns.word)
+        self.assertEquals([str(s.tokens) for s in self._document.sentences],
+                          [str(s.tokens) for s in restored.sentences])
+        self.assertEquals(self._document.sentiment, restored.sentiment)
+
+    def test_vocabulary(self):
+        vocabulary = Vocabulary(["a", "b"])
+        self.assertEquals([0, 1, 2, 0], list(vocabulary.encode(["a", "b", "c", "a"])))
+        self.assertEquals(["c", "a"], vocabulary.decode([2, 0]))
+        frozen = Vocabulary(["a"], frozen=True, unknown="<unk>")
+        self.assertEquals([1, 0], list(frozen.encode(["a", "z"])))
+        self.assertEquals(2, len(frozen), "Frozen vocabularies shouldn't grow")
+
+
+@unittest.skipIf(sys.version_info < (3, 8), "multiprocessing.shared_memory needs Python 3.8")
+class TestSharedMemory(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._document = Document(xml_file.read())
+
+    def test_attach(self):
+        with share_document(self._document) as shared:
+            handle = pickle.loads(pickle.dumps(shared.handle))
+            with attach_document(handle) as view:
+                self.assertEquals(len(self._document.token_columns), len(view))
+                self.assertEquals(self._document.token_columns.word, view.strings("tokens.word"))
+                self.assertEquals(list(self._document.token_columns.character_offset_begin),
+                                  view.column("tokens.character_offset_begin").tolist())
+                self.assertIn("root", view.strings("dependencies.relation"))
+                self.assertEquals(list(self._document.resolve_coreferences().head_index),
+                                  view.column("mentions.head_index").tolist())
+
+    def test_workers(self):
+        expected = sum(1 for tag in self._document.token_columns.pos if tag.startswith("NN"))
+        pool = Pool(2)
+        try:
+            with share_document(self._document) as shared:
+                self.assertEquals([expected] * 4, pool.map(count_nouns, [shared.handle] * 4))
+        finally:
+            pool.terminate()
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestPickle))
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestSharedMemory))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
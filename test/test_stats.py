@@ -0,0 +1,94 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import json
+import pickle
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from corenlp_xml.document import Document
+from corenlp_xml.stats import DocumentStats, corpus_stats, merge_stats, scan, xml_stats
+
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._xml = xml_file.read()
+        self._document = Document(self._xml)
+        self._stats = xml_stats(self._xml)
+
+    def test_counts(self):
+        sentences = list(self._document.sentences)
+        tokens = [token for sentence in sentences for token in sentence.tokens]
+        self.assertEquals(1, self._stats.documents)
+        self.assertEquals(len(sentences), self._stats.sentences)
+        self.assertEquals(len(tokens), self._stats.tokens)
+        self.assertEquals(Counter(token.pos for token in tokens), self._stats.pos)
+        self.assertEquals(Counter(sentence.sentiment for sentence in sentences), self._stats.sentiment)
+        self.assertEquals(Counter(len(sentence.tokens) for sentence in sentences), self._stats.sentence_lengths)
+        self.assertEquals(self._document.sentiment, self._stats.mean_sentiment)
+        self.assertAlmostEquals(float(len(tokens)) / len(sentences), self._stats.mean_sentence_length)
+
+    def test_scan_path(self):
+        self.assertEquals(self._stats.to_dict(), scan("test.xml").to_dict())
+
+    def test_scan_releases_elements(self):
+        from corenlp_xml import stats
+        iterparse = stats.etree.iterparse
+        contexts = []
+
+        def recording_iterparse(*args, **kwargs):
+            contexts.append(iterparse(*args, **kwargs))
+            return contexts[-1]
+
+        stats.etree.iterparse = recording_iterparse
+        try:
+            self.assertEquals(self._stats.to_dict(), scan("test.xml").to_dict())
+        finally:
+            stats.etree.iterparse = iterparse
+        root = contexts[0].root
+        for tag in ("token", "mention", "coreference/coreference"):
+            self.assertEquals([], root.findall(".//" + tag), "Scanned %s elements should be freed" % tag)
+
+    def test_merge(self):
+        merged = merge_stats([self._stats, xml_stats(self._xml)])
+        self.assertEquals(2, merged.documents)
+        self.assertEquals(2 * self._stats.tokens, merged.tokens)
+        self.assertEquals(2 * self._stats.pos["NN"], merged.pos["NN"])
+        self.assertEquals(self._stats.mean_sentiment, merged.mean_sentiment)
+        self.assertEquals(merged.to_dict(), (self._stats + self._stats).to_dict())
+        self.assertEquals(1, self._stats.documents, "Adding shouldn't modify either side")
+        self.assertIsNone(DocumentStats().mean_sentence_length)
+
+    def test_serialization(self):
+        restored = DocumentStats.from_dict(json.loads(json.dumps(self._stats.to_dict())))
+        self.assertEquals(self._stats.to_dict(), restored.to_dict())
+        self.assertEquals(self._stats.sentiment, restored.sentiment)
+        self.assertEquals(self._stats.to_dict(), pickle.loads(pickle.dumps(self._stats)).to_dict())
+
+    def test_corpus_stats(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for i in range(4):
+                shutil.copy("test.xml", os.path.join(directory, "doc%d.xml" % i))
+            serial = corpus_stats(directory)
+            self.assertEquals(4, serial.documents)
+            self.assertEquals(4 * self._stats.tokens, serial.tokens)
+            self.assertEquals(serial.to_dict(), corpus_stats(directory, mode='process', workers=2).to_dict())
+        finally:
+            shutil.rmtree(directory)
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestStats))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
@@ -0,0 +1,58 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.dependencies import iter_dependency_edges
+from corenlp_xml.target import load_columns, ColumnarDocument
+from corenlp_xml.columns import TOKEN_FIELDS
+
+
+class TestTarget(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            xml = xml_file.read()
+        self._document = Document(xml)
+        self._columnar = load_columns(xml)
+
+    def test_load_columns(self):
+        self.assertIsInstance(self._columnar, ColumnarDocument)
+        self.assertIsInstance(Document.load_columns(self._document._xml_string), ColumnarDocument)
+
+    def test_token_columns(self):
+        expected, actual = self._document.token_columns, self._columnar.token_columns
+        self.assertEquals(len(expected), len(actual))
+        for name in ['sentence_id', 'token_id', 'sentence_ids', 'sentence_starts'] + [f[0] for f in TOKEN_FIELDS]:
+            self.assertEquals(list(getattr(expected, name)), list(getattr(actual, name)), name)
+
+    def test_dependency_edges(self):
+        expected = list(iter_dependency_edges(self._document._xml.xpath('/root/document/sentences/sentence')))
+        self.assertEquals(expected, self._columnar.dependency_edges)
+
+    def test_coreference_table(self):
+        expected, actual = self._document.resolve_coreferences(), self._columnar.coreference_table
+        for name in expected.COLUMNS + ('representative',):
+            self.assertEquals(list(getattr(expected, name)), list(getattr(actual, name)), name)
+
+    def test_sentences(self):
+        self.assertEquals(self._document.sentiment, self._columnar.sentiment)
+        for sentence in self._document.sentences:
+            self.assertEquals(sentence.parse_string, self._columnar.parse_strings[sentence.id])
+            self.assertEquals(sentence.sentiment, self._columnar.sentence_sentiments[sentence.id])
+
+    def test_offset_index(self):
+        self.assertEquals(self._document.offset_index.index_at(10), self._columnar.offset_index.index_at(10))
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestTarget))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
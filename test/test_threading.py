@@ -0,0 +1,88 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from multiprocessing.pool import ThreadPool
+from corenlp_xml.document import Document, Sentence
+from corenlp_xml.locking import FieldLocks, NO_LOCKS
+
+
+def touch(document):
+    """ Reads every lazily-loaded field a request handler might use, returning the identities of what it got """
+    seen = {}
+    for sentence in document.sentences:
+        seen[("sentence", sentence.id)] = id(sentence)
+        for token in sentence.tokens:
+            seen[("token", sentence.id, token.id)] = id(token)
+        for name in ("basic_dependencies", "collapsed_dependencies", "collapsed_ccprocessed_dependencies"):
+            seen[(name, sentence.id)] = id(getattr(sentence, name))
+    for chain, coref in enumerate(document.coreferences):
+        for n, mention in enumerate(coref.mentions):
+            seen[("mention", chain, n)] = id(mention)
+    seen[("columns",)] = id(document.token_columns)
+    seen[("offsets",)] = id(document.offset_index)
+    seen[("table",)] = id(document.resolve_coreferences())
+    return seen
+
+
+class TestThreadSafety(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "r") as xml_file:
+            self._xml = xml_file.read()
+        self._interval = sys.getswitchinterval() if hasattr(sys, "getswitchinterval") else sys.getcheckinterval()
+        """ Switch threads as often as possible to shake out races """
+        if hasattr(sys, "setswitchinterval"):
+            sys.setswitchinterval(1e-6)
+        else:
+            sys.setcheckinterval(1)
+
+    def tearDown(self):
+        if hasattr(sys, "setswitchinterval"):
+            sys.setswitchinterval(self._interval)
+        else:
+            sys.setcheckinterval(self._interval)
+
+    def test_locks(self):
+        self.assertIs(NO_LOCKS, Document(self._xml)._locks, "Default mode shouldn't allocate locks")
+        self.assertIsInstance(Document(self._xml, thread_safe=True)._locks, FieldLocks)
+        sentence = Document(self._xml, thread_safe=True).sentences[0]
+        self.assertTrue(sentence.thread_safe, "Sentences should inherit thread-safe mode")
+        self.assertIsInstance(sentence._locks, FieldLocks)
+
+    def test_dependency_types(self):
+        sentence = Document(self._xml).sentences[0]
+        self.assertEquals("basic-dependencies", sentence.basic_dependencies.type)
+        self.assertEquals("collapsed-dependencies", sentence.collapsed_dependencies.type)
+        self.assertEquals("collapsed-ccprocessed-dependencies", sentence.collapsed_ccprocessed_dependencies.type)
+
+    def test_stress(self):
+        pool = ThreadPool(16)
+        try:
+            for _ in range(5):
+                document = Document(self._xml, thread_safe=True)
+                results = pool.map(touch, [document] * 32)
+                for result in results[1:]:
+                    self.assertEquals(results[0], result, "Every thread should see the same instances")
+        finally:
+            pool.terminate()
+
+    def test_thread_safe_sentence_pickle(self):
+        import pickle
+        sentence = Document(self._xml, thread_safe=True).sentences[0]
+        restored = pickle.loads(pickle.dumps(sentence))
+        self.assertIsInstance(restored, Sentence)
+        self.assertIsInstance(restored._locks, FieldLocks)
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestThreadSafety))
+    return test_suite
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())
@@ -0,0 +1,101 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(".."))
+
+import unittest
+from corenlp_xml.document import Document
+from corenlp_xml.windows import ColumnView, SentenceWindow
+
+
+class TestWindows(unittest.TestCase):
+
+    def setUp(self):
+        with open("test.xml", "rb") as xml_file:
+            self._document = Document(xml_file.read())
+        self._sentences = list(self._document.sentences)
+
+    def test_window_count(self):
+        self.assertEquals(len(self._sentences) - 2, len(list(self._document.windows(3))))
+        self.assertEquals(11, len(list(self._document.windows(3, stride=2))))
+        self.assertEquals(12, len(list(self._document.windows(3, stride=2, partial=True))))
+        self.assertEquals([], list(self._document.windows(len(self._sentences) + 1)))
+        self.assertRaises(ValueError, list, self._document.windows(0))
+
+    def test_shared_columns(self):
+        windows = list(self._document.windows(3, stride=2))
+        self.assertIs(windows[0].column('word').column, windows[1].column('word').column)
+        self.assertIs(self._document.token_columns.word, windows[1].column('word').column)
+
+    def test_tokens(self):
+        window = list(self._document.windows(2, stride=2))[1]
+        expected = list(self._sentences[2].tokens) + list(self._sentences[3].tokens)
+        self.assertEquals(len(expected), len(window))
+        self.assertEquals([token.word for token in expected], list(window.column('word')))
+        self.assertEquals([token.word for token in expected], [token.word for token in window.tokens])
+        self.assertEquals([3, 4], list(window.sentence_ids))
+        self.assertEquals([0, len(self._sentences[2].tokens)], window.sentence_starts)
+        self.assertEquals(self._sentences[2:4], window.sentences)
+
+    def test_indices(self):
+        window = list(self._document.windows(2))[1]
+        first = window.token_index(0)
+        self.assertEquals(len(self._sentences[0].tokens), first)
+        self.assertEquals(0, window.relative_index(first))
+        self.assertIsNone(window.relative_index(first - 1))
+        self.assertIsNone(window.relative_index(window.end))
+        self.assertRaises(IndexError, window.token_index, len(window))
+
+    def test_offsets(self):
+        window = list(self._document.windows(2))[1]
+        tokens = window.tokens
+        base = tokens[0].character_offset_begin
+        self.assertEquals(base, window.character_offset)
+        self.assertEquals([(t.character_offset_begin - base, t.character_offset_end - base) for t in tokens],
+                          list(window.offsets()))
+        self.assertEquals((0, tokens[0].character_offset_end - base), next(window.offsets()))
+
+    def test_mentions(self):
+        window = SentenceWindow(self._document, 0, 2)
+        columns = self._document.token_columns
+        mentions = window.mentions
+        self.assertGreater(len(mentions), 0)
+        expected = [(mention.sentence.id, mention.head.id)
+                    for coreference in self._document.coreferences for mention in coreference.mentions
+                    if mention.sentence.id in (1, 2)]
+        actual = [(columns.sentence_id[window.token_index(head)], columns.token_id[window.token_index(head)])
+                  for _, _, _, head in mentions]
+        self.assertEquals(sorted(expected), sorted(actual))
+        for chain, start, end, head in mentions:
+            self.assertTrue(0 <= start <= head < end <= len(window))
+
+    def test_coreference_links(self):
+        window = SentenceWindow(self._document, 0, 2)
+        mentions = window.mentions
+        links = window.coreference_links()
+        self.assertGreater(len(links), 0)
+        for antecedent, mention in links:
+            self.assertLess(antecedent, mention)
+            self.assertEquals(mentions[antecedent][0], mentions[mention][0])
+        chains = [chain for chain, _, _, _ in mentions]
+        self.assertEquals(len(chains) - len(set(chains)), len(links))
+
+    def test_column_view(self):
+        view = ColumnView([0, 1, 2, 3, 4], 1, 4)
+        self.assertEquals(3, len(view))
+        self.assertEquals(3, view[-1])
+        self.assertEquals([1, 2], view[:2])
+        self.assertEquals([1, 2, 3], view)
+        self.assertRaises(IndexError, lambda: view[3])
+
+
+def suite():
+    """
+    Generates test suite
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestWindows))
+    return test_suite
+
+
+if __name__ == "__main__":
+    unittest.TextTestRunner(verbosity=1).run(suite())